@@ -5,98 +5,192 @@ Aggregates AI content from Reddit, Hacker News, Lobsters, DEV.to, and ArXiv.
 Uses RSS feeds - no API keys required!
 """
 
-import feedparser
+import bisect
+import heapq
+import itertools
+import os
 import re
-from datetime import datetime
+import sys
+import time
+from concurrent.futures import as_completed
+from pathlib import Path
 
+# Feed fetching and caching are shared with the Morning Tech Report
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "feeds"))
+from feeds import download_feeds, entry_timestamp, poll_feeds
+
+# "ttl": seconds a cached copy of the feed is used before asking the server again
+# "timeout": seconds to wait for the feed (Reddit often hangs, so it gets less)
 AI_FEED_SOURCES = [
-    {"name": "r/MachineLearning", "url": "https://www.reddit.com/r/MachineLearning/.rss", "icon": "🤖"},
-    {"name": "r/artificial", "url": "https://www.reddit.com/r/artificial/.rss", "icon": "🧠"},
-    {"name": "r/LocalLLaMA", "url": "https://www.reddit.com/r/LocalLLaMA/.rss", "icon": "🦙"},
-    {"name": "Hacker News AI", "url": "https://hnrss.org/newest?q=AI+OR+LLM+OR+GPT+OR+machine+learning", "icon": "📰"},
-    {"name": "Lobsters AI", "url": "https://lobste.rs/t/ai.rss", "icon": "🦞"},
-    {"name": "DEV.to AI", "url": "https://dev.to/feed/tag/ai", "icon": "👩‍💻"},
-    {"name": "ArXiv AI", "url": "http://export.arxiv.org/rss/cs.AI", "icon": "📄"},
+    {"name": "r/MachineLearning", "url": "https://www.reddit.com/r/MachineLearning/.rss", "icon": "🤖", "ttl": 300, "timeout": 8},
+    {"name": "r/artificial", "url": "https://www.reddit.com/r/artificial/.rss", "icon": "🧠", "ttl": 300, "timeout": 8},
+    {"name": "r/LocalLLaMA", "url": "https://www.reddit.com/r/LocalLLaMA/.rss", "icon": "🦙", "ttl": 300, "timeout": 8},
+    {"name": "Hacker News AI", "url": "https://hnrss.org/newest?q=AI+OR+LLM+OR+GPT+OR+machine+learning", "icon": "📰", "ttl": 300},
+    {"name": "Lobsters AI", "url": "https://lobste.rs/t/ai.rss", "icon": "🦞", "ttl": 900},
+    {"name": "DEV.to AI", "url": "https://dev.to/feed/tag/ai", "icon": "👩‍💻", "ttl": 900},
+    {"name": "ArXiv AI", "url": "https://rss.arxiv.org/rss/cs.AI", "icon": "📄", "ttl": 21600},
 ]
 
+# Score adapters: how a kind of source reports a post's popularity, read with
+# precompiled patterns. Each source's adapter is looked up once, by name.
+REDDIT_POINTS = re.compile(r'(\d+)\s*(?:points?|upvotes?)', re.I)
+HN_POINTS = re.compile(r'Points:\s*(\d+)')
+
+
+def reddit_score(entry):
+    """Reddit: score is in the content."""
+    content = entry["content"][0].get("value", "") if entry.get("content") else ""
+    match = REDDIT_POINTS.search(content + entry.get("summary", ""))
+    return int(match.group(1)) if match else 0
+
+
+def hacker_news_score(entry):
+    """Hacker News: points in content."""
+    match = HN_POINTS.search(entry.get("summary", ""))
+    return int(match.group(1)) if match else 0
+
+
+def no_score(entry):
+    return 0
+
+
+def score_adapter(source_name):
+    """The score extractor for a source, chosen by its name."""
+    name = source_name.lower()
+    if "reddit" in name or source_name.startswith("r/"):
+        return reddit_score
+    if "hacker" in name or "hn" in name:
+        return hacker_news_score
+    return no_score
+
+
+SCORE_ADAPTERS = {source["name"]: score_adapter(source["name"]) for source in AI_FEED_SOURCES}
+
 
 def extract_score(entry, source_name):
     """Extract popularity score from RSS entry."""
-    score = 0
+    adapter = SCORE_ADAPTERS.get(source_name) or score_adapter(source_name)
+    return adapter(entry)
+
+
+# Ranking: scores are normalized within each source, then decayed by age
+RANKING = {
+    "half_life_hours": float(os.getenv("AI_FEED_HALF_LIFE_HOURS", "12")),  # a post's rank halves every this many hours
+    "unscored": 0.5,  # normalized score for sources without scores (Lobsters, DEV.to, ArXiv)
+    "floor": 0.1,  # added to normalized scores so fresh low-scored posts still beat stale ones
+}
+
+
+def normalize_scores(scores):
+    """Scores scaled to 0..1 within one source: the share of the source's other posts each one outscores.
     
-    # Reddit: score is in the content
-    if "reddit" in source_name.lower() or source_name.startswith("r/"):
-        content = entry.get("content", [{}])[0].get("value", "") if entry.get("content") else ""
-        content += entry.get("summary", "")
-        match = re.search(r'(\d+)\s*(?:points?|upvotes?)', content, re.I)
-        if match:
-            score = int(match.group(1))
+    Sources report scores on very different scales (or not at all), so only
+    a post's standing within its own source is comparable across sources.
+    """
+    if not any(scores):
+        return [RANKING["unscored"]] * len(scores)
+    ordered = sorted(scores)
+    return [bisect.bisect_left(ordered, s) / max(1, len(scores) - 1) for s in scores]
+
+
+def decayed_rank(normalized, timestamp, now):
+    """Rank of a post: its normalized score, halved every half-life of age.
+    
+    Posts without a date are treated as one half-life old.
+    """
+    age_hours = RANKING["half_life_hours"] if timestamp is None else max(0.0, (now - timestamp) / 3600)
+    return (RANKING["floor"] + normalized) * 0.5 ** (age_hours / RANKING["half_life_hours"])
+
+
+class TopPosts:
+    """Top K posts across sources, updated as each source's posts arrive.
     
-    # Hacker News: points in content
-    elif "hacker" in source_name.lower() or "hn" in source_name.lower():
-        content = entry.get("summary", "")
-        match = re.search(r'Points:\s*(\d+)', content)
-        if match:
-            score = int(match.group(1))
+    Posts go into a bounded min-heap keyed by rank, so adding a post costs
+    O(log K) and nothing is re-sorted; a post already seen (same link) is skipped.
+    """
     
-    return score
+    def __init__(self, k=None, now=None):
+        self.k = k
+        self.now = time.time() if now is None else now
+        self._heap = []
+        self._links = set()
+        self._order = itertools.count()  # tie-breaker: earlier posts win equal ranks
+    
+    def add_source(self, posts):
+        """Rank one source's posts and merge them into the top K."""
+        for post, normalized in zip(posts, normalize_scores([p["score"] for p in posts])):
+            if post["link"] in self._links:
+                continue
+            if post["link"]:
+                self._links.add(post["link"])
+            post["rank"] = decayed_rank(normalized, post["timestamp"], self.now)
+            item = (post["rank"], -next(self._order), post)
+            if self.k is None or len(self._heap) < self.k:
+                heapq.heappush(self._heap, item)
+            elif item[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, item)
+    
+    def top(self):
+        """Posts in rank order, best first."""
+        return [post for _, _, post in sorted(self._heap, key=lambda item: item[:2], reverse=True)]
 
 
-def fetch_ai_feed(sources=None):
+def fetch_ai_feed(sources=None, top_k=None):
     """
-    Fetch AI content from RSS sources, sorted by popularity.
+    Fetch AI content from RSS sources, ranked by popularity and freshness.
+    
+    Each source's posts are ranked as soon as its feed arrives, by score
+    relative to the source's other posts, decayed by age.
     
     Args:
         sources: List of source names to fetch from. If None, uses all sources.
+        top_k: Number of posts to keep. If None, keeps all.
     
     Returns:
-        List of posts sorted by score (highest first)
+        List of posts sorted by rank (highest first)
     """
     if sources is None:
         sources = [s["name"] for s in AI_FEED_SOURCES]
     
-    source_map = {s["name"]: s for s in AI_FEED_SOURCES}
-    all_posts = []
+    selected = [s for s in AI_FEED_SOURCES if s["name"] in sources]
+    feeds = download_feeds(selected)
+    top_posts = TopPosts(top_k)
+    source_of = {feeds[s["url"]]: s for s in selected}
     
-    for source_name in sources:
-        source = source_map.get(source_name)
-        if not source:
-            continue
-        
+    for future in as_completed(source_of):
+        source = source_of[future]
         try:
-            feed = feedparser.parse(source["url"])
-            for entry in feed.entries[:15]:
-                published = ""
-                if hasattr(entry, "published_parsed") and entry.published_parsed:
-                    published = datetime(*entry.published_parsed[:6]).strftime("%Y-%m-%d %H:%M")
-                elif hasattr(entry, "updated_parsed") and entry.updated_parsed:
-                    published = datetime(*entry.updated_parsed[:6]).strftime("%Y-%m-%d %H:%M")
-                
-                score = extract_score(entry, source_name)
-                title = entry.get("title", "No title")[:100]
-                title = title.split(" (Comments)")[0].strip()
-                
-                all_posts.append({
-                    "title": title,
-                    "link": entry.get("link", ""),
-                    "source": source["name"],
-                    "icon": source["icon"],
-                    "date": published,
-                    "score": score,
-                    "summary": entry.get("summary", "")[:300],
-                })
+            feed = future.result()
         except Exception as e:
             print(f"Error fetching {source['name']}: {e}")
+            continue
+        
+        posts = []
+        scorer = SCORE_ADAPTERS[source["name"]]
+        for entry in feed.entries[:15]:
+            timestamp = entry_timestamp(entry)
+            published = time.strftime("%Y-%m-%d %H:%M", time.gmtime(timestamp)) if timestamp is not None else ""
+            title = entry.get("title", "No title")[:100]
+            title = title.split(" (Comments)")[0].strip()
+            
+            posts.append({
+                "title": title,
+                "link": entry.get("link", ""),
+                "source": source["name"],
+                "icon": source["icon"],
+                "date": published,
+                "timestamp": timestamp,
+                "score": scorer(entry),
+                "summary": entry.get("summary", "")[:300],
+            })
+        top_posts.add_source(posts)
     
-    # Sort by score (highest first)
-    all_posts.sort(key=lambda x: x["score"], reverse=True)
-    return all_posts
+    return top_posts.top()
 
 
 def get_top_posts(n=10, sources=None):
-    """Get top N posts by popularity."""
-    posts = fetch_ai_feed(sources)
-    return posts[:n]
+    """Get top N posts by rank."""
+    return fetch_ai_feed(sources, top_k=n)
 
 
 def print_feed(posts):
@@ -113,6 +207,10 @@ def print_feed(posts):
 
 
 if __name__ == "__main__":
-    print("Fetching AI Feed...")
-    posts = get_top_posts(15)
-    print_feed(posts)
+    if len(sys.argv) > 1 and sys.argv[1] == "poll":
+        print("Polling AI Feed sources (Ctrl+C to stop)...")
+        poll_feeds(AI_FEED_SOURCES)
+    else:
+        print("Fetching AI Feed...")
+        posts = get_top_posts(15)
+        print_feed(posts)
@@ -4,8 +4,18 @@ ELI5 — Explain Like I'm 5
 Hit the button, learn something new. Random complex concepts explained simply.
 """
 
-import subprocess
+import os
 import random
+import sqlite3
+import sys
+import time
+import zlib
+from contextlib import closing
+from pathlib import Path
+
+# LLM backends (Groq and Ollama, with failover) are shared with the other CLIs
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "llm_backends"))
+from llm_backends import BackendUnavailable, stream_completion
 
 COMPLEX_TOPICS = [
     # Science
@@ -105,8 +115,29 @@ COMPLEX_TOPICS = [
     "why we have fingerprints",
 ]
 
-def explain_eli5(topic):
-    """Use Ollama to explain the topic like the user is 5."""
+# Stored explanations, several per topic, so a run can answer without waiting
+# on Ollama. Shared with the web app's corpus; `python eli5.py build` fills it.
+CORPUS_PATH = Path(os.getenv("ELI5_CORPUS", Path.home() / ".cache" / "easy_life_with_ai" / "eli5.db"))
+MAX_AGE = float(os.getenv("ELI5_MAX_AGE_DAYS", "30")) * 86400  # seconds before a variant is regenerated
+
+# One variant per opening, so each stored explanation of a topic takes its own angle
+OPENINGS = ['"Imagine..."', '"You know how..."', '"Have you ever wondered..."']
+
+CORPUS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS explanations (
+    topic TEXT NOT NULL,
+    variant INTEGER NOT NULL,  -- index into OPENINGS
+    explanation BLOB NOT NULL,  -- zlib-compressed text
+    created REAL NOT NULL,
+    PRIMARY KEY (topic, variant)
+) WITHOUT ROWID;
+"""
+
+def explain_eli5(topic, opening='"Imagine..." or "You know how..."', echo=False):
+    """Use the LLM (Ollama, or Groq when Ollama is saturated) to explain the topic like the user is 5.
+    
+    With echo=True the explanation is printed as it's generated.
+    """
     
     prompt = f"""Explain "{topic}" like I'm 5 years old.
 
@@ -117,22 +148,58 @@ Rules:
 - End with a fun fact or "wow" moment
 - Be enthusiastic and make it fun!
 
-Start with: "Imagine..." or "You know how..." """
+Start with: {opening} """
 
+    tokens = []
     try:
-        result = subprocess.run(
-            ["ollama", "run", "llama3.2"],
-            input=prompt,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-        return result.stdout.strip()
-    except FileNotFoundError:
-        return "Error: Ollama not found. Install from https://ollama.ai"
+        for token in stream_completion(prompt):
+            tokens.append(token)
+            if echo:
+                print(token, end="", flush=True)
+        if echo:
+            print()
+        return "".join(tokens).strip()
+    except BackendUnavailable as e:
+        return f"Error: No LLM available. {e}"
     except Exception as e:
         return f"Error: {e}"
 
+def open_corpus():
+    CORPUS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(CORPUS_PATH, timeout=30)
+    db.executescript(CORPUS_SCHEMA)
+    return db
+
+def stored_variants(topic):
+    """{variant: (explanation, created)} for the stored explanations of a topic."""
+    with closing(open_corpus()) as db:
+        rows = db.execute("SELECT variant, explanation, created FROM explanations WHERE topic = ?", (topic,)).fetchall()
+    return {variant: (zlib.decompress(blob).decode(), created) for variant, blob, created in rows}
+
+def generate_variant(topic, variant, echo=False):
+    """Explain a topic with one of the openings and store it. Returns the explanation (or error)."""
+    explanation = explain_eli5(topic, OPENINGS[variant], echo)
+    if explanation and not explanation.startswith("Error:"):
+        with closing(open_corpus()) as db, db:
+            db.execute(
+                "INSERT OR REPLACE INTO explanations (topic, variant, explanation, created) VALUES (?, ?, ?, ?)",
+                (topic, variant, zlib.compress(explanation.encode()), time.time()),
+            )
+    return explanation
+
+def build_corpus():
+    """Generate every missing or stale variant of every topic."""
+    now = time.time()
+    for topic in COMPLEX_TOPICS:
+        variants = stored_variants(topic)
+        for variant in range(len(OPENINGS)):
+            if variant in variants and now - variants[variant][1] <= MAX_AGE:
+                continue
+            print(f"🧒 {topic} ({variant + 1}/{len(OPENINGS)})")
+            explanation = generate_variant(topic, variant)
+            if explanation.startswith("Error:"):
+                print(f"   {explanation}")
+
 def main():
     # Pick a random topic
     topic = random.choice(COMPLEX_TOPICS)
@@ -142,12 +209,21 @@ def main():
     print("=" * 50)
     print()
     
-    explanation = explain_eli5(topic)
-    print(explanation)
+    # A stored variant answers instantly; otherwise ask Ollama and keep the answer
+    variants = stored_variants(topic)
+    if variants:
+        print(random.choice(list(variants.values()))[0])
+    else:
+        explanation = generate_variant(topic, random.randrange(len(OPENINGS)), echo=True)
+        if explanation.startswith("Error:"):
+            print(explanation)
     
     print()
     print("-" * 50)
     print("🔄 Run again for another random concept!")
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        build_corpus()
+    else:
+        main()
@@ -0,0 +1,44 @@
+"""Tests for ELI5. Run with: python -m pytest"""
+
+import pytest
+
+import eli5
+import llm_backends
+
+
+def unavailable(prompt, params):
+    raise llm_backends.BackendUnavailable("not running")
+    yield
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    monkeypatch.setattr(eli5, "CORPUS_PATH", tmp_path / "eli5.db")
+    monkeypatch.setattr(llm_backends, "LLM_ORDER", ["ollama", "groq"])
+
+
+def test_explanation_is_echoed_as_it_streams(corpus, monkeypatch, capsys):
+    monkeypatch.setitem(llm_backends.LLM_STREAMS, "ollama", lambda prompt, params: iter(["Imagine ", "a box."]))
+
+    explanation = eli5.generate_variant("black holes", 0, echo=True)
+
+    assert explanation == "Imagine a box."
+    assert capsys.readouterr().out == "Imagine a box.\n"
+    assert eli5.stored_variants("black holes")[0][0] == "Imagine a box."
+
+
+def test_groq_answers_when_ollama_is_down(corpus, monkeypatch):
+    monkeypatch.setitem(llm_backends.LLM_STREAMS, "ollama", unavailable)
+    monkeypatch.setitem(llm_backends.LLM_STREAMS, "groq", lambda prompt, params: iter(["From Groq."]))
+
+    assert eli5.explain_eli5("black holes") == "From Groq."
+
+
+def test_error_is_not_stored(corpus, monkeypatch):
+    monkeypatch.setitem(llm_backends.LLM_STREAMS, "ollama", unavailable)
+    monkeypatch.setitem(llm_backends.LLM_STREAMS, "groq", unavailable)
+
+    explanation = eli5.generate_variant("black holes", 0)
+
+    assert explanation.startswith("Error: No LLM available.")
+    assert eli5.stored_variants("black holes") == {}
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Feeds
+One fetcher for the CLIs' RSS and Atom feeds: pooled connections, a cache
+revalidated with conditional GETs, hedged requests to slow sources, a
+streaming parser and a poller that keeps the cache warm.
+"""
+
+import bisect
+import calendar
+import email.utils
+import feedparser
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import requests
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urljoin
+from xml.etree import ElementTree as ET
+
+logger = logging.getLogger(__name__)
+
+# cache_dir is shared with the web app, so a feed both read is fetched once per refresh window
+FEED_FETCH = {
+    "max_workers": int(os.getenv("FEED_MAX_WORKERS", "8")),  # feeds downloaded at once
+    "timeout": float(os.getenv("FEED_TIMEOUT", "15")),  # seconds per feed, unless the source sets "timeout"
+    "cache_dir": Path(os.getenv("FEED_CACHE_DIR", Path.home() / ".cache" / "easy_life_with_ai" / "feeds")),
+    "default_ttl": 900,  # seconds a cached feed is served without revalidating
+    "max_entries": int(os.getenv("FEED_MAX_ENTRIES", "20")),  # entries parsed per feed (readers show at most 15)
+    "report_deadline": float(os.getenv("FEED_REPORT_DEADLINE", "20")),  # seconds before a report goes out with what has arrived
+    "hedge": os.getenv("FEED_HEDGE", "1") == "1",  # race a second request when a source is slower than usual
+    "hedge_min_samples": 10,  # latency samples needed before a source is hedged
+    "hedge_tail_ratio": 3.0,  # latency, as a multiple of the median, where a source's tail starts
+    "poll_min_interval": 60,  # seconds between polls of a feed that changes every time
+    "poll_max_interval": 6 * 3600,  # seconds between polls of a feed that never changes
+}
+
+
+def make_feed_session():
+    """HTTP session whose keep-alive connections are reused across feeds and calls."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=2 * FEED_FETCH["max_workers"])
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = feedparser.USER_AGENT
+    return session
+
+
+feed_session = make_feed_session()
+
+
+# Latency histogram bucket upper bounds in seconds; the last bucket holds anything slower
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60]
+
+_feed_latency = None  # url -> bucket counts, loaded from the feed cache on first use
+_feed_latency_lock = threading.Lock()
+_feed_requests = ThreadPoolExecutor(max_workers=2 * FEED_FETCH["max_workers"], thread_name_prefix="feed-request")
+
+
+def feed_latency_path():
+    """Path of the per-source latency histograms, kept next to the feed cache."""
+    return FEED_FETCH["cache_dir"] / "latency.json"
+
+
+def feed_latency():
+    """Per-source latency histograms, loading them from disk on first use."""
+    global _feed_latency
+    with _feed_latency_lock:
+        if _feed_latency is None:
+            try:
+                _feed_latency = json.loads(feed_latency_path().read_text())
+            except (FileNotFoundError, ValueError):
+                _feed_latency = {}
+        return _feed_latency
+
+
+def record_feed_latency(url, seconds):
+    """Add a request's latency to its source's histogram.
+    
+    Counts are halved once a histogram holds 200 samples, so recent behaviour dominates.
+    """
+    histograms = feed_latency()
+    with _feed_latency_lock:
+        counts = histograms.setdefault(url, [0] * (len(LATENCY_BUCKETS) + 1))
+        counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        if sum(counts) >= 200:
+            histograms[url] = [count // 2 for count in counts]
+
+
+def save_feed_latency():
+    """Write the latency histograms next to the feed cache."""
+    histograms = feed_latency()
+    path = feed_latency_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    with _feed_latency_lock:
+        tmp_path.write_text(json.dumps(histograms))
+    os.replace(tmp_path, path)
+
+
+def latency_quantile(counts, q):
+    """Upper bound of the histogram bucket holding the q-th quantile."""
+    target = q * sum(counts)
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS + [float("inf")], counts):
+        seen += count
+        if seen >= target:
+            return bound
+    return float("inf")
+
+
+def hedge_threshold(url):
+    """Seconds after which a request to this source is hedged, or None.
+    
+    Only sources with a tail (p99 latency well above the median) are hedged.
+    They are hedged at their p95, so about one request in twenty sends a
+    second copy, or sooner if more than 5% of their requests are in the tail.
+    """
+    if not FEED_FETCH["hedge"]:
+        return None
+    counts = feed_latency().get(url)
+    if not counts or sum(counts) < FEED_FETCH["hedge_min_samples"]:
+        return None
+    median = latency_quantile(counts, 0.5)
+    tail_start = FEED_FETCH["hedge_tail_ratio"] * median
+    if latency_quantile(counts, 0.99) < tail_start:
+        return None
+    return min(latency_quantile(counts, 0.95), tail_start)
+
+
+def timed_feed_get(url, headers, timeout):
+    """GET a feed over the shared session, recording the latency."""
+    started = time.monotonic()
+    try:
+        return feed_session.get(url, headers=headers, timeout=timeout)
+    finally:
+        record_feed_latency(url, time.monotonic() - started)
+
+
+def get_feed_response(url, headers, deadline):
+    """GET a feed, giving up after `deadline` seconds.
+    
+    If the request outlives the source's hedge threshold, a second identical
+    request is raced against it and the first successful response wins.
+    """
+    started = time.monotonic()
+    attempts = [_feed_requests.submit(timed_feed_get, url, headers, deadline)]
+    threshold = hedge_threshold(url)
+    if threshold is not None and threshold < deadline:
+        done, _ = wait(attempts, timeout=threshold)
+        if not done:
+            attempts.append(_feed_requests.submit(timed_feed_get, url, headers, deadline))
+    
+    error = None
+    try:
+        for attempt in as_completed(attempts, timeout=max(0, deadline - (time.monotonic() - started))):
+            try:
+                return attempt.result()
+            except requests.RequestException as e:
+                error = e
+    except FuturesTimeout:
+        raise TimeoutError(f"no response within {deadline:g}s")
+    raise error
+
+
+# url -> (cache file mtime, cached feed): feeds this process has already read
+_feed_store = {}
+_feed_store_lock = threading.Lock()
+# url -> lock held while the feed is being read or fetched
+_feed_flights = {}
+_feed_flights_lock = threading.Lock()
+
+
+def feed_cache_path(url):
+    """Path of a feed's entry in the feed cache."""
+    return FEED_FETCH["cache_dir"] / f"{hashlib.sha1(url.encode()).hexdigest()}.pickle"
+
+
+def load_cached_feed(url):
+    """Cached validators and parsed entries for a feed, and their age in seconds.
+    
+    Entries already read by this process are served from the in-process
+    store, as long as the cache file hasn't changed since.
+    Returns (None, None) if the feed isn't cached.
+    """
+    path = feed_cache_path(url)
+    try:
+        mtime = path.stat().st_mtime
+        with _feed_store_lock:
+            stored = _feed_store.get(url)
+        if stored and stored[0] == mtime:
+            cached = stored[1]
+        else:
+            with open(path, "rb") as f:
+                cached = pickle.load(f)
+            with _feed_store_lock:
+                _feed_store[url] = (mtime, cached)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return None, None
+    return cached, time.time() - mtime
+
+
+def save_cached_feed(url, cached):
+    """Write a feed's validators and parsed entries to the feed cache."""
+    path = feed_cache_path(url)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(cached, f)
+    os.replace(tmp_path, path)
+    with _feed_store_lock:
+        _feed_store[url] = (path.stat().st_mtime, cached)
+
+
+def touch_cached_feed(url, cached):
+    """Mark a cached feed as just revalidated, restarting its TTL."""
+    path = feed_cache_path(url)
+    os.utime(path)
+    with _feed_store_lock:
+        _feed_store[url] = (path.stat().st_mtime, cached)
+
+
+# Entry fields the readers use; everything else in a feed is skipped
+FEED_NAMESPACES = {
+    "",
+    "http://www.w3.org/2005/Atom",
+    "http://purl.org/rss/1.0/",
+    "http://purl.org/dc/elements/1.1/",
+    "http://purl.org/rss/1.0/modules/content/",
+}
+ENTRY_TAGS = {"item", "entry"}
+FIELD_TAGS = {
+    "title": "title",
+    "link": "link",
+    "description": "summary",
+    "summary": "summary",
+    "encoded": "content",  # content:encoded
+    "content": "content",
+    "pubDate": "published",
+    "published": "published",
+    "issued": "published",
+    "date": "updated",  # dc:date, reported as updated like feedparser does
+    "updated": "updated",
+    "modified": "updated",
+}
+
+
+# RFC 822 dates as feeds write them, e.g. "Fri, 16 Oct 2026 10:00:00 GMT" or "... +0200"
+RFC822_DATE = re.compile(
+    r"(?:[A-Za-z]{3},\s*)?(\d{1,2})\s+([A-Za-z]{3})\s+(\d{4})\s+(\d{1,2}):(\d\d)(?::(\d\d))?"
+    r"\s*(?:GMT|UTC|UT|Z|([+-])(\d\d):?(\d\d))?\s*$"
+)
+MONTHS = {name: number for number, name in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1)}
+
+
+def parse_feed_date(text):
+    """UTC struct_time for an RFC 822 (RSS) or ISO 8601 (Atom) date, or None.
+    
+    The usual RSS form is read with one precompiled pattern; other forms
+    (named US time zones, two-digit years) go through the standard parsers.
+    """
+    match = RFC822_DATE.match(text) if text else None
+    if match and match.group(2).lower() in MONTHS:
+        day, month, year, hour, minute, second, sign, offset_hours, offset_minutes = match.groups()
+        timestamp = calendar.timegm((int(year), MONTHS[month.lower()], int(day), int(hour), int(minute), int(second or 0)))
+        if sign:
+            offset = 3600 * int(offset_hours) + 60 * int(offset_minutes)
+            timestamp += -offset if sign == "+" else offset
+        return time.gmtime(timestamp)
+    try:
+        parsed = email.utils.parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        return parsed.timetuple()
+    return parsed.utctimetuple()
+
+
+def entry_timestamp(entry):
+    """Unix time an entry was published (or updated), or None if the feed doesn't say."""
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    return calendar.timegm(parsed) if parsed else None
+
+
+def stream_feed_entries(data, max_entries, base_url=""):
+    """Parse at most `max_entries` entries from RSS or Atom bytes, keeping only the fields we use.
+    
+    Entries are read incrementally and the parse stops at the last one needed,
+    so large feeds (arXiv lists hundreds of abstracts) aren't parsed in full.
+    Raises ET.ParseError for XML the strict parser can't read.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    entries = []
+    entry = None
+    for offset in range(0, len(data), 65536):
+        parser.feed(data[offset:offset + 65536])
+        for event, element in parser.read_events():
+            namespace, _, tag = element.tag[1:].rpartition("}") if element.tag[:1] == "{" else ("", "", element.tag)
+            if namespace not in FEED_NAMESPACES:
+                continue
+            if event == "start":
+                if tag in ENTRY_TAGS:
+                    entry = feedparser.FeedParserDict()
+                    href_link = False
+                continue
+            
+            if entry is None:
+                continue
+            if tag in ENTRY_TAGS:
+                if "summary" not in entry and "content" in entry:
+                    entry["summary"] = entry["content"][0]["value"]
+                entries.append(entry)
+                entry = None
+                element.clear()
+                if len(entries) >= max_entries:
+                    return entries
+                continue
+            
+            field = FIELD_TAGS.get(tag)
+            # An RSS item's own <link> wins over an atom:link that came before it
+            rss_link = field == "link" and element.get("href") is None
+            if field is None or field in entry and not (rss_link and href_link):
+                continue
+            # type="xhtml" Atom text is in child elements, not the element's own text
+            text = "".join(element.itertext()).strip()
+            if field == "link":
+                # Atom: <link rel="alternate" href="..."/>; RSS: <link>...</link>
+                if element.get("rel", "alternate") != "alternate":
+                    continue
+                href_link = not rss_link
+                text = urljoin(base_url, element.get("href", text))
+            if field == "content":
+                entry[field] = [{"value": text}]
+            elif field in ("published", "updated"):
+                entry[field] = text
+                entry[f"{field}_parsed"] = parse_feed_date(text)
+            elif text:
+                entry[field] = text
+    parser.close()
+    return entries
+
+
+def parse_feed(response, max_entries):
+    """Parsed feed from an HTTP response, with at most `max_entries` entries.
+    
+    Feeds that aren't well-formed XML go through feedparser's forgiving parser instead.
+    """
+    try:
+        return feedparser.FeedParserDict(entries=stream_feed_entries(response.content, max_entries, response.url))
+    except ET.ParseError:
+        feed = feedparser.parse(response.content, response_headers={
+            "content-type": response.headers.get("Content-Type", ""),
+            "content-location": response.url,
+        })
+        feed["entries"] = feed.entries[:max_entries]
+        return feed
+
+
+def read_feed(url, ttl=None, timeout=None):
+    """Parsed feed for a URL, served from the feed cache when possible.
+    
+    Within the source's TTL, or while a feed poller keeps the feed fresh, the
+    cached entries are returned without a request (ttl=0 always revalidates).
+    After it, a conditional GET revalidates them: on 304 Not Modified the
+    cached entries are reused without downloading or parsing the feed again.
+    If the request fails or misses the source's deadline, stale cached
+    entries are returned.
+    """
+    ttl = FEED_FETCH["default_ttl"] if ttl is None else ttl
+    cached, age = load_cached_feed(url)
+    if cached is not None and (age < ttl or (ttl > 0 and time.time() < polled_until(url))):
+        return feedparser.FeedParserDict(entries=cached["entries"])
+    
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("modified"):
+        headers["If-Modified-Since"] = cached["modified"]
+    
+    try:
+        response = get_feed_response(url, headers, FEED_FETCH["timeout"] if timeout is None else timeout)
+        if response.status_code == 304 and cached is not None:
+            touch_cached_feed(url, cached)
+            return feedparser.FeedParserDict(entries=cached["entries"])
+        response.raise_for_status()
+    except (requests.RequestException, TimeoutError) as e:
+        if cached is None:
+            raise
+        print(f"Error fetching {url}, using cached entries: {e}")
+        return feedparser.FeedParserDict(entries=cached["entries"])
+    
+    feed = parse_feed(response, FEED_FETCH["max_entries"])
+    save_cached_feed(url, {
+        "etag": response.headers.get("ETag"),
+        "modified": response.headers.get("Last-Modified"),
+        "entries": feed.entries,
+    })
+    return feed
+
+
+def fetch_feed(url, ttl=None, timeout=None):
+    """Parsed feed for a URL, fetched at most once per refresh window.
+    
+    Every reader of a URL shares its cached entries; concurrent calls for the
+    same URL wait for the one request in flight instead of sending their own.
+    """
+    with _feed_flights_lock:
+        flight = _feed_flights.setdefault(url, threading.Lock())
+    with flight:
+        return read_feed(url, ttl, timeout)
+
+
+def download_feeds(sources, deadline=None):
+    """
+    Fetch feeds concurrently, so the wait is the slowest feed rather than the sum.
+    
+    Args:
+        sources: Source dicts with a "url" and optional "ttl" and "timeout"
+        deadline: Seconds to wait for all feeds (default: FEED_FETCH["report_deadline"])
+    
+    Returns:
+        Dict of url -> Future holding the parsed feed (or raising its fetch error,
+        or TimeoutError if it missed the deadline)
+    """
+    deadline = FEED_FETCH["report_deadline"] if deadline is None else deadline
+    # Consumers may list the same feed more than once; fetch it once
+    unique = {s["url"]: s for s in sources}
+    pool = ThreadPoolExecutor(max_workers=max(1, min(len(unique), FEED_FETCH["max_workers"])))
+    futures = {url: pool.submit(fetch_feed, url, s.get("ttl"), s.get("timeout")) for url, s in unique.items()}
+    wait(futures.values(), timeout=deadline)
+    # Late feeds keep downloading in the background and land in the cache for next time
+    pool.shutdown(wait=False)
+    save_feed_latency()
+    
+    for url, future in futures.items():
+        if not future.done():
+            futures[url] = late = Future()
+            late.set_exception(TimeoutError(f"no response within the {deadline:g}s report deadline"))
+    return futures
+
+
+def feed_poll_path():
+    return FEED_FETCH["cache_dir"] / "poll.json"
+
+
+# (poll.json mtime, {url: time until which a feed poller keeps that feed fresh})
+_feed_polls = (None, {})
+
+
+def polled_until(url):
+    """Time until which a running feed poller keeps a feed's cached copy fresh (0 if none does)."""
+    global _feed_polls
+    path = feed_poll_path()
+    try:
+        mtime = path.stat().st_mtime
+        if _feed_polls[0] != mtime:
+            _feed_polls = (mtime, json.loads(path.read_text()))
+    except (OSError, ValueError):
+        return 0
+    return _feed_polls[1].get(url, 0)
+
+
+def save_feed_polls(polls):
+    """Record how long polled feeds stay fresh, keeping other pollers' feeds."""
+    path = feed_poll_path()
+    try:
+        merged = json.loads(path.read_text())
+    except (OSError, ValueError):
+        merged = {}
+    merged.update(polls)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(merged))
+    os.replace(tmp_path, path)
+
+
+def clamp_poll_interval(seconds):
+    return min(max(seconds, FEED_FETCH["poll_min_interval"]), FEED_FETCH["poll_max_interval"])
+
+
+def poll_feeds(sources):
+    """Keep feeds fresh in the cache forever, each polled as often as it changes.
+    
+    A feed is first polled every TTL. When its entries changed since the last
+    poll it is polled twice as often, when they didn't 1.5 times less often,
+    within poll_min_interval and poll_max_interval. Readers use a polled feed's
+    cached copy without revalidating it until two of its intervals have
+    passed, so if the poller stops, feeds soon go back to their own TTLs.
+    """
+    sources = list({s["url"]: s for s in sources}.values())
+    schedule = {
+        s["url"]: {"interval": clamp_poll_interval(s.get("ttl", FEED_FETCH["default_ttl"])), "due": 0, "links": None}
+        for s in sources
+    }
+    while True:
+        started = time.time()
+        try:
+            due = [s for s in sources if schedule[s["url"]]["due"] <= started]
+            # ttl=0 revalidates every due feed; unchanged ones cost a 304
+            feeds = download_feeds([{**s, "ttl": 0} for s in due])
+            polls = {}
+            changed = 0
+            for s in due:
+                state = schedule[s["url"]]
+                try:
+                    links = [entry.get("link") for entry in feeds[s["url"]].result().entries]
+                except Exception as e:
+                    print(f"Error polling {s['name']}: {e}")
+                else:
+                    if state["links"] is not None:
+                        changed += links != state["links"]
+                        factor = 0.5 if links != state["links"] else 1.5
+                        state["interval"] = clamp_poll_interval(state["interval"] * factor)
+                    state["links"] = links
+                    polls[s["url"]] = started + 2 * state["interval"]
+                state["due"] = started + state["interval"]
+            save_feed_polls(polls)
+        except Exception:
+            # One failed cycle (e.g. the cache dir isn't writable) mustn't stop the poller
+            logger.exception("Feed poll failed, retrying in %ds", FEED_FETCH["poll_min_interval"])
+            time.sleep(FEED_FETCH["poll_min_interval"])
+            continue
+        logger.debug("Polled %d feeds (%d changed) in %.1fs", len(due), changed, time.time() - started)
+        time.sleep(max(1, min(state["due"] for state in schedule.values()) - time.time()))
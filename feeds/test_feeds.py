@@ -0,0 +1,83 @@
+"""Tests for the shared feed fetcher. Run with: python -m pytest"""
+
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+import feeds
+
+
+ATOM_XHTML = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <title type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml">Fine-tuning <b>Llama</b> on a laptop</div></title>
+    <link rel="alternate" href="/posts/1"/>
+    <summary type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>LoRA in <i>8 GB</i> of RAM.</p></div></summary>
+    <updated>2024-05-01T12:00:00Z</updated>
+  </entry>
+</feed>
+"""
+
+RSS_WITH_ATOM_LINK = b"""<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
+  <channel>
+    <item>
+      <title>Show HN: A tiny inference server</title>
+      <atom:link rel="alternate" href="https://news.ycombinator.com/item?id=1"/>
+      <link>https://example.com/tiny-server</link>
+      <description>Serves GGUF models over HTTP.</description>
+    </item>
+  </channel>
+</rss>
+"""
+
+
+def test_atom_xhtml_text():
+    [entry] = feeds.stream_feed_entries(ATOM_XHTML, 10, "https://example.com/feed")
+
+    assert entry["title"] == "Fine-tuning Llama on a laptop"
+    assert entry["summary"] == "LoRA in 8 GB of RAM."
+    assert entry["link"] == "https://example.com/posts/1"
+
+
+def test_rss_link_wins_over_atom_link():
+    [entry] = feeds.stream_feed_entries(RSS_WITH_ATOM_LINK, 10)
+
+    assert entry["link"] == "https://example.com/tiny-server"
+    assert entry["summary"] == "Serves GGUF models over HTTP."
+
+
+class StopPolling(Exception):
+    pass
+
+
+def test_poll_feeds_survives_a_failed_cycle(monkeypatch):
+    polled = []
+
+    def download_feeds(sources):
+        polled.append([s["url"] for s in sources])
+        if len(polled) == 1:
+            raise OSError("No space left on device")
+        results = {}
+        for s in sources:
+            results[s["url"]] = Future()
+            results[s["url"]].set_result(SimpleNamespace(entries=[{"link": f"{s['url']}/{len(polled)}"}]))
+        return results
+
+    def sleep(seconds):
+        if len(polled) == 3:
+            raise StopPolling
+
+    monkeypatch.setattr(feeds, "download_feeds", download_feeds)
+    monkeypatch.setattr(feeds, "save_feed_polls", lambda polls: None)
+    monkeypatch.setattr(feeds.time, "sleep", sleep)
+    # The second poll comes due straight away
+    monkeypatch.setitem(feeds.FEED_FETCH, "poll_min_interval", 0)
+    monkeypatch.setitem(feeds.FEED_FETCH, "default_ttl", 0)
+    sources = [{"name": "Feed", "url": "https://example.com/feed"}]
+
+    with pytest.raises(StopPolling):
+        feeds.poll_feeds(sources)
+
+    assert polled == [["https://example.com/feed"]] * 3
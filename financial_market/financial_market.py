@@ -4,9 +4,21 @@ Financial Market Update Module
 Fetches market data using yfinance and generates summaries.
 """
 
+import ast
+import contextvars
+import logging
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
 import yfinance as yf
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Optional
+from urllib.parse import quote
 
 # Market indices by region
 INDICES = {
@@ -83,6 +95,66 @@ DATE_RANGES = {
     "1y": ("1 Year", 365),
 }
 
+# Every range is sliced from one stored history covering the longest range
+HISTORY_DAYS = max(days for _, days in DATE_RANGES.values())
+
+
+# Fetch settings
+FETCH_CONFIG = {
+    "mode": os.getenv("MARKET_FETCH_MODE", "batch"),  # "batch" or "parallel"
+    "max_in_flight": int(os.getenv("MARKET_MAX_IN_FLIGHT", "8")),  # parallel ticker requests
+    "report_deadline": float(os.getenv("MARKET_REPORT_DEADLINE", "20")),  # seconds per report
+    "movers_chunk": int(os.getenv("MARKET_MOVERS_CHUNK", "200")),  # movers tickers held in memory at once
+}
+
+# Top movers universes: <MARKET_UNIVERSE_DIR>/<asset class>.txt (e.g. stocks.txt)
+# replaces the built-in ticker list for that asset class
+UNIVERSE_DIR = os.getenv("MARKET_UNIVERSE_DIR", "")
+
+# Local price store: one memory-mapped .npy file per ticker
+PRICE_STORE = {
+    "dir": Path(os.getenv("MARKET_STORE_DIR", Path.home() / ".cache" / "easy_life_with_ai" / "prices")),
+    "max_bytes": int(os.getenv("MARKET_STORE_MAX_MB", "50")) * 1024 * 1024,
+    "max_idle_days": 30,  # evict tickers nobody has read for this long
+    "gap_days": 5,  # stored history starting this long after the requested start is refetched
+    "refresh_seconds": int(os.getenv("MARKET_REFRESH_SECONDS", "300")),  # serve stored bars without fetching
+}
+STORE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+MATRIX_COLUMNS = ["Close", "High", "Low", "Volume"]
+
+_fetch_pool = None
+_fetch_pool_lock = threading.Lock()
+
+# Request budget shared by all Yahoo traffic (token bucket with adaptive backoff)
+YAHOO_LIMITS = {
+    "rate": float(os.getenv("YAHOO_RATE", "10")),  # max ticker requests per second
+    "burst": float(os.getenv("YAHOO_BURST", "50")),  # bucket size
+    "min_rate": 0.5,  # rate floor while throttled
+    "background_reserve": 0.5,  # share of the bucket background requests leave for interactive ones
+    "max_retries": 3,  # retries of a throttled request
+    "max_backoff": 60.0,  # seconds
+}
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+_yahoo_priority = contextvars.ContextVar("yahoo_priority", default=INTERACTIVE)
+# Set of tickers that stayed throttled for the current report, if one is collecting them
+_yahoo_failures = contextvars.ContextVar("yahoo_failures", default=None)
+_yahoo_state = {
+    "tokens": YAHOO_LIMITS["burst"],
+    "updated": time.monotonic(),
+    "rate": YAHOO_LIMITS["rate"],
+    "backoff": 0.0,
+    "blocked_until": 0.0,
+}
+_yahoo_cond = threading.Condition()
+_yahoo_log = threading.local()
+
+# Yahoo requests in flight, shared by concurrent callers: (ticker, start day, end day) -> Future
+_inflight = {}
+_inflight_lock = threading.Lock()
+
 
 def get_date_range(range_key: str) -> tuple[datetime, datetime]:
     """Get start and end dates based on range key."""
@@ -109,38 +181,689 @@ def calculate_change(data) -> tuple[float, float]:
     return change, pct_change
 
 
+def summarize_history(ticker: str, hist) -> Optional[dict]:
+    """Compute report metrics from a ticker's price history."""
+    if hist is None or hist.empty:
+        return None
+    
+    change, pct_change = calculate_change(hist)
+    
+    return {
+        "ticker": ticker,
+        "current": hist['Close'].iloc[-1],
+        "change": change,
+        "pct_change": pct_change,
+        "high": hist['High'].max(),
+        "low": hist['Low'].min(),
+        "volume": hist['Volume'].sum() if 'Volume' in hist else 0,
+    }
+
+
+def build_price_matrix(histories: dict) -> tuple[list[str], dict]:
+    """Align ticker histories into date x symbol matrices.
+    
+    Returns the symbols (one per matrix column) and a dict of price column
+    (Close, High, Low, Volume) -> 2-D array. Dates a symbol has no bar for are NaN.
+    """
+    symbols = list(histories)
+    if not symbols:
+        return [], {name: np.empty((0, 0)) for name in MATRIX_COLUMNS}
+    
+    days = [histories[t].index.values.astype("datetime64[D]") for t in symbols]
+    dates = np.unique(np.concatenate(days))
+    stacked = np.full((len(MATRIX_COLUMNS), len(dates), len(symbols)), np.nan)
+    
+    for col, ticker in enumerate(symbols):
+        rows = np.searchsorted(dates, days[col])
+        values = histories[ticker].reindex(columns=MATRIX_COLUMNS).to_numpy(dtype="float64")
+        stacked[:, rows, col] = values.T
+    
+    return symbols, dict(zip(MATRIX_COLUMNS, stacked))
+
+
+def compute_metrics(matrices: dict) -> dict:
+    """Compute report metrics for every symbol column of the price matrices at once.
+    
+    Returns a dict of metric name -> 1-D array with one value per symbol. Follows
+    calculate_change: symbols with fewer than two bars or a zero start price
+    have no change. "bars" counts each symbol's bars; symbols with none have no data.
+    """
+    close = matrices["Close"]
+    if not close.shape[0]:
+        # No dates at all (e.g. every fetch failed): no symbol has data
+        none = np.zeros(close.shape[1])
+        return {"bars": none.astype(int), "current": none, "change": none, "pct_change": none,
+                "high": none, "low": none, "volume": none}
+    
+    valid = ~np.isnan(close)
+    bars = valid.sum(axis=0)
+    cols = np.arange(close.shape[1])
+    
+    # First and last bar per symbol, skipping dates the symbol didn't trade
+    first = valid.argmax(axis=0)
+    last = close.shape[0] - 1 - valid[::-1].argmax(axis=0)
+    start_price = close[first, cols] if close.size else np.zeros(0)
+    current = close[last, cols] if close.size else np.zeros(0)
+    
+    has_change = (bars >= 2) & (start_price != 0)
+    change = np.where(has_change, current - start_price, 0.0)
+    safe_start = np.where(has_change, start_price, 1.0)
+    pct_change = np.where(has_change, change / safe_start * 100, 0.0)
+    
+    # fmax/fmin ignore NaN like nanmax/nanmin, without warning on empty columns
+    return {
+        "bars": bars,
+        "current": current,
+        "change": change,
+        "pct_change": pct_change,
+        "high": np.fmax.reduce(matrices["High"], axis=0, initial=-np.inf),
+        "low": np.fmin.reduce(matrices["Low"], axis=0, initial=np.inf),
+        "volume": np.nansum(matrices["Volume"], axis=0),
+    }
+
+
+def _metrics_row(symbols: list[str], metrics: dict, col: int) -> dict:
+    """Metrics dict for one symbol, in the same shape as summarize_history."""
+    return {
+        "ticker": symbols[col],
+        "current": metrics["current"][col],
+        "change": metrics["change"][col],
+        "pct_change": metrics["pct_change"][col],
+        "high": metrics["high"][col],
+        "low": metrics["low"][col],
+        "volume": metrics["volume"][col],
+    }
+
+
+def summarize_histories(histories: dict) -> dict:
+    """Compute report metrics for many tickers in one pass over a price matrix.
+    
+    Returns a dict of ticker -> metrics dict. Tickers without bars are left out.
+    """
+    symbols, matrices = build_price_matrix(histories)
+    if not symbols or not matrices["Close"].shape[0]:
+        return {}
+    
+    metrics = compute_metrics(matrices)
+    return {
+        symbols[col]: _metrics_row(symbols, metrics, col)
+        for col in np.flatnonzero(metrics["bars"] > 0)
+    }
+
+
+@contextmanager
+def yahoo_priority(priority: str):
+    """Run the enclosed Yahoo requests at INTERACTIVE or BACKGROUND priority."""
+    token = _yahoo_priority.set(priority)
+    try:
+        yield
+    finally:
+        _yahoo_priority.reset(token)
+
+
+def _submit(pool: ThreadPoolExecutor, fn, *args):
+    """Submit work to a pool, carrying over the caller's Yahoo priority and failure tracking."""
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+def _acquire_yahoo(cost: float) -> None:
+    """Block until the request budget allows `cost` ticker requests.
+    
+    Background requests wait until the bucket is above the reserve kept for
+    interactive ones. A cost larger than the bucket is allowed once it is full
+    and paid back before later requests go out.
+    """
+    reserve = YAHOO_LIMITS["burst"] * YAHOO_LIMITS["background_reserve"] if _yahoo_priority.get() == BACKGROUND else 0.0
+    needed = min(cost, YAHOO_LIMITS["burst"] - reserve) + reserve
+    
+    with _yahoo_cond:
+        while True:
+            now = time.monotonic()
+            state = _yahoo_state
+            state["tokens"] = min(YAHOO_LIMITS["burst"], state["tokens"] + (now - state["updated"]) * state["rate"])
+            state["updated"] = now
+            
+            if now >= state["blocked_until"] and state["tokens"] >= needed:
+                state["tokens"] -= cost
+                return
+            
+            wait_for = max(state["blocked_until"] - now, (needed - state["tokens"]) / state["rate"])
+            _yahoo_cond.wait(timeout=wait_for)
+
+
+def _record_yahoo_response(throttled: bool) -> None:
+    """Adapt the request budget: halve the rate and back off on throttling, recover on success."""
+    with _yahoo_cond:
+        state = _yahoo_state
+        if throttled:
+            state["backoff"] = min(YAHOO_LIMITS["max_backoff"], max(1.0, state["backoff"] * 2))
+            state["blocked_until"] = time.monotonic() + state["backoff"]
+            state["rate"] = max(YAHOO_LIMITS["min_rate"], state["rate"] / 2)
+            state["tokens"] = min(state["tokens"], 0.0)
+        else:
+            state["backoff"] = state["backoff"] / 2 if state["backoff"] >= 1.0 else 0.0
+            state["rate"] = min(YAHOO_LIMITS["rate"], state["rate"] + YAHOO_LIMITS["rate"] / 10)
+        _yahoo_cond.notify_all()
+
+
+def _is_throttled(error) -> bool:
+    """Whether an exception or error message is Yahoo rate limiting us."""
+    text = f"{type(error).__name__} {error}".lower()
+    return any(sign in text for sign in ("ratelimit", "rate limit", "too many requests", "429"))
+
+
+def _note_yahoo_failures(tickers) -> None:
+    """Record tickers that stayed throttled so the current report can mention them."""
+    failures = _yahoo_failures.get()
+    if failures is not None:
+        failures.update(tickers)
+
+
+class _ThrottledTickersLog(logging.Handler):
+    """Collects tickers yfinance logs as rate limited during a download on this thread.
+    
+    yf.download doesn't raise per-ticker errors; it logs lines like
+    "['AAPL', 'MSFT']: YFRateLimitError('Too Many Requests...')".
+    """
+    
+    def emit(self, record):
+        tickers = getattr(_yahoo_log, "throttled", None)
+        message = record.getMessage()
+        if tickers is None or not _is_throttled(message) or "]:" not in message:
+            return
+        try:
+            tickers.update(ast.literal_eval(message.split("]:", 1)[0].strip() + "]"))
+        except (ValueError, SyntaxError):
+            pass
+
+
+logging.getLogger("yfinance").addHandler(_ThrottledTickersLog())
+
+
+def _flight_key(ticker: str, start_date: datetime, end_date: datetime) -> tuple:
+    """Key identifying a ticker's fetch window for request coalescing."""
+    return (ticker, start_date.date(), end_date.date())
+
+
+def _claim_flights(keys) -> tuple[dict, dict]:
+    """Split fetch keys into ones this caller has to fetch and ones already in flight.
+    
+    Returns (owned, waiting), both dicts of key -> Future. The caller must pass
+    `owned` to _land_flights once its fetch is done, even if it failed.
+    """
+    owned, waiting = {}, {}
+    with _inflight_lock:
+        for key in keys:
+            if key in _inflight:
+                waiting[key] = _inflight[key]
+            else:
+                owned[key] = _inflight[key] = Future()
+    return owned, waiting
+
+
+def _land_flights(owned: dict, results: dict) -> None:
+    """Hand fetch results to everyone waiting on the owned keys."""
+    with _inflight_lock:
+        for key in owned:
+            del _inflight[key]
+    for key, future in owned.items():
+        future.set_result(results.get(key))
+
+
+def _fetch_history(ticker: str, start_date: datetime, end_date: datetime):
+    """Fetch price history for a single ticker from Yahoo, or None on error.
+    
+    Concurrent calls for the same ticker and window share one request.
+    """
+    key = _flight_key(ticker, start_date, end_date)
+    owned, waiting = _claim_flights([key])
+    if waiting:
+        return waiting[key].result()
+    
+    hist = None
+    try:
+        for attempt in range(YAHOO_LIMITS["max_retries"] + 1):
+            _acquire_yahoo(1)
+            try:
+                hist = yf.Ticker(ticker).history(start=start_date, end=end_date)
+            except Exception as e:
+                if not _is_throttled(e):
+                    print(f"Error fetching {ticker}: {e}")
+                    break
+                _record_yahoo_response(throttled=True)
+                if attempt == YAHOO_LIMITS["max_retries"]:
+                    print(f"Error fetching {ticker}: still rate limited after {attempt} retries")
+                    _note_yahoo_failures([ticker])
+            else:
+                _record_yahoo_response(throttled=False)
+                break
+    finally:
+        _land_flights(owned, {key: hist})
+    return hist
+
+
+def _store_path(ticker: str) -> Path:
+    """Path of a ticker's file in the price store."""
+    return PRICE_STORE["dir"] / f"{quote(ticker, safe='')}.npy"
+
+
+def load_stored_history(ticker: str) -> Optional[pd.DataFrame]:
+    """Load a ticker's stored daily bars, or None if it isn't stored.
+    
+    The file holds one row per column (day number, then OHLCV), so each column
+    is contiguous on disk and is read straight from the memory map.
+    """
+    path = _store_path(ticker)
+    try:
+        columns = np.load(path, mmap_mode="r")
+        # Record the read so eviction keeps recently used tickers
+        os.utime(path, (time.time(), path.stat().st_mtime))
+    except (FileNotFoundError, ValueError):
+        return None
+    
+    index = pd.to_datetime(np.asarray(columns[0], dtype="int64"), unit="D")
+    hist = pd.DataFrame(
+        {name: columns[i + 1] for i, name in enumerate(STORE_COLUMNS)},
+        index=index,
+    )
+    
+    # A leading day without prices marks where the stored window was fetched
+    # from; Yahoo had no bars before the first real one (e.g. a recent listing)
+    if len(hist) and np.isnan(hist["Close"].iloc[0]):
+        covered_from = hist.index[0]
+        hist = hist.iloc[1:]
+        hist.attrs["covered_from"] = covered_from
+    return hist
+
+
+def _store_frame(hist: pd.DataFrame) -> pd.DataFrame:
+    """Fetched bars in the store's shape: STORE_COLUMNS as float64, indexed by naive day."""
+    index = hist.index
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_localize(None)
+    return pd.DataFrame(
+        {name: hist[name].to_numpy() if name in hist else 0.0 for name in STORE_COLUMNS},
+        index=index.normalize(),
+    ).astype("float64")
+
+
+def save_stored_history(ticker: str, hist: pd.DataFrame, stored: Optional[pd.DataFrame] = None, covered_from: Optional[datetime] = None) -> pd.DataFrame:
+    """Merge freshly fetched bars into a ticker's stored history and write it back.
+    
+    Fresh bars replace stored bars for the same day, so a partial intraday bar
+    is overwritten on the next fetch. `covered_from` is the start of the window
+    `hist` was fetched for, when nothing is merged into; it is kept across
+    later merges. Returns the merged history.
+    """
+    fresh = _store_frame(hist)
+    merged = fresh if stored is None else pd.concat([stored, fresh])
+    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+    
+    days = merged.index.values.astype("datetime64[D]").astype("int64")
+    columns = np.vstack([days.astype("float64")] + [merged[name].to_numpy() for name in STORE_COLUMNS])
+    
+    if covered_from is None and stored is not None:
+        covered_from = stored.attrs.get("covered_from")
+    if covered_from is not None and pd.Timestamp(covered_from).normalize() < merged.index[0]:
+        covered_from = pd.Timestamp(covered_from).normalize()
+        merged.attrs["covered_from"] = covered_from
+        marker = np.full((len(columns), 1), np.nan)
+        marker[0, 0] = np.datetime64(covered_from, "D").astype("int64")
+        columns = np.hstack([marker, columns])
+    
+    path = _store_path(ticker)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, columns)
+    os.replace(tmp_path, path)
+    
+    return merged
+
+
+def _history_start(start_date: datetime, end_date: datetime) -> datetime:
+    """Start of the window kept in the store: the longest date range, or start_date if earlier."""
+    return min(start_date, end_date - timedelta(days=HISTORY_DAYS))
+
+
+def _missing_start(ticker: str, stored: Optional[pd.DataFrame], start_date: datetime) -> Optional[datetime]:
+    """First date that has to be fetched to cover start_date, or None if the store is current."""
+    if stored is None or stored.empty:
+        return start_date
+    if stored.attrs.get("covered_from", stored.index[0]) - start_date > timedelta(days=PRICE_STORE["gap_days"]):
+        return start_date
+    try:
+        refreshed = _store_path(ticker).stat().st_mtime
+    except FileNotFoundError:
+        return start_date  # evicted since it was loaded
+    if time.time() - refreshed < PRICE_STORE["refresh_seconds"]:
+        return None
+    # Refetch the last two stored bars: the last may have been a partial trading
+    # day, and the one before shows whether Yahoo has re-adjusted the history
+    return stored.index[-min(2, len(stored))].to_pydatetime()
+
+
+def _history_rescaled(stored: Optional[pd.DataFrame], hist: Optional[pd.DataFrame]) -> bool:
+    """Whether freshly fetched bars disagree with the stored closes of the days both cover.
+    
+    Yahoo's auto-adjusted prices are rescaled after a split or dividend, so the
+    stored history is then on a different scale than new bars. The last stored
+    day is left out, as it may have been a partial trading day.
+    """
+    if stored is None or hist is None or hist.empty:
+        return False
+    fresh = _store_frame(hist)
+    days = stored.index[:-1].intersection(fresh.index)
+    return not np.allclose(stored["Close"].loc[days], fresh["Close"].loc[days], rtol=1e-4, equal_nan=True)
+
+
+def slice_history(hist: Optional[pd.DataFrame], start_date: datetime, end_date: datetime) -> Optional[pd.DataFrame]:
+    """Bars of a stored history that fall within [start_date, end_date)."""
+    if hist is None:
+        return None
+    dates = hist.index.values
+    first = np.searchsorted(dates, np.datetime64(start_date))
+    last = np.searchsorted(dates, np.datetime64(end_date))
+    return hist.iloc[first:last]
+
+
+def get_history(ticker: str, start_date: datetime, end_date: datetime) -> Optional[pd.DataFrame]:
+    """Get a ticker's price history, fetching only the bars missing from the store.
+    
+    The store is always filled for the longest date range, so any shorter range
+    is a slice of data that is already local. When Yahoo has re-adjusted the
+    ticker's prices since they were stored, the whole window is fetched again.
+    """
+    stored = load_stored_history(ticker)
+    window_start = _history_start(start_date, end_date)
+    fetch_start = _missing_start(ticker, stored, window_start)
+    if fetch_start is not None:
+        fresh = _fetch_history(ticker, fetch_start, end_date)
+        if fetch_start != window_start and _history_rescaled(stored, fresh):
+            fetch_start = window_start
+            fresh = _fetch_history(ticker, window_start, end_date)
+        if fresh is not None and not fresh.empty:
+            if fetch_start == window_start:
+                stored = save_stored_history(ticker, fresh, covered_from=window_start)
+            else:
+                stored = save_stored_history(ticker, fresh, stored)
+    return slice_history(stored, start_date, end_date)
+
+
+def get_range_metrics(ticker: str, end_date: Optional[datetime] = None) -> dict:
+    """Report metrics for every date range, sliced from one stored history.
+    
+    Returns a dict of range key -> metrics dict (or None when the range has no bars).
+    """
+    end_date = end_date or datetime.now()
+    hist = get_history(ticker, end_date - timedelta(days=HISTORY_DAYS), end_date)
+    return {
+        key: summarize_history(ticker, slice_history(hist, end_date - timedelta(days=days), end_date))
+        for key, (_, days) in DATE_RANGES.items()
+    }
+
+
+def store_usage() -> dict:
+    """Number of tickers and bytes held in the price store."""
+    sizes = []
+    for path in PRICE_STORE["dir"].glob("*.npy"):
+        try:
+            sizes.append(path.stat().st_size)
+        except FileNotFoundError:
+            pass  # evicted by another thread
+    return {
+        "tickers": len(sizes),
+        "bytes": sum(sizes),
+    }
+
+
+def evict_store(max_bytes: Optional[int] = None, max_idle_days: Optional[int] = None) -> list[str]:
+    """Remove idle tickers, then least recently used ones until the store fits max_bytes.
+    
+    Returns the evicted file names.
+    """
+    max_bytes = PRICE_STORE["max_bytes"] if max_bytes is None else max_bytes
+    max_idle_days = PRICE_STORE["max_idle_days"] if max_idle_days is None else max_idle_days
+    
+    entries = []
+    for path in PRICE_STORE["dir"].glob("*.npy"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue  # evicted by another thread
+        entries.append((stat.st_atime, stat.st_size, path))
+    entries.sort()
+    
+    total = sum(size for _, size, _ in entries)
+    idle_cutoff = time.time() - max_idle_days * 86400
+    evicted = []
+    for last_used, size, path in entries:
+        if total <= max_bytes and last_used >= idle_cutoff:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        evicted.append(path.name)
+    
+    return evicted
+
+
 def get_ticker_data(ticker: str, start_date: datetime, end_date: datetime) -> dict:
     """Fetch data for a single ticker."""
-    try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(start=start_date, end=end_date)
-        
-        if hist.empty:
-            return None
+    return summarize_history(ticker, get_history(ticker, start_date, end_date))
+
+
+def load_universe(path) -> list[str]:
+    """Load tickers from a text file.
+    
+    Tickers are separated by newlines, commas or whitespace; `#` starts a comment.
+    """
+    tickers = []
+    for line in Path(path).read_text().splitlines():
+        line = line.split("#", 1)[0]
+        tickers += [t.strip().upper() for t in line.replace(",", " ").split()]
+    return list(dict.fromkeys(tickers))
+
+
+def get_movers_tickers(asset_class: str) -> list[str]:
+    """Get the ticker universe used for an asset class's top movers."""
+    if UNIVERSE_DIR:
+        universe_file = Path(UNIVERSE_DIR) / f"{asset_class.lower()}.txt"
+        if universe_file.exists():
+            return load_universe(universe_file)
+    
+    if asset_class == "Stocks":
+        return ASSET_CLASSES["Stocks"]["top_stocks"]
+    elif asset_class in ASSET_CLASSES:
+        return ASSET_CLASSES[asset_class].get("indices", []) + ASSET_CLASSES[asset_class].get("etfs", [])
+    return []
+
+
+def get_report_tickers(asset_class: str, region: str) -> list[str]:
+    """Collect every ticker a report needs, in order and without duplicates."""
+    tickers = list(INDICES.get(region, INDICES["US"]))
+    movers = get_movers_tickers(asset_class)
+    # Large movers universes are fetched chunk by chunk by get_top_movers
+    if len(movers) <= FETCH_CONFIG["movers_chunk"]:
+        tickers += movers
+    if asset_class == "Stocks" and region == "US":
+        tickers += list(SECTOR_ETFS)
+    return list(dict.fromkeys(tickers))
+
+
+def _request_batch(tickers: list[str], start_date: datetime, end_date: datetime) -> dict:
+    """Download history for many tickers with multi-symbol Yahoo requests.
+    
+    Each ticker counts against the request budget. Tickers Yahoo throttled are
+    retried after backing off; ones still throttled after max_retries are noted
+    as failures for the current report.
+    """
+    histories = {}
+    remaining = tickers
+    for attempt in range(YAHOO_LIMITS["max_retries"] + 1):
+        _acquire_yahoo(len(remaining))
+        _yahoo_log.throttled = throttled = set()
+        try:
+            data = yf.download(
+                remaining,
+                start=start_date,
+                end=end_date,
+                group_by="ticker",
+                auto_adjust=True,
+                threads=True,
+                progress=False,
+            )
+        except Exception as e:
+            if not _is_throttled(e):
+                print(f"Error fetching batch {remaining}: {e}")
+                remaining = []
+                break
+            data = None
+            throttled.update(remaining)
+        finally:
+            _yahoo_log.throttled = None
         
-        change, pct_change = calculate_change(hist)
+        if data is not None and not data.empty:
+            # Older yfinance returns flat columns for a single symbol
+            if data.columns.nlevels == 1:
+                histories[remaining[0]] = data.dropna(how="all")
+            else:
+                symbols = set(data.columns.get_level_values(0))
+                histories.update({t: data[t].dropna(how="all") for t in remaining if t in symbols})
         
-        return {
-            "ticker": ticker,
-            "current": hist['Close'].iloc[-1],
-            "change": change,
-            "pct_change": pct_change,
-            "high": hist['High'].max(),
-            "low": hist['Low'].min(),
-            "volume": hist['Volume'].sum() if 'Volume' in hist else 0,
-        }
-    except Exception as e:
-        print(f"Error fetching {ticker}: {e}")
-        return None
+        remaining = [t for t in remaining if t in throttled and histories.get(t, pd.DataFrame()).empty]
+        _record_yahoo_response(throttled=bool(remaining))
+        if not remaining:
+            break
+    
+    if remaining:
+        print(f"Error fetching {', '.join(remaining)}: still rate limited after {YAHOO_LIMITS['max_retries']} retries")
+        _note_yahoo_failures(remaining)
+    
+    return histories
 
 
-def get_market_indices(region: str, start_date: datetime, end_date: datetime) -> list[dict]:
+def _download_batch(tickers: list[str], start_date: datetime, end_date: datetime) -> dict:
+    """Download history for many tickers, sharing tickers already being fetched.
+    
+    Tickers another caller is fetching for the same window are awaited instead
+    of requested again; the rest go out in one multi-symbol request.
+    """
+    keys = {ticker: _flight_key(ticker, start_date, end_date) for ticker in tickers}
+    owned, waiting = _claim_flights(keys.values())
+    to_fetch = [ticker for ticker in tickers if keys[ticker] in owned]
+    
+    histories = {}
+    try:
+        if to_fetch:
+            histories = _request_batch(to_fetch, start_date, end_date)
+    finally:
+        _land_flights(owned, {keys[ticker]: histories.get(ticker) for ticker in to_fetch})
+    
+    for ticker in tickers:
+        if keys[ticker] in waiting:
+            hist = waiting[keys[ticker]].result()
+            if hist is not None:
+                histories[ticker] = hist
+    
+    return histories
+
+
+def fetch_history_batch(tickers: list[str], start_date: datetime, end_date: datetime) -> dict:
+    """Fetch history for many tickers with multi-symbol requests.
+    
+    Only bars missing from the local store are downloaded: tickers already in
+    the store share one request for their recent tail, and tickers that aren't
+    stored yet share one request for the longest date range. Stored tickers
+    whose tail shows Yahoo has re-adjusted their prices (a split or dividend)
+    join the second request. Tickers refreshed within the last refresh_seconds
+    aren't requested at all. Returns a dict of ticker -> history DataFrame.
+    Tickers with no data are left out.
+    """
+    if not tickers:
+        return {}
+    
+    window_start = _history_start(start_date, end_date)
+    stored = {ticker: load_stored_history(ticker) for ticker in tickers}
+    missing = {ticker: _missing_start(ticker, hist, window_start) for ticker, hist in stored.items()}
+    cold = [ticker for ticker in tickers if missing[ticker] == window_start]
+    warm = [ticker for ticker in tickers if missing[ticker] not in (None, window_start)]
+    
+    if warm:
+        for ticker, hist in _download_batch(warm, min(missing[ticker] for ticker in warm), end_date).items():
+            if _history_rescaled(stored[ticker], hist):
+                cold.append(ticker)
+            elif not hist.empty:
+                stored[ticker] = save_stored_history(ticker, hist, stored[ticker])
+    
+    if cold:
+        for ticker, hist in _download_batch(cold, window_start, end_date).items():
+            if not hist.empty:
+                stored[ticker] = save_stored_history(ticker, hist, covered_from=window_start)
+    
+    histories = {}
+    for ticker, hist in stored.items():
+        hist = slice_history(hist, start_date, end_date)
+        if hist is not None and not hist.empty:
+            histories[ticker] = hist
+    
+    return histories
+
+
+def _get_fetch_pool() -> ThreadPoolExecutor:
+    """Shared worker pool that bounds how many ticker requests are in flight."""
+    global _fetch_pool
+    with _fetch_pool_lock:
+        if _fetch_pool is None:
+            _fetch_pool = ThreadPoolExecutor(
+                max_workers=FETCH_CONFIG["max_in_flight"],
+                thread_name_prefix="market-fetch",
+            )
+        return _fetch_pool
+
+
+def fetch_history_parallel(tickers: list[str], start_date: datetime, end_date: datetime, deadline: Optional[float] = None) -> dict:
+    """Fetch history for many tickers concurrently, one request per ticker.
+    
+    `deadline` is a time.monotonic() timestamp. Tickers that haven't returned by
+    then are skipped, so the result may be partial.
+    """
+    if not tickers:
+        return {}
+    
+    pool = _get_fetch_pool()
+    futures = {_submit(pool, get_history, ticker, start_date, end_date): ticker for ticker in tickers}
+    timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+    done, pending = wait(futures, timeout=timeout)
+    
+    if pending:
+        for future in pending:
+            future.cancel()
+        print(f"Deadline reached, skipping {', '.join(futures[f] for f in pending)}")
+    
+    histories = {}
+    for future in done:
+        try:
+            hist = future.result()
+        except Exception as e:
+            # e.g. an unreadable store file; the report goes on without the ticker
+            print(f"Error fetching {futures[future]}: {e}")
+            continue
+        if hist is not None and not hist.empty:
+            histories[futures[future]] = hist
+    
+    return histories
+
+
+def get_market_indices(region: str, start_date: datetime, end_date: datetime, histories: Optional[dict] = None, deadline: Optional[float] = None) -> list[dict]:
     """Get market indices for a region."""
     indices = INDICES.get(region, INDICES["US"])
+    if histories is None:
+        histories = fetch_history_parallel(list(indices), start_date, end_date, deadline)
+    metrics = summarize_histories({t: histories[t] for t in indices if t in histories})
     results = []
     
     for ticker, name in indices.items():
-        data = get_ticker_data(ticker, start_date, end_date)
+        data = metrics.get(ticker)
         if data:
             data["name"] = name
             results.append(data)
@@ -148,12 +871,15 @@ def get_market_indices(region: str, start_date: datetime, end_date: datetime) ->
     return results
 
 
-def get_sector_performance(start_date: datetime, end_date: datetime) -> list[dict]:
+def get_sector_performance(start_date: datetime, end_date: datetime, histories: Optional[dict] = None, deadline: Optional[float] = None) -> list[dict]:
     """Get sector ETF performance."""
+    if histories is None:
+        histories = fetch_history_parallel(list(SECTOR_ETFS), start_date, end_date, deadline)
+    metrics = summarize_histories({t: histories[t] for t in SECTOR_ETFS if t in histories})
     results = []
     
     for ticker, name in SECTOR_ETFS.items():
-        data = get_ticker_data(ticker, start_date, end_date)
+        data = metrics.get(ticker)
         if data:
             data["name"] = name
             results.append(data)
@@ -161,25 +887,64 @@ def get_sector_performance(start_date: datetime, end_date: datetime) -> list[dic
     return sorted(results, key=lambda x: x["pct_change"], reverse=True)
 
 
-def get_top_movers(asset_class: str, start_date: datetime, end_date: datetime, top_n: int = 5) -> tuple[list, list]:
-    """Get top gainers and losers for an asset class."""
-    tickers = []
+def fetch_histories(tickers: list[str], start_date: datetime, end_date: datetime, deadline: Optional[float] = None) -> dict:
+    """Fetch history with the configured mode, falling back to parallel if the batch fails."""
+    if FETCH_CONFIG["mode"] == "batch":
+        histories = fetch_history_batch(tickers, start_date, end_date)
+        if histories:
+            return histories
+    return fetch_history_parallel(tickers, start_date, end_date, deadline)
+
+
+def select_top_bottom(values: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Positions of the n largest values (descending) and n smallest (ascending).
     
-    if asset_class == "Stocks":
-        tickers = ASSET_CLASSES["Stocks"]["top_stocks"]
-    elif asset_class in ASSET_CLASSES:
-        tickers = ASSET_CLASSES[asset_class].get("indices", []) + ASSET_CLASSES[asset_class].get("etfs", [])
+    Uses argpartition so only the selected 2n values get sorted, not the whole array.
+    """
+    if len(values) <= n:
+        order = np.argsort(-values, kind="stable")
+        return order, order[::-1]
     
-    results = []
-    for ticker in tickers:
-        data = get_ticker_data(ticker, start_date, end_date)
-        if data:
-            results.append(data)
+    top = np.argpartition(-values, n - 1)[:n]
+    bottom = np.argpartition(values, n - 1)[:n]
+    return top[np.argsort(-values[top], kind="stable")], bottom[np.argsort(values[bottom], kind="stable")]
+
+
+def get_top_movers(asset_class: str, start_date: datetime, end_date: datetime, top_n: int = 5, histories: Optional[dict] = None, deadline: Optional[float] = None, universe: Optional[list[str]] = None) -> tuple[list, list]:
+    """Get top gainers and losers for an asset class.
+    
+    `universe` overrides the asset class's tickers. Tickers are processed in
+    chunks of movers_chunk: each chunk's histories are reduced to metric arrays
+    and dropped, so memory doesn't grow with a full history per symbol.
+    """
+    tickers = get_movers_tickers(asset_class) if universe is None else universe
+    histories = histories or {}
+    chunk_size = FETCH_CONFIG["movers_chunk"]
+    
+    symbols = []
+    chunks = {name: [] for name in ("bars", "current", "change", "pct_change", "high", "low", "volume")}
+    for i in range(0, len(tickers), chunk_size):
+        chunk = tickers[i:i + chunk_size]
+        chunk_histories = {t: histories[t] for t in chunk if t in histories}
+        missing = [t for t in chunk if t not in chunk_histories]
+        if missing and (deadline is None or time.monotonic() < deadline):
+            chunk_histories.update(fetch_histories(missing, start_date, end_date, deadline))
+        
+        chunk_symbols, matrices = build_price_matrix(chunk_histories)
+        metrics = compute_metrics(matrices)
+        has_data = np.flatnonzero(metrics["bars"] > 0)
+        symbols += [chunk_symbols[col] for col in has_data]
+        for name, parts in chunks.items():
+            parts.append(metrics[name][has_data])
+    
+    if not symbols:
+        return [], []
     
-    sorted_results = sorted(results, key=lambda x: x["pct_change"], reverse=True)
+    metrics = {name: np.concatenate(parts) for name, parts in chunks.items()}
+    top, bottom = select_top_bottom(metrics["pct_change"], top_n)
     
-    gainers = sorted_results[:top_n]
-    losers = sorted_results[-top_n:][::-1] if len(sorted_results) > top_n else []
+    gainers = [_metrics_row(symbols, metrics, col) for col in top]
+    losers = [_metrics_row(symbols, metrics, col) for col in bottom] if len(symbols) > top_n else []
     
     return gainers, losers
 
@@ -204,6 +969,25 @@ def generate_market_report(
     start_date, end_date = get_date_range(date_range)
     range_label = DATE_RANGES.get(date_range, ("1 Week", 7))[0]
     
+    deadline = time.monotonic() + FETCH_CONFIG["report_deadline"]
+    failures = set()
+    failures_token = _yahoo_failures.set(failures)
+    
+    # One multi-symbol request for every section of the report. In parallel
+    # mode, or if the batch request fails, each section fetches its own tickers.
+    histories = None
+    if FETCH_CONFIG["mode"] == "batch":
+        histories = fetch_history_batch(get_report_tickers(asset_class, region), start_date, end_date) or None
+    
+    # Build the sections concurrently
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="market-section") as sections:
+        indices_job = _submit(sections, get_market_indices, region, start_date, end_date, histories, deadline)
+        movers_job = _submit(sections, get_top_movers, asset_class, start_date, end_date, 5, histories, deadline)
+        sectors_job = None
+        if asset_class == "Stocks" and region == "US":
+            sectors_job = _submit(sections, get_sector_performance, start_date, end_date, histories, deadline)
+    _yahoo_failures.reset(failures_token)
+    
     report_parts = []
     
     # Header
@@ -216,7 +1000,7 @@ def generate_market_report(
     
     # Market Indices
     report_parts.append("## 📈 Market Indices")
-    indices = get_market_indices(region, start_date, end_date)
+    indices = indices_job.result()
     
     if indices:
         report_parts.append("| Index | Current | Change |")
@@ -231,7 +1015,7 @@ def generate_market_report(
     
     # Top Movers
     report_parts.append("## 🚀 Top Movers")
-    gainers, losers = get_top_movers(asset_class, start_date, end_date)
+    gainers, losers = movers_job.result()
     
     if gainers:
         report_parts.append("### 📈 Top Gainers")
@@ -248,9 +1032,9 @@ def generate_market_report(
     report_parts.append("")
     
     # Sector Performance (only for US Stocks)
-    if asset_class == "Stocks" and region == "US":
+    if sectors_job is not None:
         report_parts.append("## 🏭 Sector Performance")
-        sectors = get_sector_performance(start_date, end_date)
+        sectors = sectors_job.result()
         
         if sectors:
             report_parts.append("| Sector | Change |")
@@ -260,8 +1044,13 @@ def generate_market_report(
     
     report_parts.append("")
     report_parts.append("---")
+    if failures:
+        report_parts.append(f"*⚠️ Yahoo Finance is rate limiting requests; missing data for: {', '.join(sorted(failures))}*")
+        report_parts.append("")
     report_parts.append(f"*Data from Yahoo Finance | Generated {datetime.now().strftime('%Y-%m-%d %H:%M')}*")
     
+    evict_store()
+    
     return "\n".join(report_parts)
 
 
@@ -0,0 +1,244 @@
+"""Tests for the financial market module. Run with: python -m pytest"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+import yfinance as yf
+
+import financial_market as fm
+
+
+def offline(*args, **kwargs):
+    raise ConnectionError("network is unreachable")
+
+
+class OfflineTicker:
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    def history(self, *args, **kwargs):
+        offline()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setitem(fm.PRICE_STORE, "dir", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def no_network(store, monkeypatch):
+    monkeypatch.setattr(yf, "download", offline)
+    monkeypatch.setattr(yf, "Ticker", OfflineTicker)
+
+
+def test_summarize_histories_without_symbols():
+    assert fm.summarize_histories({}) == {}
+
+
+def test_compute_metrics_without_rows():
+    _, matrices = fm.build_price_matrix({"AAPL": pd.DataFrame(columns=fm.STORE_COLUMNS, index=pd.DatetimeIndex([]))})
+    metrics = fm.compute_metrics(matrices)
+    assert list(metrics["bars"]) == [0]
+
+
+@pytest.mark.parametrize("mode", ["batch", "parallel"])
+def test_report_when_network_fails(no_network, monkeypatch, mode):
+    monkeypatch.setitem(fm.FETCH_CONFIG, "mode", mode)
+    report = fm.generate_market_report(date_range="1w", asset_class="Stocks", region="US")
+
+    assert "*Unable to fetch index data*" in report
+    assert "## 🚀 Top Movers" in report
+    assert "rate limiting" not in report
+    assert not list(fm.PRICE_STORE["dir"].iterdir())
+
+
+def test_top_movers_when_network_fails(no_network):
+    start, end = fm.get_date_range("1m")
+    assert fm.get_top_movers("Crypto", start, end) == ([], [])
+
+
+class FakeYahoo:
+    """Daily bars for one ticker, listed on `listed`, whose adjusted prices are divided by `scale`."""
+
+    def __init__(self, listed):
+        self.listed = pd.Timestamp(listed)
+        self.scale = 1.0
+        self.requests = []
+
+    def close(self, days):
+        return (100.0 + (days - pd.Timestamp("2000-01-03")).days.to_numpy() / 10) / self.scale
+
+    def bars(self, start, end):
+        self.requests.append(pd.Timestamp(start).normalize())
+        days = pd.bdate_range(max(pd.Timestamp(start).normalize(), self.listed), pd.Timestamp(end), inclusive="left")
+        close = self.close(days)
+        return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1000.0}, index=days)
+
+    def ticker(self, symbol):
+        yahoo = self
+
+        class Ticker:
+            def history(self, start, end):
+                return yahoo.bars(start, end)
+
+        return Ticker()
+
+    def download(self, tickers, start, end, **kwargs):
+        return pd.concat({t: self.bars(start, end) for t in tickers[:1]}, axis=1)
+
+
+@pytest.fixture
+def yahoo(store, monkeypatch):
+    fake = FakeYahoo(listed="2000-01-03")
+    monkeypatch.setattr(yf, "Ticker", fake.ticker)
+    monkeypatch.setattr(yf, "download", fake.download)
+    # Every call refreshes the tail from Yahoo
+    monkeypatch.setitem(fm.PRICE_STORE, "refresh_seconds", 0)
+    return fake
+
+
+def fetch(mode, start, end):
+    if mode == "batch":
+        return fm.fetch_history_batch(["AAPL"], start, end).get("AAPL")
+    return fm.get_history("AAPL", start, end)
+
+
+@pytest.mark.parametrize("mode", ["batch", "parallel"])
+def test_store_is_refetched_after_a_split(yahoo, mode):
+    start, end = fm.get_date_range("1y")
+    fetch(mode, start, end)
+    yahoo.scale = 2.0  # 2:1 split: Yahoo halves every adjusted price
+
+    hist = fetch(mode, start, end)
+
+    assert yahoo.requests[-1] == pd.Timestamp(fm._history_start(start, end)).normalize()
+    assert np.allclose(hist["Close"].to_numpy(), yahoo.close(hist.index))
+
+
+@pytest.mark.parametrize("mode", ["batch", "parallel"])
+def test_unchanged_store_only_fetches_the_tail(yahoo, mode):
+    start, end = fm.get_date_range("1y")
+    fetch(mode, start, end)
+    fetch(mode, start, end)
+
+    assert len(yahoo.requests) == 2
+    assert yahoo.requests[1] > pd.Timestamp(start) + pd.Timedelta(days=300)
+
+
+@pytest.mark.parametrize("mode", ["batch", "parallel"])
+def test_recent_listing_is_not_refetched_in_full(yahoo, mode):
+    start, end = fm.get_date_range("1y")
+    yahoo.listed = pd.Timestamp(end).normalize() - pd.Timedelta(days=60)
+    fetch(mode, start, end)
+    hist = fetch(mode, start, end)
+
+    assert len(yahoo.requests) == 2
+    assert yahoo.requests[1] > yahoo.listed
+    assert hist.index[0] == yahoo.listed
+
+
+def test_store_files_removed_by_another_thread(yahoo, monkeypatch):
+    start, end = fm.get_date_range("1y")
+    fm.get_history("AAPL", start, end)
+    stored = fm.load_stored_history("AAPL")
+    # Another thread evicts a file between listing and stat
+    path_type = type(fm.PRICE_STORE["dir"])
+    glob = path_type.glob
+    monkeypatch.setattr(path_type, "glob", lambda self, pattern: [self / "GONE.npy", *glob(self, pattern)])
+
+    assert fm.evict_store(max_bytes=0) == ["AAPL.npy"]
+    assert fm.store_usage() == {"tickers": 0, "bytes": 0}
+    assert fm._missing_start("AAPL", stored, start) == start
+
+
+def test_parallel_fetch_skips_a_ticker_whose_store_fails(yahoo, monkeypatch):
+    load_stored_history = fm.load_stored_history
+
+    def failing_load(ticker):
+        if ticker == "MSFT":
+            raise OSError("Input/output error")
+        return load_stored_history(ticker)
+
+    monkeypatch.setattr(fm, "load_stored_history", failing_load)
+    start, end = fm.get_date_range("1y")
+
+    assert list(fm.fetch_history_parallel(["AAPL", "MSFT"], start, end)) == ["AAPL"]
+
+
+class FakeClock:
+    """time.monotonic for the Yahoo limiter; waiting on its condition moves the clock instead of sleeping."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def condition(self):
+        clock = self
+
+        class Condition(threading.Condition):
+            def wait(self, timeout=None):
+                clock.now += timeout
+                return False
+
+        return Condition()
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(fm.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(fm, "_yahoo_cond", clock.condition())
+    monkeypatch.setattr(fm, "_yahoo_state", {"tokens": 0.0, "updated": clock.now, "rate": 10.0, "backoff": 0.0, "blocked_until": 0.0})
+    for key, value in {"rate": 10.0, "burst": 50.0, "background_reserve": 0.5}.items():
+        monkeypatch.setitem(fm.YAHOO_LIMITS, key, value)
+    return clock
+
+
+def test_limiter_refills_at_its_rate(limiter):
+    fm._acquire_yahoo(5)
+    assert limiter.now == pytest.approx(1000.5)
+
+    limiter.now += 10  # idle long enough to fill the bucket, which holds at most burst
+    fm._acquire_yahoo(50)
+    assert limiter.now == pytest.approx(1010.5)
+    fm._acquire_yahoo(1)
+    assert limiter.now == pytest.approx(1010.6)
+
+
+def test_background_requests_leave_the_reserve(limiter):
+    limiter.now += 2  # 20 tokens
+    fm._acquire_yahoo(1)
+    assert limiter.now == pytest.approx(1002)
+
+    with fm.yahoo_priority(fm.BACKGROUND):
+        fm._acquire_yahoo(1)
+    # Waits for the 25-token reserve plus its own request: 19 -> 26 tokens
+    assert limiter.now == pytest.approx(1002.7)
+
+
+def test_priority_carries_over_to_worker_threads(limiter):
+    limiter.now += 2  # 20 tokens
+    with ThreadPoolExecutor(max_workers=1) as pool, fm.yahoo_priority(fm.BACKGROUND):
+        assert fm._submit(pool, fm._yahoo_priority.get).result() == fm.BACKGROUND
+        assert pool.submit(fm._yahoo_priority.get).result() == fm.INTERACTIVE
+        fm._submit(pool, fm._acquire_yahoo, 1).result()
+
+    assert limiter.now == pytest.approx(1002.6)
+
+
+def test_throttling_slows_the_limiter_down(limiter):
+    limiter.now += 5
+    fm._record_yahoo_response(throttled=True)
+    fm._acquire_yahoo(1)
+    # Held for the 1s backoff, then refilled at half the rate
+    assert limiter.now == pytest.approx(1006)
+    assert fm._yahoo_state["rate"] == 5.0
+
+    fm._record_yahoo_response(throttled=False)
+    assert fm._yahoo_state["rate"] == 6.0
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+LLM Backends
+One client for the CLIs' LLM calls: Groq (hosted) and Ollama (local), with
+pooled connections, per-backend limits and failover between the two.
+"""
+
+import itertools
+import json
+import os
+import requests
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Each backend has pooled keep-alive connections and a cap on concurrent calls;
+# Groq calls also stay within its free-tier per-minute limits. A call goes to
+# the first backend in LLM_ORDER that can take it, so one that is saturated or
+# down fails over to the other.
+LLM_BACKENDS = {
+    "groq": {
+        "url": "https://api.groq.com/openai/v1/chat/completions",
+        "api_key": os.getenv("GROQ_API_KEY", ""),
+        "model": os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"),
+        "max_concurrent": int(os.getenv("GROQ_MAX_CONCURRENT", "4")),
+        "rpm": int(os.getenv("GROQ_RPM", "30")),  # requests per minute
+        "tpm": int(os.getenv("GROQ_TPM", "6000")),  # prompt + completion tokens per minute
+        "timeout": 60,  # seconds to wait for the next part of the answer
+    },
+    "ollama": {
+        "host": os.getenv("OLLAMA_HOST", "http://localhost:11434"),
+        "model": os.getenv("OLLAMA_MODEL", "llama3.2"),
+        "keep_alive": os.getenv("OLLAMA_KEEP_ALIVE", "30m"),  # how long the model stays loaded after a call
+        # Context window in tokens; one value for every call, as Ollama reloads the model when it changes
+        "num_ctx": int(os.getenv("OLLAMA_NUM_CTX", "8192")),
+        "max_concurrent": int(os.getenv("OLLAMA_MAX_CONCURRENT", "1")),
+        "timeout": 120,  # seconds to wait for the model's next output
+    },
+}
+LLM_ORDER = [name.strip() for name in os.getenv("LLM_ORDER", "ollama,groq").split(",") if name.strip() in LLM_BACKENDS]
+LLM_MAX_WAIT = float(os.getenv("LLM_MAX_WAIT", "5"))  # seconds a saturated backend is waited for before failing over
+LLM_PARAMS = {"max_tokens": 1024, "temperature": 0.7}  # default sampling parameters
+
+
+class BackendUnavailable(Exception):
+    """An LLM backend can't take a call: not set up, saturated, or refusing it."""
+
+
+# Pooled keep-alive connections and concurrency slots, one set per backend
+llm_sessions = {name: requests.Session() for name in LLM_BACKENDS}
+_llm_slots = {name: threading.BoundedSemaphore(backend["max_concurrent"]) for name, backend in LLM_BACKENDS.items()}
+
+# Groq's per-minute request and token budgets, refilled continuously (token buckets)
+_groq_budget = {
+    "requests": LLM_BACKENDS["groq"]["rpm"],
+    "tokens": LLM_BACKENDS["groq"]["tpm"],
+    "updated": time.monotonic(),
+    "blocked_until": 0.0,  # set from Retry-After when Groq answers 429
+}
+_groq_budget_lock = threading.Lock()
+
+
+def reserve_groq(tokens):
+    """Take one request and `tokens` tokens from Groq's per-minute budgets.
+    
+    Waits for the budgets to refill if that takes at most LLM_MAX_WAIT
+    seconds; returns False (saturated) if it would take longer.
+    """
+    limits = LLM_BACKENDS["groq"]
+    # A prompt bigger than a minute's budget still goes out once the bucket is full
+    tokens = min(tokens, limits["tpm"])
+    deadline = time.monotonic() + LLM_MAX_WAIT
+    while True:
+        with _groq_budget_lock:
+            now = time.monotonic()
+            elapsed = now - _groq_budget["updated"]
+            _groq_budget["requests"] = min(limits["rpm"], _groq_budget["requests"] + elapsed * limits["rpm"] / 60)
+            _groq_budget["tokens"] = min(limits["tpm"], _groq_budget["tokens"] + elapsed * limits["tpm"] / 60)
+            _groq_budget["updated"] = now
+            wait_for = max(
+                _groq_budget["blocked_until"] - now,
+                (1 - _groq_budget["requests"]) * 60 / limits["rpm"],
+                (tokens - _groq_budget["tokens"]) * 60 / limits["tpm"],
+            )
+            if wait_for <= 0:
+                _groq_budget["requests"] -= 1
+                _groq_budget["tokens"] -= tokens
+                return True
+        if now + wait_for > deadline:
+            return False
+        time.sleep(wait_for)
+
+
+def settle_groq(reserved, used):
+    """Return the unused part of a token reservation once the call reports its usage."""
+    if used is not None:
+        with _groq_budget_lock:
+            _groq_budget["tokens"] += reserved - used
+
+
+def block_groq(seconds):
+    """Hold all Groq calls for `seconds`, as Groq asked in a 429."""
+    with _groq_budget_lock:
+        _groq_budget["blocked_until"] = max(_groq_budget["blocked_until"], time.monotonic() + seconds)
+
+
+@contextmanager
+def llm_slot(name):
+    """Hold one of a backend's concurrency slots, waiting at most LLM_MAX_WAIT for it."""
+    if not _llm_slots[name].acquire(timeout=LLM_MAX_WAIT):
+        raise BackendUnavailable(f"all {LLM_BACKENDS[name]['max_concurrent']} slots busy")
+    try:
+        yield
+    finally:
+        _llm_slots[name].release()
+
+
+def stream_groq(prompt, params):
+    """Tokens of a Groq chat completion, streamed as server-sent events."""
+    groq = LLM_BACKENDS["groq"]
+    if not groq["api_key"]:
+        raise BackendUnavailable("GROQ_API_KEY not set (get a free key at https://console.groq.com)")
+    with llm_slot("groq"):
+        # Groq counts prompt and completion tokens; reserve for the longest answer
+        reserved = len(prompt) // 4 + params["max_tokens"]
+        if not reserve_groq(reserved):
+            raise BackendUnavailable("per-minute rate limit reached")
+        used = None
+        try:
+            payload = {"model": groq["model"], "messages": [{"role": "user", "content": prompt}], "stream": True, **params}
+            headers = {"Authorization": f"Bearer {groq['api_key']}", "Content-Type": "application/json"}
+            with llm_sessions["groq"].post(groq["url"], headers=headers, json=payload, stream=True, timeout=groq["timeout"]) as response:
+                if response.status_code == 429:
+                    block_groq(float(response.headers.get("Retry-After", 60)))
+                    raise BackendUnavailable("rate limited by Groq")
+                response.raise_for_status()
+                done = False
+                # chunk_size=None hands each event over as it arrives. The stream is
+                # read to its end, past [DONE], so the connection goes back to the pool.
+                for line in response.iter_lines(chunk_size=None):
+                    if not line.startswith(b"data:"):
+                        continue  # blank separators and ": keep-alive" comments
+                    data = line[5:].strip()
+                    if data == b"[DONE]":
+                        done = True
+                        continue
+                    chunk = json.loads(data)
+                    usage = chunk.get("usage") or chunk.get("x_groq", {}).get("usage")
+                    if usage:
+                        used = usage.get("total_tokens")
+                    token = (chunk.get("choices") or [{}])[0].get("delta", {}).get("content")
+                    if token:
+                        yield token
+                if not done:
+                    raise RuntimeError("the answer was cut off")
+        finally:
+            settle_groq(reserved, used)
+
+
+def ollama_url(path):
+    host = LLM_BACKENDS["ollama"]["host"].rstrip("/")
+    # OLLAMA_HOST is often set without a scheme (e.g. "127.0.0.1:11434")
+    return f"{host if '://' in host else 'http://' + host}{path}"
+
+
+def stream_ollama(prompt, params):
+    """Tokens of a local Ollama completion, yielded as the model generates them.
+    
+    The model stays loaded for `keep_alive` after the call, so the next call
+    doesn't wait for it to load again.
+    """
+    ollama = LLM_BACKENDS["ollama"]
+    payload = {
+        "model": ollama["model"],
+        "prompt": prompt,
+        "stream": True,
+        "keep_alive": ollama["keep_alive"],
+        "options": {
+            "num_ctx": ollama["num_ctx"],
+            "num_predict": params["max_tokens"],
+            "temperature": params["temperature"],
+        },
+    }
+    with llm_slot("ollama"):
+        try:
+            response = llm_sessions["ollama"].post(ollama_url("/api/generate"), json=payload, stream=True, timeout=ollama["timeout"])
+        except requests.ConnectionError:
+            raise BackendUnavailable("not running (start it with `ollama serve`, install from https://ollama.ai)")
+        with response:
+            if response.status_code != 200:
+                try:
+                    message = response.json().get("error")
+                except ValueError:
+                    message = None
+                raise BackendUnavailable(message or f"HTTP {response.status_code}")
+            # One JSON object per line, read to the end of the stream (past the
+            # "done" line) so the connection goes back to the pool
+            for line in response.iter_lines(chunk_size=None):
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                if chunk.get("response"):
+                    yield chunk["response"]
+
+
+LLM_STREAMS = {"groq": stream_groq, "ollama": stream_ollama}
+
+
+def start_completion(prompt, params=None):
+    """Start a completion on the first backend in LLM_ORDER that can take the call.
+    
+    A backend is passed over when it isn't set up, stays saturated (all its
+    concurrency slots busy, or Groq's per-minute budget spent) for more than
+    LLM_MAX_WAIT seconds, or fails before answering (429, server down). Once
+    a backend starts answering, the call stays with it. Returns the backend's
+    name and an iterator over the answer's tokens. Raises BackendUnavailable
+    when no backend can answer.
+    """
+    params = {**LLM_PARAMS, **(params or {})}
+    reasons = []
+    for name in LLM_ORDER:
+        tokens = LLM_STREAMS[name](prompt, params)
+        try:
+            first = next(tokens, "")
+        except Exception as e:
+            reasons.append(f"{name}: {e}")
+            continue
+        return name, itertools.chain([first], tokens)
+    raise BackendUnavailable("; ".join(reasons) or "no LLM backend configured")
+
+
+def stream_completion(prompt, params=None):
+    """Tokens of a completion from the first backend in LLM_ORDER that can take the call.
+    
+    `params` overrides LLM_PARAMS (max_tokens, temperature). See start_completion.
+    """
+    _, tokens = start_completion(prompt, params)
+    yield from tokens
+
+
+if __name__ == "__main__":
+    # Check which backend answers: python llm_backends.py "Say hello"
+    name, tokens = start_completion(" ".join(sys.argv[1:]) or "Say hello in 5 words")
+    print(f"[{name}] ", end="")
+    for token in tokens:
+        print(token, end="", flush=True)
+    print()
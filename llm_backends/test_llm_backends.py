@@ -0,0 +1,166 @@
+"""Tests for the LLM backends, against stub Ollama and Groq servers. Run with: python -m pytest"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import llm_backends as llm
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real servers
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.calls.append({"path": self.path, "body": body, "client": self.client_address})
+        status, headers, lines = self.server.reply(body)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for line in lines:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def start_stub():
+    """Starts stub servers; each answers POSTs with its `reply(body)` -> (status, headers, chunks)."""
+    servers = []
+
+    def start(reply):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        server.daemon_threads = True
+        server.calls = []
+        server.reply = reply
+        server.url = f"http://127.0.0.1:{server.server_port}"
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def ollama_reply(words, error=None):
+    lines = [json.dumps({"response": word, "done": False}).encode() + b"\n" for word in words]
+    if error:
+        lines.append(json.dumps({"error": error}).encode() + b"\n")
+    lines.append(json.dumps({"response": "", "done": True}).encode() + b"\n")
+    return lambda body: (200, {"Content-Type": "application/x-ndjson"}, lines)
+
+
+def groq_reply(words):
+    events = [b"data: " + json.dumps({"choices": [{"delta": {"content": word}}]}).encode() + b"\n\n" for word in words]
+    events.append(b"data: " + json.dumps({"choices": [{"delta": {}}], "x_groq": {"usage": {"total_tokens": 50}}}).encode() + b"\n\n")
+    events.append(b"data: [DONE]\n\n")
+    return lambda body: (200, {"Content-Type": "text/event-stream"}, events)
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    """Fresh sessions and Groq budget; only Ollama is tried unless a test says otherwise."""
+    monkeypatch.setattr(llm, "LLM_ORDER", ["ollama"])
+    monkeypatch.setattr(llm, "LLM_MAX_WAIT", 0.1)
+    monkeypatch.setattr(llm, "llm_sessions", {name: llm.requests.Session() for name in llm.LLM_BACKENDS})
+    monkeypatch.setitem(llm.LLM_BACKENDS["groq"], "api_key", "test-key")
+    for key, value in {"requests": 30, "tokens": 6000, "blocked_until": 0.0}.items():
+        monkeypatch.setitem(llm._groq_budget, key, value)
+
+
+@pytest.fixture
+def ollama(start_stub, backends, monkeypatch):
+    server = start_stub(ollama_reply(["Imagine ", "a ", "box."]))
+    # OLLAMA_HOST is often set without a scheme
+    monkeypatch.setitem(llm.LLM_BACKENDS["ollama"], "host", server.url.replace("http://", ""))
+    return server
+
+
+@pytest.fixture
+def groq(start_stub, backends, monkeypatch):
+    server = start_stub(groq_reply(["Hi ", "there"]))
+    monkeypatch.setitem(llm.LLM_BACKENDS["groq"], "url", f"{server.url}/openai/v1/chat/completions")
+    return server
+
+
+def test_ollama_streams_tokens(ollama):
+    tokens = list(llm.stream_completion("Explain DNS", {"max_tokens": 64}))
+
+    assert tokens == ["Imagine ", "a ", "box."]
+    call = ollama.calls[0]
+    assert call["path"] == "/api/generate"
+    assert call["body"]["stream"] is True
+    assert call["body"]["options"]["num_predict"] == 64
+
+
+def test_ollama_connection_is_reused(ollama):
+    for _ in range(3):
+        assert "".join(llm.stream_completion("Explain DNS")) == "Imagine a box."
+
+    assert len(ollama.calls) == 3
+    assert len({call["client"] for call in ollama.calls}) == 1
+
+
+def test_ollama_missing_model(ollama):
+    ollama.reply = lambda body: (404, {"Content-Type": "application/json"}, [b'{"error": "model \'llama3.2\' not found"}'])
+
+    with pytest.raises(llm.BackendUnavailable, match="not found"):
+        list(llm.stream_completion("Explain DNS"))
+
+
+def test_ollama_not_running(backends, monkeypatch):
+    monkeypatch.setitem(llm.LLM_BACKENDS["ollama"], "host", "http://127.0.0.1:1")
+
+    with pytest.raises(llm.BackendUnavailable, match="ollama serve"):
+        list(llm.stream_completion("Explain DNS"))
+
+
+def test_ollama_error_after_tokens(ollama):
+    ollama.reply = ollama_reply(["Imagine "], error="out of memory")
+    tokens = []
+
+    with pytest.raises(RuntimeError, match="out of memory"):
+        for token in llm.stream_completion("Explain DNS"):
+            tokens.append(token)
+
+    assert tokens == ["Imagine "]
+
+
+def test_groq_streams_server_sent_events(groq, monkeypatch):
+    monkeypatch.setattr(llm, "LLM_ORDER", ["groq"])
+
+    name, tokens = llm.start_completion("Explain DNS")
+
+    assert (name, list(tokens)) == ("groq", ["Hi ", "there"])
+    assert groq.calls[0]["body"]["stream"] is True
+
+
+def test_fails_over_when_groq_is_rate_limited(groq, ollama, monkeypatch):
+    monkeypatch.setattr(llm, "LLM_ORDER", ["groq", "ollama"])
+    groq.reply = lambda body: (429, {"Retry-After": "30"}, [])
+
+    name, tokens = llm.start_completion("Explain DNS")
+    assert (name, "".join(tokens)) == ("ollama", "Imagine a box.")
+
+    # Groq is held for its Retry-After, so the next call doesn't ask it again
+    name, tokens = llm.start_completion("Explain DNS")
+    assert (name, "".join(tokens)) == ("ollama", "Imagine a box.")
+    assert len(groq.calls) == 1
+
+
+def test_no_backend_available(backends, monkeypatch):
+    monkeypatch.setattr(llm, "LLM_ORDER", ["ollama", "groq"])
+    monkeypatch.setitem(llm.LLM_BACKENDS["ollama"], "host", "http://127.0.0.1:1")
+    monkeypatch.setitem(llm.LLM_BACKENDS["groq"], "api_key", "")
+
+    with pytest.raises(llm.BackendUnavailable, match="ollama: .*; groq: GROQ_API_KEY not set"):
+        list(llm.stream_completion("Explain DNS"))
@@ -4,73 +4,311 @@ Morning Tech Report Generator
 Fetches latest tech news from RSS feeds, analyzes with local LLM, emails report.
 """
 
-import feedparser
-import subprocess
+import random
+import re
+import requests
+import sqlite3
 import os
-from datetime import datetime, timedelta
+import sys
+import time
+import zlib
+from contextlib import closing
+from datetime import datetime
 from pathlib import Path
 
+# LLM backends (Groq and Ollama, with failover) are shared with the other CLIs
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "llm_backends"))
+from llm_backends import LLM_BACKENDS, BackendUnavailable, stream_completion
+
+# Feed fetching and caching are shared with the AI Feed
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "feeds"))
+from feeds import download_feeds, entry_timestamp, poll_feeds
+
 # Configuration
 CONFIG = {
-    "ollama": {
-        "model": os.getenv("OLLAMA_MODEL", "llama3.2"),  # or mistral, llama3, etc.
-    },
     "output_dir": Path(__file__).parent.parent / "ideas" / "daily_reports",
     "downloads_dir": Path.home() / "Downloads",
+    "archive": Path(os.getenv("ARTICLE_ARCHIVE", Path.home() / ".cache" / "easy_life_with_ai" / "articles.db")),
 }
 
+# "ttl": seconds a cached copy of the feed is used before asking the server again
 RSS_FEEDS = [
     # AI & Tech News
-    {"name": "MIT Tech Review", "url": "https://www.technologyreview.com/feed/", "category": "tech"},
-    {"name": "TechCrunch AI", "url": "https://techcrunch.com/category/artificial-intelligence/feed/", "category": "ai"},
-    {"name": "The Verge AI", "url": "https://www.theverge.com/rss/ai-artificial-intelligence/index.xml", "category": "ai"},
-    {"name": "Ars Technica", "url": "https://feeds.arstechnica.com/arstechnica/technology-lab", "category": "tech"},
-    {"name": "Hacker News", "url": "https://hnrss.org/frontpage", "category": "tech"},
-    # Research
-    {"name": "arXiv AI", "url": "https://rss.arxiv.org/rss/cs.AI", "category": "research"},
-    {"name": "arXiv LG", "url": "https://rss.arxiv.org/rss/cs.LG", "category": "research"},
+    {"name": "MIT Tech Review", "url": "https://www.technologyreview.com/feed/", "category": "tech", "ttl": 3600},
+    {"name": "TechCrunch AI", "url": "https://techcrunch.com/category/artificial-intelligence/feed/", "category": "ai", "ttl": 900},
+    {"name": "The Verge AI", "url": "https://www.theverge.com/rss/ai-artificial-intelligence/index.xml", "category": "ai", "ttl": 900},
+    {"name": "Ars Technica", "url": "https://feeds.arstechnica.com/arstechnica/technology-lab", "category": "tech", "ttl": 900},
+    {"name": "Hacker News", "url": "https://hnrss.org/frontpage", "category": "tech", "ttl": 300},
+    # Research (arXiv publishes once a day)
+    {"name": "arXiv AI", "url": "https://rss.arxiv.org/rss/cs.AI", "category": "research", "ttl": 21600},
+    {"name": "arXiv LG", "url": "https://rss.arxiv.org/rss/cs.LG", "category": "research", "ttl": 21600},
     # Funding & Business
-    {"name": "Crunchbase News", "url": "https://news.crunchbase.com/feed/", "category": "funding"},
+    {"name": "Crunchbase News", "url": "https://news.crunchbase.com/feed/", "category": "funding", "ttl": 3600},
 ]
 
-def fetch_feeds(hours_back=24):
-    """Fetch articles from RSS feeds published in the last N hours."""
-    cutoff = datetime.now() - timedelta(hours=hours_back)
-    articles = []
+# Every article ever fetched, one row per link, with a full-text index over titles and summaries
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    link TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL,
+    category TEXT NOT NULL,
+    published REAL,  -- unix time, NULL if the feed doesn't say
+    first_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_recent ON articles (COALESCE(published, first_seen));
+"""
+
+ARCHIVE_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, summary, content='articles', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, summary) VALUES (new.rowid, new.title, new.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, summary) VALUES ('delete', old.rowid, old.title, old.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, summary) VALUES ('delete', old.rowid, old.title, old.summary);
+    INSERT INTO articles_fts (rowid, title, summary) VALUES (new.rowid, new.title, new.summary);
+END;
+"""
+
+def open_archive():
+    """Connect to the article archive, creating it on first use.
     
+    Full-text search needs SQLite's FTS5 extension; without it the archive
+    still works and search falls back to substring matching.
+    """
+    path = CONFIG["archive"]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path, timeout=30)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(ARCHIVE_SCHEMA)
+    try:
+        db.executescript(ARCHIVE_FTS_SCHEMA)
+    except sqlite3.OperationalError:
+        pass
+    return db
+
+def has_fts(db):
+    """Whether the archive has its full-text index."""
+    return db.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'").fetchone() is not None
+
+def archive_feeds():
+    """Fetch every RSS feed and add its entries to the archive.
+    
+    Articles are keyed by link, so one seen again only has its text refreshed.
+    A link the web app's AI Feed archived first is taken over by the feed, so
+    recent_articles finds it. Returns the number of entries fetched.
+    """
+    feeds = download_feeds(RSS_FEEDS)
+    now = time.time()
+    rows = []
     for feed_info in RSS_FEEDS:
         try:
-            feed = feedparser.parse(feed_info["url"])
-            for entry in feed.entries[:10]:  # Limit per feed
-                # Parse published date
-                published = None
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    published = datetime(*entry.published_parsed[:6])
-                elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                    published = datetime(*entry.updated_parsed[:6])
-                
-                # Include if recent or if we can't determine date
-                if published is None or published > cutoff:
-                    articles.append({
-                        "title": entry.get("title", "No title"),
-                        "summary": entry.get("summary", "")[:500],
-                        "link": entry.get("link", ""),
-                        "source": feed_info["name"],
-                        "category": feed_info["category"],
-                        "published": published.isoformat() if published else "Unknown",
-                    })
+            feed = feeds[feed_info["url"]].result()
         except Exception as e:
             print(f"Error fetching {feed_info['name']}: {e}")
+            continue
+        for entry in feed.entries:
+            if entry.get("link"):
+                rows.append((
+                    entry["link"],
+                    entry.get("title", "No title"),
+                    entry.get("summary", ""),
+                    feed_info["name"],
+                    feed_info["category"],
+                    entry_timestamp(entry),
+                    now,
+                ))
+    
+    with closing(open_archive()) as db, db:
+        db.executemany(
+            """INSERT INTO articles (link, title, summary, source, category, published, first_seen)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (link) DO UPDATE SET
+                   title = excluded.title,
+                   summary = excluded.summary,
+                   source = excluded.source,
+                   category = excluded.category,
+                   published = COALESCE(excluded.published, published)""",
+            rows,
+        )
+    return len(rows)
+
+def article_from_row(row):
+    """Article dict as used by the report, from an archive row."""
+    published = row["published"]
+    return {
+        "title": row["title"],
+        "summary": row["summary"][:500],
+        "link": row["link"],
+        "source": row["source"],
+        "category": row["category"],
+        "published": datetime(*time.gmtime(published)[:6]).isoformat() if published is not None else "Unknown",
+    }
+
+def recent_articles(hours_back=24, per_source=10):
+    """Archived articles from the last N hours, at most `per_source` per feed, newest first.
+    
+    Articles without a date count from when they were first fetched. Only rows
+    from RSS_FEEDS are read: the web app archives its other feeds (e.g. the AI
+    Feed's Reddit posts) into the same database.
+    """
+    cutoff = time.time() - hours_back * 3600
+    feeds = [(feed_info["name"], feed_info["category"]) for feed_info in RSS_FEEDS]
+    with closing(open_archive()) as db:
+        rows = db.execute(
+            f"""SELECT * FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY source ORDER BY COALESCE(published, first_seen) DESC
+                    ) AS position
+                    FROM articles
+                    WHERE COALESCE(published, first_seen) > ?
+                      AND (source, category) IN (VALUES {", ".join(["(?, ?)"] * len(feeds))})
+                )
+                WHERE position <= ?""",
+            (cutoff, *(value for feed in feeds for value in feed), per_source),
+        ).fetchall()
+    
+    feed_order = {feed_info["name"]: i for i, feed_info in enumerate(RSS_FEEDS)}
+    rows.sort(key=lambda row: (feed_order.get(row["source"], len(feed_order)), row["position"]))
+    return [article_from_row(row) for row in rows]
+
+def search_articles(query, limit=20):
+    """Archived articles matching every word of `query`, best matches first."""
+    words = query.split()
+    if not words:
+        return []
+    with closing(open_archive()) as db:
+        if has_fts(db):
+            match = " ".join('"' + word.replace('"', '""') + '"' for word in words)
+            rows = db.execute(
+                """SELECT articles.* FROM articles_fts
+                   JOIN articles ON articles.rowid = articles_fts.rowid
+                   WHERE articles_fts MATCH ?
+                   ORDER BY rank LIMIT ?""",
+                (match, limit),
+            ).fetchall()
+        else:
+            conditions = " AND ".join(["(title LIKE ? OR summary LIKE ?)"] * len(words))
+            params = [f"%{word}%" for word in words for _ in range(2)]
+            rows = db.execute(
+                f"SELECT * FROM articles WHERE {conditions} ORDER BY COALESCE(published, first_seen) DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+    return [article_from_row(row) for row in rows]
+
+def fetch_feeds(hours_back=24, refresh=True):
+    """Articles from RSS feeds published in the last N hours.
     
-    return articles
+    Feeds are fetched into the article archive first (unless refresh=False),
+    then the articles are read from the archive, so a feed that is down
+    still contributes what earlier runs saved.
+    """
+    if refresh:
+        archive_feeds()
+    return recent_articles(hours_back)
+
+# Near-duplicate detection: the same story from several outlets is sent to
+# the LLM once. MinHash signatures over word shingles, bucketed with LSH.
+DEDUP = {
+    "num_hashes": 64,
+    "bands": 32,  # 32 bands of 2 hashes: stories ~50% similar almost always share a bucket
+    "threshold": 0.5,  # estimated Jaccard similarity at which two articles are the same story
+    "shingle_words": 2,  # words per shingle
+    "max_words": 60,  # words of title + summary that are compared
+}
+
+_MINHASH_PRIME = (1 << 61) - 1
+_minhash_rng = random.Random(17)
+_MINHASH_PARAMS = [
+    (_minhash_rng.randrange(1, _MINHASH_PRIME), _minhash_rng.randrange(_MINHASH_PRIME))
+    for _ in range(DEDUP["num_hashes"])
+]
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is",
+    "it", "its", "of", "on", "or", "that", "the", "this", "to", "was", "with", "will", "new",
+}
+
+def article_shingles(article):
+    """Hashed distinct word n-grams of an article's title and summary.
+    
+    Markup, links and stopwords are dropped first. Runs of words rather than
+    single words, so headlines that only share vocabulary ("X releases its
+    most capable model yet") don't look like the same story.
+    """
+    text = re.sub(r"<[^>]+>|https?://\S+", " ", f"{article['title']} {article.get('summary', '')}").lower()
+    words = [w for w in re.findall(r"[a-z0-9]+", text) if w not in STOPWORDS][:DEDUP["max_words"]]
+    if not words:
+        return []
+    n = DEDUP["shingle_words"]
+    shingles = {" ".join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))}
+    return [zlib.crc32(s.encode()) for s in shingles]
+
+def minhash_signature(shingles):
+    """MinHash signature of a set of hashed shingles."""
+    if not shingles:
+        return None
+    return [min((a * h + b) % _MINHASH_PRIME for h in shingles) for a, b in _MINHASH_PARAMS]
 
-def analyze_with_ollama(articles):
-    """Use local Ollama to analyze articles and generate insights."""
+def cluster_articles(articles):
+    """Group articles that cover the same story.
+    
+    Returns clusters (lists of articles) in order of each cluster's first
+    article, which is the cluster's representative. Each article joins the
+    most similar representative it shares an LSH bucket with, if their MinHash
+    signatures agree on at least DEDUP["threshold"] of hashes, and otherwise
+    starts a cluster of its own. Articles are only compared with
+    representatives, so a chain of loosely similar headlines isn't merged.
+    """
+    rows = DEDUP["num_hashes"] // DEDUP["bands"]
+    clusters = []  # (representative's signature, articles)
+    buckets = {}  # LSH bucket -> indexes of the clusters whose representative is in it
+    for article in articles:
+        signature = minhash_signature(article_shingles(article))
+        if signature is None:
+            clusters.append((None, [article]))
+            continue
+        keys = [(band, tuple(signature[band * rows:(band + 1) * rows])) for band in range(DEDUP["bands"])]
+        candidates = sorted({c for key in keys for c in buckets.get(key, ())})
+        agreement = {
+            c: sum(x == y for x, y in zip(signature, clusters[c][0])) / DEDUP["num_hashes"]
+            for c in candidates
+        }
+        best = max(candidates, key=agreement.get, default=None)
+        if best is not None and agreement[best] >= DEDUP["threshold"]:
+            clusters[best][1].append(article)
+            continue
+        for key in keys:
+            buckets.setdefault(key, []).append(len(clusters))
+        clusters.append((signature, [article]))
+    return [members for _, members in clusters]
+
+def story_sources(cluster):
+    """Names of the sources covering a story, e.g. "TechCrunch AI / Ars Technica"."""
+    return " / ".join(dict.fromkeys(a["source"] for a in cluster))
+
+# Sampling parameters for the briefing, which runs longer than most answers
+LLM_PARAMS = {"max_tokens": 2048, "temperature": 0.7}
+
+def analyze_with_ollama(articles, echo=False):
+    """Use local Ollama (or Groq when Ollama is saturated) to analyze articles and generate insights.
+    
+    With echo=True the analysis is printed as it's generated.
+    """
+    
+    # One entry per story, however many feeds covered it
+    stories = cluster_articles(articles)
     
     # Prepare article summaries for the prompt
     article_text = "\n\n".join([
-        f"**{a['title']}** ({a['source']}, {a['category']})\n{a['summary']}"
-        for a in articles[:30]  # Limit to avoid context overflow
+        f"**{story[0]['title']}** ({story_sources(story)}, {story[0]['category']})\n{story[0]['summary']}"
+        for story in stories[:30]  # Limit to avoid context overflow
     ])
     
     prompt = f"""You are a tech trend analyst. Analyze these recent tech news articles and provide:
@@ -86,21 +324,21 @@ Articles from the last 24 hours:
 
 Provide a concise, actionable morning briefing. Use markdown formatting."""
 
+    tokens = []
     try:
-        result = subprocess.run(
-            ["ollama", "run", CONFIG["ollama"]["model"]],
-            input=prompt,
-            capture_output=True,
-            text=True,
-            timeout=120
-        )
-        return result.stdout.strip()
-    except subprocess.TimeoutExpired:
-        return "Error: Ollama analysis timed out"
-    except FileNotFoundError:
-        return "Error: Ollama not found. Install from https://ollama.ai"
+        for token in stream_completion(prompt, LLM_PARAMS):
+            tokens.append(token)
+            if echo:
+                print(token, end="", flush=True)
+        if echo:
+            print()
+        return "".join(tokens).strip()
+    except BackendUnavailable as e:
+        return f"Error: No LLM available. {e}"
+    except requests.Timeout:
+        return "Error: LLM analysis timed out"
     except Exception as e:
-        return f"Error running Ollama: {e}"
+        return f"Error running LLM: {e}"
 
 def generate_report(articles, analysis):
     """Generate the full markdown report."""
@@ -161,6 +399,14 @@ def save_report(report, date_str):
     print(f"Report saved to {filepath}")
     return filepath
 
+def print_search_results(query):
+    """Print archived articles matching a keyword query."""
+    articles = search_articles(query)
+    print(f"🔎 {len(articles)} archived articles matching \"{query}\"")
+    for a in articles:
+        print(f"- {a['title']} — {a['source']}, {a['published'][:10]}")
+        print(f"  {a['link']}")
+
 def main():
     print(f"🌅 Generating Morning Tech Report — {datetime.now().strftime('%Y-%m-%d %H:%M')}")
     print("-" * 50)
@@ -175,8 +421,8 @@ def main():
         return
     
     # Step 2: Analyze with Ollama
-    print(f"🧠 Analyzing with Ollama ({CONFIG['ollama']['model']})...")
-    analysis = analyze_with_ollama(articles)
+    print(f"🧠 Analyzing with Ollama ({LLM_BACKENDS['ollama']['model']})...")
+    analysis = analyze_with_ollama(articles, echo=True)
     
     # Step 3: Generate report
     print("📝 Generating report...")
@@ -193,4 +439,10 @@ def main():
     print("✅ Done!")
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 2 and sys.argv[1] == "search":
+        print_search_results(" ".join(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] == "poll":
+        print("📡 Polling RSS feeds (Ctrl+C to stop)...")
+        poll_feeds(RSS_FEEDS)
+    else:
+        main()
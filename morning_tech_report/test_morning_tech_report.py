@@ -0,0 +1,102 @@
+"""Tests for the morning tech report. Run with: python -m pytest"""
+
+import time
+from concurrent.futures import Future
+from contextlib import closing
+from types import SimpleNamespace
+
+import pytest
+
+import morning_tech_report as mtr
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    monkeypatch.setitem(mtr.CONFIG, "archive", tmp_path / "articles.db")
+    return tmp_path / "articles.db"
+
+
+def add_article(link, title, source, category):
+    with closing(mtr.open_archive()) as db, db:
+        db.execute(
+            "INSERT INTO articles (link, title, source, category, published, first_seen) VALUES (?, ?, ?, ?, ?, ?)",
+            (link, title, source, category, time.time() - 60, time.time()),
+        )
+
+
+def test_recent_articles_only_reads_report_feeds(archive):
+    add_article("https://example.com/tc", "TechCrunch story", "TechCrunch AI", "ai")
+    # Rows the web app's AI Feed writes to the same archive
+    add_article("https://reddit.com/r/LocalLLaMA/1", "Reddit post", "r/LocalLLaMA", "ai feed")
+    add_article("https://news.ycombinator.com/item?id=1", "HN post", "Hacker News", "ai feed")
+
+    articles = mtr.fetch_feeds(24, refresh=False)
+
+    assert [a["title"] for a in articles] == ["TechCrunch story"]
+
+
+def test_report_reads_links_the_ai_feed_archived_first(archive, monkeypatch):
+    link = "https://news.ycombinator.com/item?id=1"
+    add_article(link, "HN post", "Hacker News AI", "ai feed")
+
+    def download_feeds(sources):
+        results = {}
+        for source in sources:
+            entries = [{"link": link, "title": "HN post"}] if source["name"] == "Hacker News" else []
+            results[source["url"]] = Future()
+            results[source["url"]].set_result(SimpleNamespace(entries=entries))
+        return results
+
+    monkeypatch.setattr(mtr, "download_feeds", download_feeds)
+    articles = mtr.fetch_feeds(24)
+
+    assert [(a["title"], a["source"]) for a in articles] == [("HN post", "Hacker News")]
+
+
+def article(title, summary="", source="TechCrunch AI"):
+    return {"title": title, "summary": summary, "source": source, "category": "ai"}
+
+
+def titles(clusters):
+    return [[a["title"] for a in cluster] for cluster in clusters]
+
+
+def test_cluster_articles_keeps_similar_headlines_apart():
+    articles = [
+        article("OpenAI releases GPT-5, its most capable model yet"),
+        article("Google releases Gemini 3, its most capable model yet"),
+        article("Anthropic releases Claude, its most capable model yet"),
+        article("Meta releases Llama 4, its most capable model yet"),
+        article("Apple announces new iPhone at September event"),
+        article("Apple announces new iPad at September event"),
+        article("Large language models for medicine: a survey", source="arXiv AI"),
+        article("Large language models for law: a survey", source="arXiv AI"),
+        article("Large language models for education: a survey", source="arXiv AI"),
+    ]
+
+    assert titles(mtr.cluster_articles(articles)) == [[a["title"]] for a in articles]
+
+
+def test_cluster_articles_groups_the_same_story():
+    summary = "OpenAI on Thursday released GPT-5 to all ChatGPT users, saying the model is faster and makes fewer mistakes."
+    articles = [
+        article("OpenAI releases GPT-5 to all ChatGPT users", summary),
+        article("Google releases Gemini 3", "Google's new model tops the benchmarks."),
+        article("OpenAI releases GPT-5 to all ChatGPT users", f"<p>{summary}</p>", source="The Verge AI"),
+    ]
+
+    assert titles(mtr.cluster_articles(articles)) == [
+        [articles[0]["title"], articles[2]["title"]],
+        [articles[1]["title"]],
+    ]
+
+
+def test_cluster_articles_compares_with_the_first_article():
+    # Each headline is close to the one before it, but the last is far from the first
+    words = "alpha beta gamma delta epsilon zeta eta theta iota kappa lambda mu".split()
+    articles = [article(" ".join(words[i:i + 8])) for i in range(0, 5)]
+
+    clusters = mtr.cluster_articles(articles)
+
+    assert len(clusters) > 1
+    assert all(len(cluster) < len(articles) for cluster in clusters)
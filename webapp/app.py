@@ -6,13 +6,39 @@ Uses Groq API for fast AI inference.
 """
 
 import gradio as gr
+import ast
+import bisect
+import calendar
+import contextvars
+import email.utils
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import pickle
 import random
+import re
 import requests
+import sqlite3
+import sys
 import feedparser
 import os
+import threading
+import time
+import numpy as np
+import pandas as pd
 import yfinance as yf
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+from contextlib import closing, contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
+from urllib.parse import quote, urljoin
+from xml.etree import ElementTree as ET
+from zoneinfo import ZoneInfo
 
 # Load .env file if it exists
 env_file = Path(__file__).parent / ".env"
@@ -26,45 +52,1015 @@ if env_file.exists():
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
 MODEL = "llama-3.1-8b-instant"  # Fast and free on Groq
+LLM_PARAMS = {"max_tokens": 1024, "temperature": 0.7}  # sampling parameters sent with every prompt
+
+# LLM backends: Groq (hosted) and Ollama (local). Each has pooled keep-alive
+# connections and a cap on concurrent calls; Groq calls also stay within its
+# free-tier per-minute limits. A call goes to the first backend in LLM_ORDER
+# that can take it, so one that is saturated or down fails over to the other.
+LLM_BACKENDS = {
+    "groq": {
+        "url": GROQ_URL,
+        "api_key": GROQ_API_KEY,
+        "model": MODEL,
+        "max_concurrent": int(os.getenv("GROQ_MAX_CONCURRENT", "4")),
+        "rpm": int(os.getenv("GROQ_RPM", "30")),  # requests per minute
+        "tpm": int(os.getenv("GROQ_TPM", "6000")),  # prompt + completion tokens per minute
+        "timeout": 60,  # seconds to wait for the next part of the answer
+    },
+    "ollama": {
+        "host": os.getenv("OLLAMA_HOST", "http://localhost:11434"),
+        "model": os.getenv("OLLAMA_MODEL", "llama3.2"),
+        "keep_alive": os.getenv("OLLAMA_KEEP_ALIVE", "30m"),  # how long the model stays loaded after a call
+        "num_ctx": int(os.getenv("OLLAMA_NUM_CTX", "8192")),  # context window in tokens
+        "max_concurrent": int(os.getenv("OLLAMA_MAX_CONCURRENT", "1")),
+        "timeout": 120,  # seconds to wait for the model's next output
+    },
+}
+LLM_ORDER = [name.strip() for name in os.getenv("LLM_ORDER", "groq,ollama").split(",") if name.strip() in LLM_BACKENDS]
+LLM_MAX_WAIT = float(os.getenv("LLM_MAX_WAIT", "5"))  # seconds a saturated backend is waited for before failing over
+
+# Every feed the app reads, once per URL, so the Tech Report and AI Feed tabs
+# share one fetch and one cached copy of each feed.
+# "ttl": seconds a cached copy of the feed is used before asking the server again
+# "timeout": seconds to wait for the feed (Reddit often hangs, so it gets less)
+FEED_SOURCES = {
+    "MIT Tech Review": {"url": "https://www.technologyreview.com/feed/", "ttl": 3600},
+    "TechCrunch AI": {"url": "https://techcrunch.com/category/artificial-intelligence/feed/", "ttl": 900},
+    "Hacker News": {"url": "https://hnrss.org/frontpage", "ttl": 300},
+    "Ars Technica": {"url": "https://feeds.arstechnica.com/arstechnica/technology-lab", "ttl": 900},
+    "r/MachineLearning": {"url": "https://www.reddit.com/r/MachineLearning/.rss", "ttl": 300, "timeout": 8},
+    "r/artificial": {"url": "https://www.reddit.com/r/artificial/.rss", "ttl": 300, "timeout": 8},
+    "r/LocalLLaMA": {"url": "https://www.reddit.com/r/LocalLLaMA/.rss", "ttl": 300, "timeout": 8},
+    "Hacker News AI": {"url": "https://hnrss.org/newest?q=AI+OR+LLM+OR+GPT+OR+machine+learning", "ttl": 300},
+    "Lobsters AI": {"url": "https://lobste.rs/t/ai.rss", "ttl": 900},
+    "DEV.to AI": {"url": "https://dev.to/feed/tag/ai", "ttl": 900},
+    "ArXiv AI": {"url": "https://rss.arxiv.org/rss/cs.AI", "ttl": 21600},
+}
+
+def feed_source(name, **details):
+    """A registered feed with a consumer's own details (category, icon, ...)."""
+    return {"name": name, **FEED_SOURCES[name], **details}
 
 # RSS Feeds for Morning Tech Report
 RSS_FEEDS = [
-    {"name": "MIT Tech Review", "url": "https://www.technologyreview.com/feed/", "category": "tech"},
-    {"name": "TechCrunch AI", "url": "https://techcrunch.com/category/artificial-intelligence/feed/", "category": "ai"},
-    {"name": "Hacker News", "url": "https://hnrss.org/frontpage", "category": "tech"},
-    {"name": "Ars Technica", "url": "https://feeds.arstechnica.com/arstechnica/technology-lab", "category": "tech"},
+    feed_source("MIT Tech Review", category="tech"),
+    feed_source("TechCrunch AI", category="ai"),
+    feed_source("Hacker News", category="tech"),
+    feed_source("Ars Technica", category="tech"),
 ]
 
-def query_llm(prompt):
-    """Query Groq API for fast inference."""
-    if not GROQ_API_KEY:
-        return "❌ Error: GROQ_API_KEY not set. Get a free key at https://console.groq.com"
-    print(f"[DEBUG] Querying Groq with prompt length: {len(prompt)}")
+FEED_FETCH = {
+    "max_workers": int(os.getenv("FEED_MAX_WORKERS", "8")),  # feeds downloaded at once
+    "timeout": float(os.getenv("FEED_TIMEOUT", "15")),  # seconds per feed, unless the source sets "timeout"
+    "cache_dir": Path(os.getenv("FEED_CACHE_DIR", Path.home() / ".cache" / "easy_life_with_ai" / "feeds")),
+    "default_ttl": 900,  # seconds a cached feed is served without revalidating
+    "max_entries": int(os.getenv("FEED_MAX_ENTRIES", "20")),  # entries parsed per feed (readers show at most 15)
+    "report_deadline": float(os.getenv("FEED_REPORT_DEADLINE", "20")),  # seconds before a report goes out with what has arrived
+    "hedge": os.getenv("FEED_HEDGE", "1") == "1",  # race a second request when a source is slower than usual
+    "hedge_min_samples": 10,  # latency samples needed before a source is hedged
+    "hedge_tail_ratio": 3.0,  # latency, as a multiple of the median, where a source's tail starts
+    "poll_min_interval": 60,  # seconds between polls of a feed that changes every time
+    "poll_max_interval": 6 * 3600,  # seconds between polls of a feed that never changes
+    "poller": os.getenv("FEED_POLLER", "1") == "1",  # keep feeds fresh in the background
+}
+
+def make_feed_session():
+    """HTTP session whose keep-alive connections are reused across feeds and requests."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=2 * FEED_FETCH["max_workers"])
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = feedparser.USER_AGENT
+    return session
+
+feed_session = make_feed_session()
+
+# Latency histogram bucket upper bounds in seconds; the last bucket holds anything slower
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60]
+
+_feed_latency = None  # url -> bucket counts, loaded from the feed cache on first use
+_feed_latency_lock = threading.Lock()
+_feed_requests = ThreadPoolExecutor(max_workers=2 * FEED_FETCH["max_workers"], thread_name_prefix="feed-request")
+
+def feed_latency_path():
+    """Path of the per-source latency histograms, kept next to the feed cache."""
+    return FEED_FETCH["cache_dir"] / "latency.json"
+
+def feed_latency():
+    """Per-source latency histograms, loading them from disk on first use."""
+    global _feed_latency
+    with _feed_latency_lock:
+        if _feed_latency is None:
+            try:
+                _feed_latency = json.loads(feed_latency_path().read_text())
+            except (FileNotFoundError, ValueError):
+                _feed_latency = {}
+        return _feed_latency
+
+def record_feed_latency(url, seconds):
+    """Add a request's latency to its source's histogram.
+    
+    Counts are halved once a histogram holds 200 samples, so recent behaviour dominates.
+    """
+    histograms = feed_latency()
+    with _feed_latency_lock:
+        counts = histograms.setdefault(url, [0] * (len(LATENCY_BUCKETS) + 1))
+        counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        if sum(counts) >= 200:
+            histograms[url] = [count // 2 for count in counts]
+
+def save_feed_latency():
+    """Write the latency histograms next to the feed cache."""
+    histograms = feed_latency()
+    path = feed_latency_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    with _feed_latency_lock:
+        tmp_path.write_text(json.dumps(histograms))
+    os.replace(tmp_path, path)
+
+def latency_quantile(counts, q):
+    """Upper bound of the histogram bucket holding the q-th quantile."""
+    target = q * sum(counts)
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS + [float("inf")], counts):
+        seen += count
+        if seen >= target:
+            return bound
+    return float("inf")
+
+def hedge_threshold(url):
+    """Seconds after which a request to this source is hedged, or None.
+    
+    Only sources with a tail (p99 latency well above the median) are hedged.
+    They are hedged at their p95, so about one request in twenty sends a
+    second copy, or sooner if more than 5% of their requests are in the tail.
+    """
+    if not FEED_FETCH["hedge"]:
+        return None
+    counts = feed_latency().get(url)
+    if not counts or sum(counts) < FEED_FETCH["hedge_min_samples"]:
+        return None
+    median = latency_quantile(counts, 0.5)
+    tail_start = FEED_FETCH["hedge_tail_ratio"] * median
+    if latency_quantile(counts, 0.99) < tail_start:
+        return None
+    return min(latency_quantile(counts, 0.95), tail_start)
+
+def timed_feed_get(url, headers, timeout):
+    """GET a feed over the shared session, recording the latency."""
+    started = time.monotonic()
     try:
-        response = requests.post(
-            GROQ_URL,
-            headers={
-                "Authorization": f"Bearer {GROQ_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": MODEL,
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": 1024,
-                "temperature": 0.7
-            },
-            timeout=60
-        )
-        print(f"[DEBUG] Response status: {response.status_code}")
+        return feed_session.get(url, headers=headers, timeout=timeout)
+    finally:
+        record_feed_latency(url, time.monotonic() - started)
+
+def get_feed_response(url, headers, deadline):
+    """GET a feed, giving up after `deadline` seconds.
+    
+    If the request outlives the source's hedge threshold, a second identical
+    request is raced against it and the first successful response wins.
+    """
+    started = time.monotonic()
+    attempts = [_feed_requests.submit(timed_feed_get, url, headers, deadline)]
+    threshold = hedge_threshold(url)
+    if threshold is not None and threshold < deadline:
+        done, _ = wait(attempts, timeout=threshold)
+        if not done:
+            attempts.append(_feed_requests.submit(timed_feed_get, url, headers, deadline))
+    
+    error = None
+    try:
+        for attempt in as_completed(attempts, timeout=max(0, deadline - (time.monotonic() - started))):
+            try:
+                return attempt.result()
+            except requests.RequestException as e:
+                error = e
+    except FuturesTimeout:
+        raise TimeoutError(f"no response within {deadline:g}s")
+    raise error
+
+# url -> (cache file mtime, cached feed): feeds this process has already read
+_feed_store = {}
+_feed_store_lock = threading.Lock()
+# url -> lock held while the feed is being read or fetched
+_feed_flights = {}
+_feed_flights_lock = threading.Lock()
+
+def feed_cache_path(url):
+    """Path of a feed's entry in the feed cache."""
+    return FEED_FETCH["cache_dir"] / f"{hashlib.sha1(url.encode()).hexdigest()}.pickle"
+
+def load_cached_feed(url):
+    """Cached validators and parsed entries for a feed, and their age in seconds.
+    
+    Entries already read by this process are served from the in-process
+    store, as long as the cache file hasn't changed since.
+    Returns (None, None) if the feed isn't cached.
+    """
+    path = feed_cache_path(url)
+    try:
+        mtime = path.stat().st_mtime
+        with _feed_store_lock:
+            stored = _feed_store.get(url)
+        if stored and stored[0] == mtime:
+            cached = stored[1]
+        else:
+            with open(path, "rb") as f:
+                cached = pickle.load(f)
+            with _feed_store_lock:
+                _feed_store[url] = (mtime, cached)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return None, None
+    return cached, time.time() - mtime
+
+def save_cached_feed(url, cached):
+    """Write a feed's validators and parsed entries to the feed cache."""
+    path = feed_cache_path(url)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(cached, f)
+    os.replace(tmp_path, path)
+    with _feed_store_lock:
+        _feed_store[url] = (path.stat().st_mtime, cached)
+
+def touch_cached_feed(url, cached):
+    """Mark a cached feed as just revalidated, restarting its TTL."""
+    path = feed_cache_path(url)
+    os.utime(path)
+    with _feed_store_lock:
+        _feed_store[url] = (path.stat().st_mtime, cached)
+
+# Entry fields the readers use; everything else in a feed is skipped
+FEED_NAMESPACES = {
+    "",
+    "http://www.w3.org/2005/Atom",
+    "http://purl.org/rss/1.0/",
+    "http://purl.org/dc/elements/1.1/",
+    "http://purl.org/rss/1.0/modules/content/",
+}
+ENTRY_TAGS = {"item", "entry"}
+FIELD_TAGS = {
+    "title": "title",
+    "link": "link",
+    "description": "summary",
+    "summary": "summary",
+    "encoded": "content",  # content:encoded
+    "content": "content",
+    "pubDate": "published",
+    "published": "published",
+    "issued": "published",
+    "date": "updated",  # dc:date, reported as updated like feedparser does
+    "updated": "updated",
+    "modified": "updated",
+}
+
+# RFC 822 dates as feeds write them, e.g. "Fri, 16 Oct 2026 10:00:00 GMT" or "... +0200"
+RFC822_DATE = re.compile(
+    r"(?:[A-Za-z]{3},\s*)?(\d{1,2})\s+([A-Za-z]{3})\s+(\d{4})\s+(\d{1,2}):(\d\d)(?::(\d\d))?"
+    r"\s*(?:GMT|UTC|UT|Z|([+-])(\d\d):?(\d\d))?\s*$"
+)
+MONTHS = {name: number for number, name in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1)}
+
+def parse_feed_date(text):
+    """UTC struct_time for an RFC 822 (RSS) or ISO 8601 (Atom) date, or None.
+    
+    The usual RSS form is read with one precompiled pattern; other forms
+    (named US time zones, two-digit years) go through the standard parsers.
+    """
+    match = RFC822_DATE.match(text) if text else None
+    if match and match.group(2).lower() in MONTHS:
+        day, month, year, hour, minute, second, sign, offset_hours, offset_minutes = match.groups()
+        timestamp = calendar.timegm((int(year), MONTHS[month.lower()], int(day), int(hour), int(minute), int(second or 0)))
+        if sign:
+            offset = 3600 * int(offset_hours) + 60 * int(offset_minutes)
+            timestamp += -offset if sign == "+" else offset
+        return time.gmtime(timestamp)
+    try:
+        parsed = email.utils.parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        return parsed.timetuple()
+    return parsed.utctimetuple()
+
+def stream_feed_entries(data, max_entries, base_url=""):
+    """Parse at most `max_entries` entries from RSS or Atom bytes, keeping only the fields we use.
+    
+    Entries are read incrementally and the parse stops at the last one needed,
+    so large feeds (arXiv lists hundreds of abstracts) aren't parsed in full.
+    Raises ET.ParseError for XML the strict parser can't read.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    entries = []
+    entry = None
+    for offset in range(0, len(data), 65536):
+        parser.feed(data[offset:offset + 65536])
+        for event, element in parser.read_events():
+            namespace, _, tag = element.tag[1:].rpartition("}") if element.tag[:1] == "{" else ("", "", element.tag)
+            if namespace not in FEED_NAMESPACES:
+                continue
+            if event == "start":
+                if tag in ENTRY_TAGS:
+                    entry = feedparser.FeedParserDict()
+                    href_link = False
+                continue
+            
+            if entry is None:
+                continue
+            if tag in ENTRY_TAGS:
+                if "summary" not in entry and "content" in entry:
+                    entry["summary"] = entry["content"][0]["value"]
+                entries.append(entry)
+                entry = None
+                element.clear()
+                if len(entries) >= max_entries:
+                    return entries
+                continue
+            
+            field = FIELD_TAGS.get(tag)
+            # An RSS item's own <link> wins over an atom:link that came before it
+            rss_link = field == "link" and element.get("href") is None
+            if field is None or field in entry and not (rss_link and href_link):
+                continue
+            # type="xhtml" Atom text is in child elements, not the element's own text
+            text = "".join(element.itertext()).strip()
+            if field == "link":
+                # Atom: <link rel="alternate" href="..."/>; RSS: <link>...</link>
+                if element.get("rel", "alternate") != "alternate":
+                    continue
+                href_link = not rss_link
+                text = urljoin(base_url, element.get("href", text))
+            if field == "content":
+                entry[field] = [{"value": text}]
+            elif field in ("published", "updated"):
+                entry[field] = text
+                entry[f"{field}_parsed"] = parse_feed_date(text)
+            elif text:
+                entry[field] = text
+    parser.close()
+    return entries
+
+def parse_feed(response, max_entries):
+    """Parsed feed from an HTTP response, with at most `max_entries` entries.
+    
+    Feeds that aren't well-formed XML go through feedparser's forgiving parser instead.
+    """
+    try:
+        return feedparser.FeedParserDict(entries=stream_feed_entries(response.content, max_entries, response.url))
+    except ET.ParseError:
+        feed = feedparser.parse(response.content, response_headers={
+            "content-type": response.headers.get("Content-Type", ""),
+            "content-location": response.url,
+        })
+        feed["entries"] = feed.entries[:max_entries]
+        return feed
+
+def read_feed(url, ttl=None, timeout=None):
+    """Parsed feed for a URL, served from the feed cache when possible.
+    
+    Within the source's TTL, or while a feed poller keeps the feed fresh, the
+    cached entries are returned without a request (ttl=0 always revalidates).
+    After it, a conditional GET revalidates them: on 304 Not Modified the
+    cached entries are reused without downloading or parsing the feed again.
+    If the request fails or misses the source's deadline, stale cached
+    entries are returned.
+    """
+    ttl = FEED_FETCH["default_ttl"] if ttl is None else ttl
+    cached, age = load_cached_feed(url)
+    if cached is not None and (age < ttl or (ttl > 0 and time.time() < polled_until(url))):
+        return feedparser.FeedParserDict(entries=cached["entries"])
+    
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("modified"):
+        headers["If-Modified-Since"] = cached["modified"]
+    
+    try:
+        response = get_feed_response(url, headers, FEED_FETCH["timeout"] if timeout is None else timeout)
+        if response.status_code == 304 and cached is not None:
+            touch_cached_feed(url, cached)
+            return feedparser.FeedParserDict(entries=cached["entries"])
         response.raise_for_status()
-        result = response.json()["choices"][0]["message"]["content"]
-        print(f"[DEBUG] Got response length: {len(result)}")
-        return result
+    except (requests.RequestException, TimeoutError) as e:
+        if cached is None:
+            raise
+        print(f"Error fetching {url}, using cached entries: {e}")
+        return feedparser.FeedParserDict(entries=cached["entries"])
+    
+    feed = parse_feed(response, FEED_FETCH["max_entries"])
+    save_cached_feed(url, {
+        "etag": response.headers.get("ETag"),
+        "modified": response.headers.get("Last-Modified"),
+        "entries": feed.entries,
+    })
+    return feed
+
+def fetch_feed(url, ttl=None, timeout=None):
+    """Parsed feed for a URL, fetched at most once per refresh window.
+    
+    Every reader of a URL shares its cached entries; concurrent calls for the
+    same URL wait for the one request in flight instead of sending their own.
+    """
+    with _feed_flights_lock:
+        flight = _feed_flights.setdefault(url, threading.Lock())
+    with flight:
+        return read_feed(url, ttl, timeout)
+
+def download_feeds(sources, deadline=None):
+    """Fetch feeds concurrently, so the wait is the slowest feed rather than the sum.
+    
+    Feeds still loading after `deadline` seconds (default: the report deadline)
+    are left out. Returns {url: Future}; each future holds the parsed feed or
+    raises its fetch error (TimeoutError if it missed the deadline).
+    """
+    deadline = FEED_FETCH["report_deadline"] if deadline is None else deadline
+    # Consumers may list the same feed more than once; fetch it once
+    unique = {s["url"]: s for s in sources}
+    pool = ThreadPoolExecutor(max_workers=max(1, min(len(unique), FEED_FETCH["max_workers"])), thread_name_prefix="feed")
+    futures = {url: pool.submit(fetch_feed, url, s.get("ttl"), s.get("timeout")) for url, s in unique.items()}
+    wait(futures.values(), timeout=deadline)
+    # Late feeds keep downloading in the background and land in the cache for next time
+    pool.shutdown(wait=False)
+    save_feed_latency()
+    
+    for url, future in futures.items():
+        if not future.done():
+            futures[url] = late = Future()
+            late.set_exception(TimeoutError(f"no response within the {deadline:g}s report deadline"))
+    return futures
+
+def feed_poll_path():
+    return FEED_FETCH["cache_dir"] / "poll.json"
+
+# (poll.json mtime, {url: time until which a feed poller keeps that feed fresh})
+_feed_polls = (None, {})
+
+def polled_until(url):
+    """Time until which a running feed poller keeps a feed's cached copy fresh (0 if none does)."""
+    global _feed_polls
+    path = feed_poll_path()
+    try:
+        mtime = path.stat().st_mtime
+        if _feed_polls[0] != mtime:
+            _feed_polls = (mtime, json.loads(path.read_text()))
+    except (OSError, ValueError):
+        return 0
+    return _feed_polls[1].get(url, 0)
+
+def save_feed_polls(polls):
+    """Record how long polled feeds stay fresh, keeping other pollers' feeds."""
+    path = feed_poll_path()
+    try:
+        merged = json.loads(path.read_text())
+    except (OSError, ValueError):
+        merged = {}
+    merged.update(polls)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(merged))
+    os.replace(tmp_path, path)
+
+def clamp_poll_interval(seconds):
+    return min(max(seconds, FEED_FETCH["poll_min_interval"]), FEED_FETCH["poll_max_interval"])
+
+def poll_feeds(sources):
+    """Keep feeds fresh in the cache forever, each polled as often as it changes.
+    
+    A feed is first polled every TTL. When its entries changed since the last
+    poll it is polled twice as often, when they didn't 1.5 times less often,
+    within poll_min_interval and poll_max_interval. Readers use a polled feed's
+    cached copy without revalidating it until two of its intervals have
+    passed, so if the poller stops, feeds soon go back to their own TTLs.
+    """
+    sources = list({s["url"]: s for s in sources}.values())
+    schedule = {
+        s["url"]: {"interval": clamp_poll_interval(s.get("ttl", FEED_FETCH["default_ttl"])), "due": 0, "links": None}
+        for s in sources
+    }
+    while True:
+        started = time.time()
+        try:
+            due = [s for s in sources if schedule[s["url"]]["due"] <= started]
+            # ttl=0 revalidates every due feed; unchanged ones cost a 304
+            feeds = download_feeds([{**s, "ttl": 0} for s in due])
+            polls = {}
+            changed = 0
+            for s in due:
+                state = schedule[s["url"]]
+                try:
+                    links = [entry.get("link") for entry in feeds[s["url"]].result().entries]
+                except Exception as e:
+                    print(f"Error polling {s['name']}: {e}")
+                else:
+                    if state["links"] is not None:
+                        changed += links != state["links"]
+                        factor = 0.5 if links != state["links"] else 1.5
+                        state["interval"] = clamp_poll_interval(state["interval"] * factor)
+                    state["links"] = links
+                    polls[s["url"]] = started + 2 * state["interval"]
+                state["due"] = started + state["interval"]
+            save_feed_polls(polls)
+        except Exception as e:
+            # One failed cycle (e.g. the cache dir isn't writable) mustn't stop the poller
+            print(f"[DEBUG] Feed poll failed, retrying in {FEED_FETCH['poll_min_interval']}s: {e}")
+            time.sleep(FEED_FETCH["poll_min_interval"])
+            continue
+        print(f"[DEBUG] Polled {len(due)} feeds ({changed} changed) in {time.time() - started:.1f}s")
+        time.sleep(max(1, min(state["due"] for state in schedule.values()) - time.time()))
+
+def start_feed_poller():
+    """Start the background thread that keeps every registered feed fresh, if enabled."""
+    if not FEED_FETCH["poller"]:
+        return
+    sources = [feed_source(name) for name in FEED_SOURCES]
+    threading.Thread(target=poll_feeds, args=(sources,), name="feed-poller", daemon=True).start()
+
+# Article archive: every feed entry the app has fetched, one row per link, with
+# a full-text index so past headlines can be searched without the network
+ARTICLE_ARCHIVE = Path(os.getenv("ARTICLE_ARCHIVE", Path.home() / ".cache" / "easy_life_with_ai" / "articles.db"))
+
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    link TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL,
+    category TEXT NOT NULL,
+    published REAL,  -- unix time, NULL if the feed doesn't say
+    first_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_recent ON articles (COALESCE(published, first_seen));
+"""
+
+ARCHIVE_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, summary, content='articles', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, summary) VALUES (new.rowid, new.title, new.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, summary) VALUES ('delete', old.rowid, old.title, old.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, summary) VALUES ('delete', old.rowid, old.title, old.summary);
+    INSERT INTO articles_fts (rowid, title, summary) VALUES (new.rowid, new.title, new.summary);
+END;
+"""
+
+def open_archive():
+    """Connect to the article archive, creating it on first use.
+    
+    Full-text search needs SQLite's FTS5 extension; without it the archive
+    still works and search falls back to substring matching.
+    """
+    ARTICLE_ARCHIVE.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(ARTICLE_ARCHIVE, timeout=30)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(ARCHIVE_SCHEMA)
+    try:
+        db.executescript(ARCHIVE_FTS_SCHEMA)
+    except sqlite3.OperationalError:
+        pass
+    return db
+
+def entry_timestamp(entry):
+    """Unix time an entry was published (or updated), or None if the feed doesn't say."""
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    return calendar.timegm(parsed) if parsed else None
+
+def archive_feed_entries(feeds, sources, category=None):
+    """Add the fetched entries of `sources` to the article archive.
+    
+    `feeds` is the result of download_feeds; failed feeds are skipped. Articles
+    are keyed by link, so one seen again only has its text refreshed. Sources
+    with their own category (the report feeds) also take over the source and
+    category of a link the AI Feed archived first, so the morning report,
+    which only reads its own feeds, finds it.
+    """
+    now = time.time()
+    rows = []
+    for source in sources:
+        future = feeds.get(source["url"])
+        if future is None or future.exception() is not None:
+            continue
+        for entry in future.result().entries:
+            if entry.get("link"):
+                rows.append((
+                    entry["link"],
+                    entry.get("title", "No title"),
+                    entry.get("summary", ""),
+                    source["name"],
+                    source.get("category", category),
+                    entry_timestamp(entry),
+                    now,
+                ))
+    
+    claim = ", source = excluded.source, category = excluded.category" if category is None else ""
+    try:
+        with closing(open_archive()) as db, db:
+            db.executemany(
+                f"""INSERT INTO articles (link, title, summary, source, category, published, first_seen)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (link) DO UPDATE SET
+                       title = excluded.title,
+                       summary = excluded.summary,
+                       published = COALESCE(excluded.published, published){claim}""",
+                rows,
+            )
+    except sqlite3.Error as e:
+        print(f"Error archiving articles: {e}")
+
+def search_articles(query, limit=20):
+    """Archived articles matching every word of `query`, best matches first."""
+    words = query.split()
+    if not words:
+        return []
+    with closing(open_archive()) as db:
+        if db.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'").fetchone():
+            match = " ".join('"' + word.replace('"', '""') + '"' for word in words)
+            return db.execute(
+                """SELECT articles.* FROM articles_fts
+                   JOIN articles ON articles.rowid = articles_fts.rowid
+                   WHERE articles_fts MATCH ?
+                   ORDER BY rank LIMIT ?""",
+                (match, limit),
+            ).fetchall()
+        conditions = " AND ".join(["(title LIKE ? OR summary LIKE ?)"] * len(words))
+        params = [f"%{word}%" for word in words for _ in range(2)]
+        return db.execute(
+            f"SELECT * FROM articles WHERE {conditions} ORDER BY COALESCE(published, first_seen) DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+
+class BackendUnavailable(Exception):
+    """An LLM backend can't take a call: not set up, saturated, or refusing it."""
+
+# Pooled keep-alive connections and concurrency slots, one set per backend
+llm_sessions = {name: requests.Session() for name in LLM_BACKENDS}
+_llm_slots = {name: threading.BoundedSemaphore(backend["max_concurrent"]) for name, backend in LLM_BACKENDS.items()}
+
+# Groq's per-minute request and token budgets, refilled continuously (token buckets)
+_groq_budget = {
+    "requests": LLM_BACKENDS["groq"]["rpm"],
+    "tokens": LLM_BACKENDS["groq"]["tpm"],
+    "updated": time.monotonic(),
+    "blocked_until": 0.0,  # set from Retry-After when Groq answers 429
+}
+_groq_budget_lock = threading.Lock()
+
+def reserve_groq(tokens):
+    """Take one request and `tokens` tokens from Groq's per-minute budgets.
+    
+    Waits for the budgets to refill if that takes at most LLM_MAX_WAIT
+    seconds; returns False (saturated) if it would take longer.
+    """
+    limits = LLM_BACKENDS["groq"]
+    # A prompt bigger than a minute's budget still goes out once the bucket is full
+    tokens = min(tokens, limits["tpm"])
+    deadline = time.monotonic() + LLM_MAX_WAIT
+    while True:
+        with _groq_budget_lock:
+            now = time.monotonic()
+            elapsed = now - _groq_budget["updated"]
+            _groq_budget["requests"] = min(limits["rpm"], _groq_budget["requests"] + elapsed * limits["rpm"] / 60)
+            _groq_budget["tokens"] = min(limits["tpm"], _groq_budget["tokens"] + elapsed * limits["tpm"] / 60)
+            _groq_budget["updated"] = now
+            wait_for = max(
+                _groq_budget["blocked_until"] - now,
+                (1 - _groq_budget["requests"]) * 60 / limits["rpm"],
+                (tokens - _groq_budget["tokens"]) * 60 / limits["tpm"],
+            )
+            if wait_for <= 0:
+                _groq_budget["requests"] -= 1
+                _groq_budget["tokens"] -= tokens
+                return True
+        if now + wait_for > deadline:
+            return False
+        time.sleep(wait_for)
+
+def settle_groq(reserved, used):
+    """Return the unused part of a token reservation once the call reports its usage."""
+    if used is not None:
+        with _groq_budget_lock:
+            _groq_budget["tokens"] += reserved - used
+
+def block_groq(seconds):
+    """Hold all Groq calls for `seconds`, as Groq asked in a 429."""
+    with _groq_budget_lock:
+        _groq_budget["blocked_until"] = max(_groq_budget["blocked_until"], time.monotonic() + seconds)
+
+@contextmanager
+def llm_slot(name):
+    """Hold one of a backend's concurrency slots, waiting at most LLM_MAX_WAIT for it."""
+    if not _llm_slots[name].acquire(timeout=LLM_MAX_WAIT):
+        raise BackendUnavailable(f"all {LLM_BACKENDS[name]['max_concurrent']} slots busy")
+    try:
+        yield
+    finally:
+        _llm_slots[name].release()
+
+def stream_groq(prompt):
+    """Tokens of a Groq chat completion, streamed as server-sent events."""
+    groq = LLM_BACKENDS["groq"]
+    if not groq["api_key"]:
+        raise BackendUnavailable("GROQ_API_KEY not set (get a free key at https://console.groq.com)")
+    with llm_slot("groq"):
+        # Groq counts prompt and completion tokens; reserve for the longest answer
+        reserved = len(prompt) // 4 + LLM_PARAMS["max_tokens"]
+        if not reserve_groq(reserved):
+            raise BackendUnavailable("per-minute rate limit reached")
+        used = None
+        try:
+            payload = {"model": groq["model"], "messages": [{"role": "user", "content": prompt}], "stream": True, **LLM_PARAMS}
+            headers = {"Authorization": f"Bearer {groq['api_key']}", "Content-Type": "application/json"}
+            with llm_sessions["groq"].post(groq["url"], headers=headers, json=payload, stream=True, timeout=groq["timeout"]) as response:
+                if response.status_code == 429:
+                    block_groq(float(response.headers.get("Retry-After", 60)))
+                    raise BackendUnavailable("rate limited by Groq")
+                response.raise_for_status()
+                done = False
+                # chunk_size=None hands each event over as it arrives. The stream is
+                # read to its end, past [DONE], so the connection goes back to the pool.
+                for line in response.iter_lines(chunk_size=None):
+                    if not line.startswith(b"data:"):
+                        continue  # blank separators and ": keep-alive" comments
+                    data = line[5:].strip()
+                    if data == b"[DONE]":
+                        done = True
+                        continue
+                    chunk = json.loads(data)
+                    usage = chunk.get("usage") or chunk.get("x_groq", {}).get("usage")
+                    if usage:
+                        used = usage.get("total_tokens")
+                    token = (chunk.get("choices") or [{}])[0].get("delta", {}).get("content")
+                    if token:
+                        yield token
+                if not done:
+                    raise RuntimeError("the answer was cut off")
+        finally:
+            settle_groq(reserved, used)
+
+def ollama_url(path):
+    host = LLM_BACKENDS["ollama"]["host"].rstrip("/")
+    # OLLAMA_HOST is often set without a scheme (e.g. "127.0.0.1:11434")
+    return f"{host if '://' in host else 'http://' + host}{path}"
+
+def stream_ollama(prompt):
+    """Tokens of a local Ollama completion, yielded as the model generates them.
+    
+    The model stays loaded for `keep_alive` after the call, so the next call
+    doesn't wait for it to load again.
+    """
+    ollama = LLM_BACKENDS["ollama"]
+    payload = {
+        "model": ollama["model"],
+        "prompt": prompt,
+        "stream": True,
+        "keep_alive": ollama["keep_alive"],
+        "options": {
+            "num_ctx": ollama["num_ctx"],
+            "num_predict": LLM_PARAMS["max_tokens"],
+            "temperature": LLM_PARAMS["temperature"],
+        },
+    }
+    with llm_slot("ollama"):
+        try:
+            response = llm_sessions["ollama"].post(ollama_url("/api/generate"), json=payload, stream=True, timeout=ollama["timeout"])
+        except requests.ConnectionError:
+            raise BackendUnavailable("not running (start it with `ollama serve`, install from https://ollama.ai)")
+        with response:
+            if response.status_code != 200:
+                try:
+                    message = response.json().get("error")
+                except ValueError:
+                    message = None
+                raise BackendUnavailable(message or f"HTTP {response.status_code}")
+            # One JSON object per line, read to the end of the stream (past the
+            # "done" line) so the connection goes back to the pool
+            for line in response.iter_lines(chunk_size=None):
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                if chunk.get("response"):
+                    yield chunk["response"]
+
+LLM_STREAMS = {"groq": stream_groq, "ollama": stream_ollama}
+
+def start_completion(prompt):
+    """Start a completion on the first backend in LLM_ORDER that can take the call.
+    
+    A backend is passed over when it isn't set up, stays saturated (all its
+    concurrency slots busy, or Groq's per-minute budget spent) for more than
+    LLM_MAX_WAIT seconds, or fails before answering (429, server down). Once
+    a backend starts answering, the call stays with it. Returns the backend's
+    name and an iterator over the answer's tokens. Raises BackendUnavailable
+    when no backend can answer.
+    """
+    reasons = []
+    for name in LLM_ORDER:
+        tokens = LLM_STREAMS[name](prompt)
+        try:
+            first = next(tokens, "")
+        except Exception as e:
+            reasons.append(f"{name}: {e}")
+            continue
+        return name, itertools.chain([first], tokens)
+    raise BackendUnavailable("; ".join(reasons) or "no LLM backend configured")
+
+# LLM response cache: a prompt already answered (same backend, model, prompt and
+# sampling parameters) is served from disk instead of spending Groq quota
+LLM_CACHE = {
+    "path": Path(os.getenv("LLM_CACHE", Path.home() / ".cache" / "easy_life_with_ai" / "llm.db")),
+    "max_mb": float(os.getenv("LLM_CACHE_MAX_MB", "20")),  # least recently used answers are evicted beyond this
+    "memory_entries": 256,  # answers also kept in memory, so repeat prompts skip SQLite
+    "touch_batch": 32,  # memory hits whose last use is written to disk together
+    "ttl": {  # seconds an answer is reused, by prompt kind
+        "eli5": 7 * 86400,
+        "tech_report": 6 * 3600,
+        "ai_trends": 3 * 3600,
+        "weather_tips": 3 * 3600,
+        "default": 3600,
+        "test": 0,  # the startup connection check always reaches Groq and isn't cached
+    },
+}
+
+LLM_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,  -- sha256 of backend, model, prompt and sampling parameters
+    kind TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    size INTEGER NOT NULL  -- bytes, counted against max_mb
+);
+CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used);
+"""
+
+# key -> (created, response), most recently used last
+_llm_memory = OrderedDict()
+_llm_cache_lock = threading.Lock()
+_llm_cache_stats = {"hits": 0, "misses": 0}
+# key -> last use of answers served from memory, not yet written to disk
+_llm_touched = {}
+
+def open_llm_cache():
+    """Connect to the LLM response cache, creating it on first use."""
+    LLM_CACHE["path"].parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(LLM_CACHE["path"], timeout=30)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(LLM_CACHE_SCHEMA)
+    return db
+
+def llm_cache_key(backend, prompt):
+    """Cache key of a prompt as answered by one backend: its model, the prompt and LLM_PARAMS."""
+    payload = {"backend": backend, "model": LLM_BACKENDS[backend]["model"], "prompt": prompt, **LLM_PARAMS}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def llm_cache_ttl(kind):
+    return LLM_CACHE["ttl"].get(kind, LLM_CACHE["ttl"]["default"])
+
+def remember_llm_response(key, created, response):
+    with _llm_cache_lock:
+        _llm_memory[key] = (created, response)
+        _llm_memory.move_to_end(key)
+        while len(_llm_memory) > LLM_CACHE["memory_entries"]:
+            _llm_memory.popitem(last=False)
+
+def touch_llm_responses(db):
+    """Write the last uses of answers served from memory since the previous write."""
+    with _llm_cache_lock:
+        touched = [(used, key) for key, used in _llm_touched.items()]
+        _llm_touched.clear()
+    db.executemany("UPDATE responses SET last_used = ? WHERE key = ?", touched)
+
+def lookup_llm_response(key):
+    """(created, response) cached under `key`, or None.
+    
+    Answers are looked up in memory first, then on disk. Every hit refreshes
+    the answer's last use, which is what LRU eviction goes by; for memory hits
+    it is written on the next disk access, or once touch_batch have piled up.
+    """
+    with _llm_cache_lock:
+        hit = _llm_memory.get(key)
+        if hit is not None:
+            _llm_memory.move_to_end(key)
+            _llm_touched[key] = time.time()
+            flush = len(_llm_touched) >= LLM_CACHE["touch_batch"]
+    if hit is not None:
+        if flush:
+            with closing(open_llm_cache()) as db, db:
+                touch_llm_responses(db)
+        return hit
+    
+    with closing(open_llm_cache()) as db, db:
+        touch_llm_responses(db)
+        row = db.execute("SELECT created, response FROM responses WHERE key = ?", (key,)).fetchone()
+        if row:
+            db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+    if row:
+        hit = tuple(row)
+        remember_llm_response(key, *hit)
+    return hit
+
+def cached_llm_response(keys, kind):
+    """The answer cached under the first of `keys` that is within its kind's TTL, else None."""
+    ttl = llm_cache_ttl(kind)
+    answer = None
+    for key in keys:
+        hit = lookup_llm_response(key)
+        if hit is not None and time.time() - hit[0] < ttl:
+            answer = hit[1]
+            break
+    with _llm_cache_lock:
+        _llm_cache_stats["misses" if answer is None else "hits"] += 1
+    return answer
+
+def store_llm_response(key, kind, response):
+    """Cache an answer, evicting least recently used answers beyond the size budget.
+    
+    Answers of kinds with no TTL would never be reused, so they aren't stored.
+    """
+    if llm_cache_ttl(kind) <= 0:
+        return
+    now = time.time()
+    remember_llm_response(key, now, response)
+    size = len(key) + len(response.encode())
+    budget = LLM_CACHE["max_mb"] * 1024 * 1024
+    with closing(open_llm_cache()) as db, db:
+        # Memory hits count for eviction order too
+        touch_llm_responses(db)
+        db.execute(
+            "INSERT OR REPLACE INTO responses (key, kind, response, created, last_used, size) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, kind, response, now, now, size),
+        )
+        excess = db.execute("SELECT SUM(size) FROM responses").fetchone()[0] - budget
+        evicted = []
+        for old_key, old_size in db.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            if excess <= 0:
+                break
+            evicted.append((old_key,))
+            excess -= old_size
+        db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+def llm_cache_stats():
+    """Hits and misses of the LLM response cache since startup."""
+    with _llm_cache_lock:
+        return dict(_llm_cache_stats)
+
+def query_llm(prompt, kind="default"):
+    """Query the LLM (Groq, or Ollama when Groq is saturated) for a complete answer.
+    
+    `kind` names the prompt type (see LLM_CACHE["ttl"]); it sets how long the
+    answer is reused for the same prompt.
+    """
+    return "".join(stream_llm(prompt, kind))
+
+def stream_llm(prompt, kind="default"):
+    """Query the LLM, yielding the answer's tokens as they are generated.
+    
+    A cached answer is yielded in one piece. Errors are yielded as an
+    "❌ Error" message after whatever arrived; only complete answers are
+    cached. Answers are cached under the backend and model that gave them,
+    and looked up for each backend in LLM_ORDER.
+    """
+    cached = cached_llm_response([llm_cache_key(name, prompt) for name in LLM_ORDER], kind)
+    if cached is not None:
+        print(f"[DEBUG] LLM cache hit ({kind}): {llm_cache_stats()}")
+        yield cached
+        return
+    print(f"[DEBUG] Querying LLM with prompt length: {len(prompt)}")
+    tokens = []
+    error = None
+    try:
+        backend, stream = start_completion(prompt)
+        for token in stream:
+            tokens.append(token)
+            yield token
+    except BackendUnavailable as e:
+        error = f"❌ Error: No LLM available. {e}"
     except requests.exceptions.Timeout:
-        return "❌ Error: Request timed out. Try again."
+        error = "❌ Error: Request timed out. Try again."
     except Exception as e:
         print(f"[DEBUG] Error: {e}")
-        return f"❌ Error: {str(e)}"
+        error = f"❌ Error: {str(e)}"
+    if error:
+        yield f"\n\n{error}" if tokens else error
+        return
+    result = "".join(tokens)
+    print(f"[DEBUG] Got response length from {backend}: {len(result)}")
+    store_llm_response(llm_cache_key(backend, prompt), kind, result)
 
 # ============================================
 # ELI5 Tool
@@ -89,12 +1085,8 @@ COMPLEX_TOPICS = [
     "how soap cleans", "how magnets work", "how refrigerators work",
 ]
 
-def eli5_explain(topic: str, use_random: bool = False):
-    """Explain a topic like user is 5 years old."""
-    if use_random or not topic.strip():
-        topic = random.choice(COMPLEX_TOPICS)
-    
-    prompt = f"""Explain "{topic}" like I'm 5 years old.
+def eli5_prompt(topic, opening='"Imagine..." or "You know how..."'):
+    return f"""Explain "{topic}" like I'm 5 years old.
 
 Rules:
 - Use simple words a child would understand
@@ -103,29 +1095,227 @@ Rules:
 - End with a fun fact
 - Be enthusiastic and make it fun!
 
-Start with "Imagine..." or "You know how..." """
+Start with {opening} """
+
+def eli5_explain(topic: str, use_random: bool = False):
+    """Explain a topic like user is 5 years old, yielding the explanation as it's written."""
+    if use_random or not topic.strip():
+        topic = random.choice(COMPLEX_TOPICS)
+    
+    explanation = ""
+    for token in stream_llm(eli5_prompt(topic), kind="eli5"):
+        explanation += token
+        yield f"## 🧒 {topic.upper()}\n\n{explanation}"
+
+# ELI5 corpus: several stored explanations of each topic in COMPLEX_TOPICS,
+# so "Surprise Me!" answers without waiting on the LLM. build_eli5_corpus()
+# fills it ahead of time; serving a topic whose variants are missing or
+# stale queues a background refill of that topic.
+ELI5_CORPUS = {
+    "path": Path(os.getenv("ELI5_CORPUS", Path.home() / ".cache" / "easy_life_with_ai" / "eli5.db")),
+    "max_age": float(os.getenv("ELI5_MAX_AGE_DAYS", "30")) * 86400,  # seconds before a variant is regenerated
+}
+
+# One variant per opening, so each stored explanation of a topic takes its own angle
+ELI5_OPENINGS = ['"Imagine..."', '"You know how..."', '"Have you ever wondered..."']
+
+ELI5_SCHEMA = """
+CREATE TABLE IF NOT EXISTS explanations (
+    topic TEXT NOT NULL,
+    variant INTEGER NOT NULL,  -- index into ELI5_OPENINGS
+    explanation BLOB NOT NULL,  -- zlib-compressed text
+    created REAL NOT NULL,
+    PRIMARY KEY (topic, variant)
+) WITHOUT ROWID;
+"""
+
+_eli5_refill_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="eli5-refill")
+_eli5_refilling = set()
+_eli5_refilling_lock = threading.Lock()
+
+def open_eli5_corpus():
+    """Connect to the ELI5 corpus, creating it on first use."""
+    ELI5_CORPUS["path"].parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(ELI5_CORPUS["path"], timeout=30)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(ELI5_SCHEMA)
+    return db
+
+def stored_eli5_variants(topic):
+    """{variant: (explanation, created)} for the stored explanations of a topic."""
+    with closing(open_eli5_corpus()) as db:
+        rows = db.execute("SELECT variant, explanation, created FROM explanations WHERE topic = ?", (topic,)).fetchall()
+    return {variant: (zlib.decompress(blob).decode(), created) for variant, blob, created in rows}
+
+def store_eli5_variant(topic, variant, explanation):
+    """Add an explanation to the corpus, unless it's an LLM error."""
+    if "❌ Error" in explanation:
+        return
+    with closing(open_eli5_corpus()) as db, db:
+        db.execute(
+            "INSERT OR REPLACE INTO explanations (topic, variant, explanation, created) VALUES (?, ?, ?, ?)",
+            (topic, variant, zlib.compress(explanation.encode()), time.time()),
+        )
+
+def generate_eli5_variant(topic, variant):
+    """Ask the LLM for one variant of a topic and store it. Returns the LLM's answer (or error)."""
+    explanation = query_llm(eli5_prompt(topic, ELI5_OPENINGS[variant]), kind="eli5")
+    store_eli5_variant(topic, variant, explanation)
+    return explanation
 
-    explanation = query_llm(prompt)
-    return f"## 🧒 {topic.upper()}\n\n{explanation}"
+def eli5_variants_due(topic, variants):
+    """Variants of a topic that are missing or older than the corpus max age."""
+    now = time.time()
+    return [
+        v for v in range(len(ELI5_OPENINGS))
+        if v not in variants or now - variants[v][1] > ELI5_CORPUS["max_age"]
+    ]
+
+def build_eli5_corpus(topics=None):
+    """Generate every missing or stale variant of the topics (default: COMPLEX_TOPICS), one LLM call at a time.
+    
+    Returns the number of variants stored.
+    """
+    stored = 0
+    for topic in COMPLEX_TOPICS if topics is None else topics:
+        for variant in eli5_variants_due(topic, stored_eli5_variants(topic)):
+            explanation = generate_eli5_variant(topic, variant)
+            if "❌ Error" in explanation:
+                print(f"Error generating ELI5 for {topic}: {explanation}")
+            else:
+                stored += 1
+    return stored
+
+def refill_eli5_topic(topic):
+    try:
+        build_eli5_corpus([topic])
+    finally:
+        with _eli5_refilling_lock:
+            _eli5_refilling.discard(topic)
+
+def request_eli5_refill(topic):
+    """Queue a background refill of a topic's variants, unless one is already queued."""
+    with _eli5_refilling_lock:
+        if topic in _eli5_refilling:
+            return
+        _eli5_refilling.add(topic)
+    _eli5_refill_pool.submit(refill_eli5_topic, topic)
 
 def eli5_random():
-    return eli5_explain("", use_random=True)
+    """A random topic, explained from the corpus when it has a variant stored (else streamed live)."""
+    topic = random.choice(COMPLEX_TOPICS)
+    header = f"## 🧒 {topic.upper()}\n\n"
+    variants = stored_eli5_variants(topic)
+    if variants:
+        yield header + random.choice(list(variants.values()))[0]
+    else:
+        variant = random.randrange(len(ELI5_OPENINGS))
+        explanation = ""
+        for token in stream_llm(eli5_prompt(topic, ELI5_OPENINGS[variant]), kind="eli5"):
+            explanation += token
+            yield header + explanation
+        store_eli5_variant(topic, variant, explanation)
+    # Refill after any live call, so the refill doesn't repeat it
+    if not variants or eli5_variants_due(topic, variants):
+        request_eli5_refill(topic)
 
 def eli5_custom(topic):
     if not topic.strip():
-        return "Please enter a topic!"
-    return eli5_explain(topic)
+        yield "Please enter a topic!"
+        return
+    yield from eli5_explain(topic)
 
 # ============================================
 # Morning Tech Report
 # ============================================
 
+# Near-duplicate detection: the same story from several outlets is sent to
+# the LLM once. MinHash signatures over word shingles, bucketed with LSH.
+DEDUP = {
+    "num_hashes": 64,
+    "bands": 32,  # 32 bands of 2 hashes: stories ~50% similar almost always share a bucket
+    "threshold": 0.5,  # estimated Jaccard similarity at which two articles are the same story
+    "shingle_words": 2,  # words per shingle
+    "max_words": 60,  # words of title + summary that are compared
+}
+
+_MINHASH_PRIME = (1 << 61) - 1
+_minhash_rng = random.Random(17)
+_MINHASH_PARAMS = [
+    (_minhash_rng.randrange(1, _MINHASH_PRIME), _minhash_rng.randrange(_MINHASH_PRIME))
+    for _ in range(DEDUP["num_hashes"])
+]
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is",
+    "it", "its", "of", "on", "or", "that", "the", "this", "to", "was", "with", "will", "new",
+}
+
+def article_shingles(article):
+    """Hashed distinct word n-grams of an article's title and summary.
+    
+    Markup, links and stopwords are dropped first. Runs of words rather than
+    single words, so headlines that only share vocabulary ("X releases its
+    most capable model yet") don't look like the same story.
+    """
+    text = re.sub(r"<[^>]+>|https?://\S+", " ", f"{article['title']} {article.get('summary', '')}").lower()
+    words = [w for w in re.findall(r"[a-z0-9]+", text) if w not in STOPWORDS][:DEDUP["max_words"]]
+    if not words:
+        return []
+    n = DEDUP["shingle_words"]
+    shingles = {" ".join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))}
+    return [zlib.crc32(s.encode()) for s in shingles]
+
+def minhash_signature(shingles):
+    """MinHash signature of a set of hashed shingles."""
+    if not shingles:
+        return None
+    return [min((a * h + b) % _MINHASH_PRIME for h in shingles) for a, b in _MINHASH_PARAMS]
+
+def cluster_articles(articles):
+    """Group articles that cover the same story.
+    
+    Returns clusters (lists of articles) in order of each cluster's first
+    article, which is the cluster's representative. Each article joins the
+    most similar representative it shares an LSH bucket with, if their MinHash
+    signatures agree on at least DEDUP["threshold"] of hashes, and otherwise
+    starts a cluster of its own. Articles are only compared with
+    representatives, so a chain of loosely similar headlines isn't merged.
+    """
+    rows = DEDUP["num_hashes"] // DEDUP["bands"]
+    clusters = []  # (representative's signature, articles)
+    buckets = {}  # LSH bucket -> indexes of the clusters whose representative is in it
+    for article in articles:
+        signature = minhash_signature(article_shingles(article))
+        if signature is None:
+            clusters.append((None, [article]))
+            continue
+        keys = [(band, tuple(signature[band * rows:(band + 1) * rows])) for band in range(DEDUP["bands"])]
+        candidates = sorted({c for key in keys for c in buckets.get(key, ())})
+        agreement = {
+            c: sum(x == y for x, y in zip(signature, clusters[c][0])) / DEDUP["num_hashes"]
+            for c in candidates
+        }
+        best = max(candidates, key=agreement.get, default=None)
+        if best is not None and agreement[best] >= DEDUP["threshold"]:
+            clusters[best][1].append(article)
+            continue
+        for key in keys:
+            buckets.setdefault(key, []).append(len(clusters))
+        clusters.append((signature, [article]))
+    return [members for _, members in clusters]
+
+def story_sources(cluster):
+    """Names of the sources covering a story, e.g. "TechCrunch AI / Ars Technica"."""
+    return " / ".join(dict.fromkeys(a["source"] for a in cluster))
+
 def fetch_tech_news():
     """Fetch articles from RSS feeds."""
     articles = []
+    feeds = download_feeds(RSS_FEEDS)
+    archive_feed_entries(feeds, RSS_FEEDS)
     for feed_info in RSS_FEEDS:
         try:
-            feed = feedparser.parse(feed_info["url"])
+            feed = feeds[feed_info["url"]].result()
             for entry in feed.entries[:5]:
                 articles.append({
                     "title": entry.get("title", "No title"),
@@ -139,17 +1329,19 @@ def fetch_tech_news():
     return articles
 
 def generate_tech_report():
-    """Generate the morning tech report."""
+    """Generate the morning tech report, yielding it as the analysis is written."""
     print("[DEBUG] Fetching tech news...")
+    yield "*⏳ Fetching today's headlines...*"
     articles = fetch_tech_news()
     
     if not articles:
-        return "❌ Error: Could not fetch news. Check your internet connection."
+        yield "❌ Error: Could not fetch news. Check your internet connection."
+        return
     
-    # Prepare article summaries for the prompt
+    # Prepare article summaries for the prompt, one line per story
     article_text = "\n".join([
-        f"• **{a['title']}** ({a['source']})"
-        for a in articles[:15]
+        f"• **{story[0]['title']}** ({story_sources(story)})"
+        for story in cluster_articles(articles)[:15]
     ])
     
     prompt = f"""You are a tech trend analyst. Based on these headlines from today, provide a brief morning briefing:
@@ -168,18 +1360,16 @@ Format your response as:
 
 Keep it concise and actionable."""
 
-    print("[DEBUG] Analyzing with Ollama...")
-    analysis = query_llm(prompt)
-    
-    # Build the report
+    # Build the report around the analysis, which streams in
     date_str = datetime.now().strftime("%Y-%m-%d %H:%M")
     
-    report = f"""# 🌅 Morning Tech Report
+    head = f"""# 🌅 Morning Tech Report
 **Generated:** {date_str} | **Articles:** {len(articles)}
 
 ---
 
-{analysis}
+"""
+    headlines = """
 
 ---
 
@@ -190,12 +1380,34 @@ Keep it concise and actionable."""
     for cat in ["ai", "tech"]:
         cat_articles = [a for a in articles if a["category"] == cat]
         if cat_articles:
-            report += f"### {'🤖 AI' if cat == 'ai' else '💻 Tech'}\n"
+            headlines += f"### {'🤖 AI' if cat == 'ai' else '💻 Tech'}\n"
             for a in cat_articles[:5]:
-                report += f"- [{a['title']}]({a['link']}) — {a['source']}\n"
-            report += "\n"
+                headlines += f"- [{a['title']}]({a['link']}) — {a['source']}\n"
+            headlines += "\n"
     
-    return report
+    yield head + "*⏳ Analyzing...*" + headlines
+    print("[DEBUG] Analyzing with Groq...")
+    analysis = ""
+    for token in stream_llm(prompt, kind="tech_report"):
+        analysis += token
+        yield head + analysis + headlines
+
+def search_archive(query):
+    """Markdown list of archived headlines matching a keyword search."""
+    if not query.strip():
+        return "Enter keywords to search past headlines."
+    try:
+        rows = search_articles(query)
+    except sqlite3.Error as e:
+        return f"❌ Error searching the archive: {e}"
+    if not rows:
+        return f"No archived articles match **{query}**."
+    
+    lines = [f"### 🔎 {len(rows)} archived articles matching \"{query}\"", ""]
+    for row in rows:
+        when = row["published"] or row["first_seen"]
+        lines.append(f"- [{row['title']}]({row['link']}) — {row['source']}, {datetime.fromtimestamp(when).strftime('%b %d, %Y')}")
+    return "\n".join(lines)
 
 # ============================================
 # Financial Market Update
@@ -260,31 +1472,472 @@ DATE_RANGE_OPTIONS = {
     "1 Year": 365,
 }
 
-def get_ticker_data(ticker, start_date, end_date):
-    """Fetch data for a single ticker."""
+# Every range is sliced from one stored history covering the longest range
+HISTORY_DAYS = max(DATE_RANGE_OPTIONS.values())
+
+def summarize_history(ticker, hist):
+    """Compute price and percentage change from a ticker's price history."""
+    if hist is None or hist.empty or len(hist) < 1:
+        return None
+    
+    start_price = hist['Close'].iloc[0]
+    end_price = hist['Close'].iloc[-1]
+    
+    if start_price == 0:
+        return None
+    
+    pct_change = ((end_price - start_price) / start_price) * 100
+    
+    return {
+        "ticker": ticker,
+        "current": end_price,
+        "pct_change": pct_change,
+    }
+
+# Local price store: one memory-mapped .npy file per ticker
+PRICE_STORE = {
+    "dir": Path(os.getenv("MARKET_STORE_DIR", Path.home() / ".cache" / "easy_life_with_ai" / "prices")),
+    "max_bytes": int(os.getenv("MARKET_STORE_MAX_MB", "50")) * 1024 * 1024,
+    "max_idle_days": 30,
+    "gap_days": 5,
+    "refresh_seconds": int(os.getenv("MARKET_REFRESH_SECONDS", "300")),
+}
+STORE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+def load_stored_history(ticker):
+    """Load a ticker's stored daily bars (day number, then OHLCV rows), or None."""
+    path = PRICE_STORE["dir"] / f"{quote(ticker, safe='')}.npy"
     try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(start=start_date, end=end_date)
-        
-        if hist.empty or len(hist) < 1:
-            return None
-        
-        start_price = hist['Close'].iloc[0]
-        end_price = hist['Close'].iloc[-1]
-        
-        if start_price == 0:
-            return None
+        columns = np.load(path, mmap_mode="r")
+        # Record the read so eviction keeps recently used tickers
+        os.utime(path, (time.time(), path.stat().st_mtime))
+    except (FileNotFoundError, ValueError):
+        return None
+    index = pd.to_datetime(np.asarray(columns[0], dtype="int64"), unit="D")
+    hist = pd.DataFrame({name: columns[i + 1] for i, name in enumerate(STORE_COLUMNS)}, index=index)
+    # A leading day without prices marks where the stored window was fetched
+    # from; Yahoo had no bars before the first real one (e.g. a recent listing)
+    if len(hist) and np.isnan(hist["Close"].iloc[0]):
+        covered_from = hist.index[0]
+        hist = hist.iloc[1:]
+        hist.attrs["covered_from"] = covered_from
+    return hist
+
+def store_frame(hist):
+    """Fetched bars in the store's shape: STORE_COLUMNS as float64, indexed by naive day."""
+    index = hist.index
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_localize(None)
+    return pd.DataFrame(
+        {name: hist[name].to_numpy() if name in hist else 0.0 for name in STORE_COLUMNS},
+        index=index.normalize(),
+    ).astype("float64")
+
+def save_stored_history(ticker, hist, stored=None, covered_from=None):
+    """Merge freshly fetched bars into a ticker's stored history and write it back.
+    
+    `covered_from` is the start of the window `hist` was fetched for, when
+    nothing is merged into; it is kept across later merges.
+    """
+    fresh = store_frame(hist)
+    # Fresh bars replace stored ones for the same day (partial intraday bars)
+    merged = fresh if stored is None else pd.concat([stored, fresh])
+    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+    
+    days = merged.index.values.astype("datetime64[D]").astype("int64")
+    columns = np.vstack([days.astype("float64")] + [merged[name].to_numpy() for name in STORE_COLUMNS])
+    
+    if covered_from is None and stored is not None:
+        covered_from = stored.attrs.get("covered_from")
+    if covered_from is not None and pd.Timestamp(covered_from).normalize() < merged.index[0]:
+        covered_from = pd.Timestamp(covered_from).normalize()
+        merged.attrs["covered_from"] = covered_from
+        marker = np.full((len(columns), 1), np.nan)
+        marker[0, 0] = np.datetime64(covered_from, "D").astype("int64")
+        columns = np.hstack([marker, columns])
+    
+    path = PRICE_STORE["dir"] / f"{quote(ticker, safe='')}.npy"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, columns)
+    os.replace(tmp_path, path)
+    return merged
+
+def history_start(start_date, end_date):
+    """Start of the window kept in the store: the longest date range, or start_date if earlier."""
+    return min(start_date, end_date - timedelta(days=HISTORY_DAYS))
+
+def missing_start(ticker, stored, start_date):
+    """First date that has to be fetched to cover start_date, or None if the store is current."""
+    if stored is None or stored.empty:
+        return start_date
+    if stored.attrs.get("covered_from", stored.index[0]) - start_date > timedelta(days=PRICE_STORE["gap_days"]):
+        return start_date
+    path = PRICE_STORE["dir"] / f"{quote(ticker, safe='')}.npy"
+    try:
+        refreshed = path.stat().st_mtime
+    except FileNotFoundError:
+        return start_date  # evicted since it was loaded
+    if time.time() - refreshed < PRICE_STORE["refresh_seconds"]:
+        return None
+    # Refetch the last two stored bars: the last may have been a partial trading
+    # day, and the one before shows whether Yahoo has re-adjusted the history
+    return stored.index[-min(2, len(stored))].to_pydatetime()
+
+def history_rescaled(stored, hist):
+    """Whether fresh bars disagree with the stored closes of the days both cover.
+    
+    Yahoo rescales auto-adjusted prices after a split or dividend. The last
+    stored day is left out, as it may have been a partial trading day.
+    """
+    if stored is None or hist is None or hist.empty:
+        return False
+    fresh = store_frame(hist)
+    days = stored.index[:-1].intersection(fresh.index)
+    return not np.allclose(stored["Close"].loc[days], fresh["Close"].loc[days], rtol=1e-4, equal_nan=True)
+
+def slice_history(hist, start_date, end_date):
+    """Bars of a stored history that fall within [start_date, end_date)."""
+    if hist is None:
+        return None
+    dates = hist.index.values
+    first = np.searchsorted(dates, np.datetime64(start_date))
+    last = np.searchsorted(dates, np.datetime64(end_date))
+    return hist.iloc[first:last]
+
+def evict_store():
+    """Remove idle tickers, then least recently used ones until the store fits its size budget."""
+    entries = []
+    for path in PRICE_STORE["dir"].glob("*.npy"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue  # evicted by another thread
+        entries.append((stat.st_atime, stat.st_size, path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    idle_cutoff = time.time() - PRICE_STORE["max_idle_days"] * 86400
+    for last_used, size, path in entries:
+        if total <= PRICE_STORE["max_bytes"] and last_used >= idle_cutoff:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+# Request budget shared by all Yahoo traffic (token bucket with adaptive backoff)
+YAHOO_LIMITS = {
+    "rate": float(os.getenv("YAHOO_RATE", "10")),  # max ticker requests per second
+    "burst": float(os.getenv("YAHOO_BURST", "50")),  # bucket size
+    "min_rate": 0.5,  # rate floor while throttled
+    "background_reserve": 0.5,  # share of the bucket the precompute thread leaves for users
+    "max_retries": 3,  # retries of a throttled request
+    "max_backoff": 60.0,  # seconds
+}
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+_yahoo_priority = contextvars.ContextVar("yahoo_priority", default=INTERACTIVE)
+# Set of tickers that stayed throttled for the current report, if one is collecting them
+_yahoo_failures = contextvars.ContextVar("yahoo_failures", default=None)
+_yahoo_state = {
+    "tokens": YAHOO_LIMITS["burst"],
+    "updated": time.monotonic(),
+    "rate": YAHOO_LIMITS["rate"],
+    "backoff": 0.0,
+    "blocked_until": 0.0,
+}
+_yahoo_cond = threading.Condition()
+_yahoo_log = threading.local()
+
+@contextmanager
+def yahoo_priority(priority):
+    """Run the enclosed Yahoo requests at INTERACTIVE or BACKGROUND priority."""
+    token = _yahoo_priority.set(priority)
+    try:
+        yield
+    finally:
+        _yahoo_priority.reset(token)
+
+def acquire_yahoo(cost):
+    """Block until the request budget allows `cost` ticker requests.
+    
+    Background requests wait until the bucket is above the reserve kept for
+    interactive ones. A cost larger than the bucket is allowed once it is full.
+    """
+    reserve = YAHOO_LIMITS["burst"] * YAHOO_LIMITS["background_reserve"] if _yahoo_priority.get() == BACKGROUND else 0.0
+    needed = min(cost, YAHOO_LIMITS["burst"] - reserve) + reserve
+    
+    with _yahoo_cond:
+        while True:
+            now = time.monotonic()
+            state = _yahoo_state
+            state["tokens"] = min(YAHOO_LIMITS["burst"], state["tokens"] + (now - state["updated"]) * state["rate"])
+            state["updated"] = now
+            
+            if now >= state["blocked_until"] and state["tokens"] >= needed:
+                state["tokens"] -= cost
+                return
+            
+            _yahoo_cond.wait(timeout=max(state["blocked_until"] - now, (needed - state["tokens"]) / state["rate"]))
+
+def record_yahoo_response(throttled):
+    """Adapt the request budget: halve the rate and back off on throttling, recover on success."""
+    with _yahoo_cond:
+        state = _yahoo_state
+        if throttled:
+            state["backoff"] = min(YAHOO_LIMITS["max_backoff"], max(1.0, state["backoff"] * 2))
+            state["blocked_until"] = time.monotonic() + state["backoff"]
+            state["rate"] = max(YAHOO_LIMITS["min_rate"], state["rate"] / 2)
+            state["tokens"] = min(state["tokens"], 0.0)
+        else:
+            state["backoff"] = state["backoff"] / 2 if state["backoff"] >= 1.0 else 0.0
+            state["rate"] = min(YAHOO_LIMITS["rate"], state["rate"] + YAHOO_LIMITS["rate"] / 10)
+        _yahoo_cond.notify_all()
+
+def is_throttled(error):
+    """Whether an exception or error message is Yahoo rate limiting us."""
+    text = f"{type(error).__name__} {error}".lower()
+    return any(sign in text for sign in ("ratelimit", "rate limit", "too many requests", "429"))
+
+def note_yahoo_failures(tickers):
+    """Record tickers that stayed throttled so the current report can mention them."""
+    failures = _yahoo_failures.get()
+    if failures is not None:
+        failures.update(tickers)
+
+class ThrottledTickersLog(logging.Handler):
+    """Collects tickers yfinance logs as rate limited during a download on this thread.
+    
+    yf.download doesn't raise per-ticker errors; it logs lines like
+    "['AAPL', 'MSFT']: YFRateLimitError('Too Many Requests...')".
+    """
+    
+    def emit(self, record):
+        tickers = getattr(_yahoo_log, "throttled", None)
+        message = record.getMessage()
+        if tickers is None or not is_throttled(message) or "]:" not in message:
+            return
+        try:
+            tickers.update(ast.literal_eval(message.split("]:", 1)[0].strip() + "]"))
+        except (ValueError, SyntaxError):
+            pass
+
+logging.getLogger("yfinance").addHandler(ThrottledTickersLog())
+
+# Yahoo requests in flight, shared by concurrent users: (ticker, start day, end day) -> Future
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def claim_flights(keys):
+    """Split fetch keys into (owned, waiting): ones this caller fetches and ones already in flight."""
+    owned, waiting = {}, {}
+    with _inflight_lock:
+        for key in keys:
+            if key in _inflight:
+                waiting[key] = _inflight[key]
+            else:
+                owned[key] = _inflight[key] = Future()
+    return owned, waiting
+
+def land_flights(owned, results):
+    """Hand fetch results to everyone waiting on the owned keys."""
+    with _inflight_lock:
+        for key in owned:
+            del _inflight[key]
+    for key, future in owned.items():
+        future.set_result(results.get(key))
+
+def fetch_history(ticker, start_date, end_date):
+    """Fetch one ticker's history from Yahoo; concurrent calls for the same window share one request."""
+    key = (ticker, start_date.date(), end_date.date())
+    owned, waiting = claim_flights([key])
+    if waiting:
+        return waiting[key].result()
+    
+    hist = None
+    try:
+        for attempt in range(YAHOO_LIMITS["max_retries"] + 1):
+            acquire_yahoo(1)
+            try:
+                hist = yf.Ticker(ticker).history(start=start_date, end=end_date)
+            except Exception as e:
+                if not is_throttled(e):
+                    print(f"Error fetching {ticker}: {e}")
+                    break
+                record_yahoo_response(throttled=True)
+                if attempt == YAHOO_LIMITS["max_retries"]:
+                    print(f"Error fetching {ticker}: still rate limited after {attempt} retries")
+                    note_yahoo_failures([ticker])
+            else:
+                record_yahoo_response(throttled=False)
+                break
+    finally:
+        land_flights(owned, {key: hist})
+    return hist
+
+def get_ticker_data(ticker, start_date, end_date):
+    """Fetch data for a single ticker, downloading only bars missing from the store.
+    
+    When Yahoo has re-adjusted the ticker's prices since they were stored, the
+    whole window is fetched again.
+    """
+    stored = load_stored_history(ticker)
+    window_start = history_start(start_date, end_date)
+    fetch_start = missing_start(ticker, stored, window_start)
+    if fetch_start is not None:
+        hist = fetch_history(ticker, fetch_start, end_date)
+        if fetch_start != window_start and history_rescaled(stored, hist):
+            fetch_start = window_start
+            hist = fetch_history(ticker, window_start, end_date)
+        if hist is not None and not hist.empty:
+            if fetch_start == window_start:
+                stored = save_stored_history(ticker, hist, covered_from=window_start)
+            else:
+                stored = save_stored_history(ticker, hist, stored)
+    return summarize_history(ticker, slice_history(stored, start_date, end_date))
+
+def request_batch(tickers, start_date, end_date):
+    """Download history for many tickers with multi-symbol Yahoo requests.
+    
+    Tickers Yahoo throttled are retried after backing off; ones still throttled
+    after max_retries are noted as failures for the current report.
+    """
+    histories = {}
+    remaining = tickers
+    for attempt in range(YAHOO_LIMITS["max_retries"] + 1):
+        acquire_yahoo(len(remaining))
+        _yahoo_log.throttled = throttled = set()
+        try:
+            data = yf.download(
+                remaining,
+                start=start_date,
+                end=end_date,
+                group_by="ticker",
+                auto_adjust=True,
+                threads=True,
+                progress=False,
+            )
+        except Exception as e:
+            if not is_throttled(e):
+                print(f"Error fetching batch {remaining}: {e}")
+                remaining = []
+                break
+            data = None
+            throttled.update(remaining)
+        finally:
+            _yahoo_log.throttled = None
         
-        pct_change = ((end_price - start_price) / start_price) * 100
+        if data is not None and not data.empty:
+            # Older yfinance returns flat columns for a single symbol
+            if data.columns.nlevels == 1:
+                histories[remaining[0]] = data.dropna(how="all")
+            else:
+                symbols = set(data.columns.get_level_values(0))
+                histories.update({t: data[t].dropna(how="all") for t in remaining if t in symbols})
         
-        return {
-            "ticker": ticker,
-            "current": end_price,
-            "pct_change": pct_change,
-        }
-    except Exception as e:
-        print(f"Error fetching {ticker}: {e}")
-        return None
+        remaining = [t for t in remaining if t in throttled and histories.get(t, pd.DataFrame()).empty]
+        record_yahoo_response(throttled=bool(remaining))
+        if not remaining:
+            break
+    
+    if remaining:
+        print(f"Error fetching {', '.join(remaining)}: still rate limited after {YAHOO_LIMITS['max_retries']} retries")
+        note_yahoo_failures(remaining)
+    
+    return histories
+
+def download_batch(tickers, start_date, end_date):
+    """Download history for many tickers, waiting on tickers other users are already fetching."""
+    keys = {ticker: (ticker, start_date.date(), end_date.date()) for ticker in tickers}
+    owned, waiting = claim_flights(keys.values())
+    to_fetch = [ticker for ticker in tickers if keys[ticker] in owned]
+    
+    histories = {}
+    try:
+        if to_fetch:
+            histories = request_batch(to_fetch, start_date, end_date)
+    finally:
+        land_flights(owned, {keys[ticker]: histories.get(ticker) for ticker in to_fetch})
+    
+    for ticker in tickers:
+        if keys[ticker] in waiting:
+            hist = waiting[keys[ticker]].result()
+            if hist is not None:
+                histories[ticker] = hist
+    return histories
+
+def fetch_history_batch(tickers, start_date, end_date):
+    """Fetch history for many tickers, downloading only what the store is missing.
+    
+    Stored tickers share one request for their recent tail; new tickers share
+    one request for the longest date range, so switching ranges is a local
+    slice. Stored tickers whose prices Yahoo has re-adjusted (a split or
+    dividend) join the second request. Tickers refreshed within
+    refresh_seconds aren't requested at all.
+    """
+    if not tickers:
+        return {}
+    
+    window_start = history_start(start_date, end_date)
+    stored = {ticker: load_stored_history(ticker) for ticker in tickers}
+    missing = {ticker: missing_start(ticker, hist, window_start) for ticker, hist in stored.items()}
+    cold = [t for t in tickers if missing[t] == window_start]
+    warm = [t for t in tickers if missing[t] not in (None, window_start)]
+    
+    if warm:
+        for ticker, hist in download_batch(warm, min(missing[t] for t in warm), end_date).items():
+            if history_rescaled(stored[ticker], hist):
+                cold.append(ticker)
+            elif not hist.empty:
+                stored[ticker] = save_stored_history(ticker, hist, stored[ticker])
+    
+    if cold:
+        for ticker, hist in download_batch(cold, window_start, end_date).items():
+            if not hist.empty:
+                stored[ticker] = save_stored_history(ticker, hist, covered_from=window_start)
+    
+    histories = {}
+    for ticker, hist in stored.items():
+        hist = slice_history(hist, start_date, end_date)
+        if hist is not None and not hist.empty:
+            histories[ticker] = hist
+    return histories
+
+def summarize_histories(histories):
+    """Compute price and percentage change for many tickers in a few array ops.
+    
+    Closes are aligned into one dates x tickers matrix (NaN where a ticker has
+    no bar), so every ticker's first/last close and change come out of the
+    same vectorized pass. Matches summarize_history for each ticker.
+    """
+    tickers = list(histories)
+    if not tickers:
+        return {}
+    
+    days = [histories[t].index.values.astype("datetime64[D]") for t in tickers]
+    dates = np.unique(np.concatenate(days))
+    close = np.full((len(dates), len(tickers)), np.nan)
+    for col, ticker in enumerate(tickers):
+        close[np.searchsorted(dates, days[col]), col] = histories[ticker]["Close"].to_numpy(dtype="float64")
+    
+    valid = ~np.isnan(close)
+    cols = np.arange(len(tickers))
+    start_price = close[valid.argmax(axis=0), cols]
+    end_price = close[len(dates) - 1 - valid[::-1].argmax(axis=0), cols]
+    has_data = valid.any(axis=0) & (start_price != 0)
+    pct_change = (end_price - start_price) / np.where(has_data, start_price, 1.0) * 100
+    
+    return {
+        tickers[col]: {"ticker": tickers[col], "current": end_price[col], "pct_change": pct_change[col]}
+        for col in np.flatnonzero(has_data)
+    }
+
+def lookup_ticker_data(ticker, start_date, end_date, metrics):
+    """Use precomputed metrics when available, otherwise fetch the ticker on its own."""
+    if metrics is None:
+        return get_ticker_data(ticker, start_date, end_date)
+    return metrics.get(ticker)
 
 def format_pct_change(pct):
     """Format percentage change with color indicator."""
@@ -294,79 +1947,218 @@ def format_pct_change(pct):
         return f"🔴 {pct:.2f}%"
     return f"⚪ {pct:.2f}%"
 
-def generate_market_update(date_range, asset_class, region):
-    """Generate financial market update report."""
-    print(f"[DEBUG] Generating market update: {date_range}, {asset_class}, {region}")
-    
-    days = DATE_RANGE_OPTIONS.get(date_range, 7)
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    report_parts = []
-    
-    # Header
-    report_parts.append(f"## 📊 {asset_class} — {region} ({date_range})")
+def get_report_tickers(asset_class, region):
+    """Collect every ticker a market report needs, in order and without duplicates."""
+    tickers = list(MARKET_INDICES.get(region, MARKET_INDICES["US"]))
+    tickers += ASSET_TICKERS.get(asset_class, ASSET_TICKERS["Stocks"])
+    if asset_class == "Stocks" and region == "US":
+        tickers += list(SECTOR_ETFS)
+    return list(dict.fromkeys(tickers))
+
+def fetch_report_metrics(tickers, start_date, end_date, failures):
+    """Fetch a report's tickers in one batch and compute their metrics.
     
-    # Market Indices
-    indices = MARKET_INDICES.get(region, MARKET_INDICES["US"])
+    If the batch request fails, tickers are fetched one at a time. Tickers
+    that stay rate limited are added to `failures`.
+    """
+    context = contextvars.copy_context()
+    context.run(_yahoo_failures.set, failures)
+    histories = context.run(fetch_history_batch, tickers, start_date, end_date)
+    metrics = summarize_histories(histories) if histories else None
+    results = {}
+    for ticker in tickers:
+        data = context.run(lookup_ticker_data, ticker, start_date, end_date, metrics)
+        if data:
+            results[ticker] = data
+    return results
+
+def render_indices_section(region, metrics):
+    """Markdown for the market indices table, or "" if there is no data."""
     index_data = []
-    for ticker, name in indices.items():
-        data = get_ticker_data(ticker, start_date, end_date)
+    for ticker, name in MARKET_INDICES.get(region, MARKET_INDICES["US"]).items():
+        data = metrics.get(ticker)
         if data:
-            data["name"] = name
-            index_data.append(data)
-    
-    if index_data:
-        report_parts.append("### 📈 Indices")
-        report_parts.append("| Index | Price | Change |")
-        report_parts.append("|-------|-------|--------|")
-        for idx in index_data:
-            price_fmt = f"${idx['current']:,.0f}" if idx['current'] > 100 else f"{idx['current']:.2f}"
-            report_parts.append(f"| {idx['name']} | {price_fmt} | {format_pct_change(idx['pct_change'])} |")
-        report_parts.append("")
-    
-    # Top Movers (compact: side by side)
+            index_data.append({**data, "name": name})
+    
+    if not index_data:
+        return ""
+    
+    lines = ["### 📈 Indices", "| Index | Price | Change |", "|-------|-------|--------|"]
+    for idx in index_data:
+        price_fmt = f"${idx['current']:,.0f}" if idx['current'] > 100 else f"{idx['current']:.2f}"
+        lines.append(f"| {idx['name']} | {price_fmt} | {format_pct_change(idx['pct_change'])} |")
+    lines.append("")
+    return "\n".join(lines)
+
+def render_movers_section(asset_class, metrics):
+    """Markdown for the top movers table (compact: side by side), or "" if there is no data."""
     tickers = ASSET_TICKERS.get(asset_class, ASSET_TICKERS["Stocks"])
-    movers = []
-    for ticker in tickers:
-        data = get_ticker_data(ticker, start_date, end_date)
+    movers = [metrics[ticker] for ticker in tickers if ticker in metrics]
+    if not movers:
+        return ""
+    
+    sorted_movers = sorted(movers, key=lambda x: x["pct_change"], reverse=True)
+    lines = ["### 🚀 Top Movers", "| 📈 Gainers | | 📉 Losers | |", "|------------|---|-----------|---|"]
+    
+    losers = sorted_movers[-3:][::-1]
+    for i in range(3):
+        g = sorted_movers[i] if i < len(sorted_movers) else None
+        l = losers[i] if i < len(losers) else None
+        g_str = f"{g['ticker']} {format_pct_change(g['pct_change'])}" if g else ""
+        l_str = f"{l['ticker']} {format_pct_change(l['pct_change'])}" if l else ""
+        lines.append(f"| {g_str} | | {l_str} | |")
+    lines.append("")
+    return "\n".join(lines)
+
+def render_sectors_section(metrics):
+    """Markdown for the compact sector line, or "" if there is no data."""
+    sectors = []
+    for ticker, name in SECTOR_ETFS.items():
+        data = metrics.get(ticker)
         if data:
-            movers.append(data)
+            sectors.append({**data, "name": name})
     
-    if movers:
-        sorted_movers = sorted(movers, key=lambda x: x["pct_change"], reverse=True)
-        
-        report_parts.append("### 🚀 Top Movers")
-        report_parts.append("| 📈 Gainers | | 📉 Losers | |")
-        report_parts.append("|------------|---|-----------|---|")
-        
-        losers = sorted_movers[-3:][::-1]
-        for i in range(3):
-            g = sorted_movers[i] if i < len(sorted_movers) else None
-            l = losers[i] if i < len(losers) else None
-            g_str = f"{g['ticker']} {format_pct_change(g['pct_change'])}" if g else ""
-            l_str = f"{l['ticker']} {format_pct_change(l['pct_change'])}" if l else ""
-            report_parts.append(f"| {g_str} | | {l_str} | |")
-        report_parts.append("")
+    if not sectors:
+        return ""
     
+    sorted_sectors = sorted(sectors, key=lambda x: x["pct_change"], reverse=True)
+    sector_line = " • ".join([f"{s['name'][:4]} {format_pct_change(s['pct_change'])}" for s in sorted_sectors[:5]])
+    return "### 🏭 Sectors\n" + sector_line
+
+def stream_market_update(date_range, asset_class, region):
+    """Build a market update report, yielding the partial report as each section is filled in.
+    
+    The header and section placeholders render immediately. The indices are
+    fetched in one multi-symbol request and the movers and sectors in another,
+    running alongside it, so the indices show while the longer request loads.
+    """
+    print(f"[DEBUG] Building market update: {date_range}, {asset_class}, {region}")
+    
+    days = DATE_RANGE_OPTIONS.get(date_range, 7)
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+    
+    header = f"## 📊 {asset_class} — {region} ({date_range})"
+    footer = f"\n*Yahoo Finance • Data as of {end_date.strftime('%b %d %H:%M')}*"
+    renderers = {
+        "indices": lambda metrics: render_indices_section(region, metrics),
+        "movers": lambda metrics: render_movers_section(asset_class, metrics),
+    }
     # Sector Performance (compact, only for US Stocks)
     if asset_class == "Stocks" and region == "US":
-        sectors = []
-        for ticker, name in SECTOR_ETFS.items():
-            data = get_ticker_data(ticker, start_date, end_date)
-            if data:
-                data["name"] = name
-                sectors.append(data)
-        
-        if sectors:
-            sorted_sectors = sorted(sectors, key=lambda x: x["pct_change"], reverse=True)
-            report_parts.append("### 🏭 Sectors")
-            sector_line = " • ".join([f"{s['name'][:4]} {format_pct_change(s['pct_change'])}" for s in sorted_sectors[:5]])
-            report_parts.append(sector_line)
+        renderers["sectors"] = render_sectors_section
+    
+    sections = {name: "*⏳ Loading...*" for name in renderers}
+    yield "\n".join([header, *sections.values()])
     
-    report_parts.append(f"\n*Yahoo Finance • {datetime.now().strftime('%H:%M')}*")
+    index_tickers = list(MARKET_INDICES.get(region, MARKET_INDICES["US"]))
+    other_tickers = [t for t in get_report_tickers(asset_class, region) if t not in index_tickers]
+    failures = set()
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="market-section") as pool:
+        # Each job runs in a copy of the caller's context, keeping its Yahoo priority
+        stages = [
+            (["indices"], pool.submit(contextvars.copy_context().run, fetch_report_metrics, index_tickers, start_date, end_date, failures)),
+            ([name for name in renderers if name != "indices"], pool.submit(contextvars.copy_context().run, fetch_report_metrics, other_tickers, start_date, end_date, failures)),
+        ]
+        pending = set(sections)
+        for names, job in stages:
+            try:
+                metrics = job.result()
+            except Exception as e:
+                print(f"Error fetching {' and '.join(names)}: {e}")
+                metrics = {}
+            for name in names:
+                sections[name] = renderers[name](metrics)
+                pending.discard(name)
+            parts = [header] + [section for section in sections.values() if section]
+            if not pending:
+                if failures:
+                    parts.append(f"\n*⚠️ Yahoo is rate limiting requests; missing: {', '.join(sorted(failures))}*")
+                parts.append(footer)
+            yield "\n".join(parts)
     
-    return "\n".join(report_parts)
+    evict_store()
+
+def build_market_update(date_range, asset_class, region):
+    """Build a complete financial market update report."""
+    report = ""
+    for report in stream_market_update(date_range, asset_class, region):
+        pass
+    return report
+
+# Background precomputation: every date range x asset class x region report
+# is rebuilt on a schedule so the Market tab reads a ready snapshot
+MARKET_PRECOMPUTE = {
+    "enabled": os.getenv("MARKET_PRECOMPUTE", "1") == "1",
+    "market_hours_interval": int(os.getenv("MARKET_PRECOMPUTE_MARKET_HOURS", "300")),  # seconds
+    "off_hours_interval": int(os.getenv("MARKET_PRECOMPUTE_OFF_HOURS", "3600")),  # seconds
+}
+
+# (date_range, asset_class, region) -> (report, built at timestamp)
+_market_snapshots = {}
+_market_snapshots_lock = threading.Lock()
+
+def us_market_open():
+    """Whether the US stock market is in regular trading hours (Mon-Fri 9:30-16:00 ET)."""
+    now = datetime.now(ZoneInfo("America/New_York"))
+    minutes = now.hour * 60 + now.minute
+    return now.weekday() < 5 and 9 * 60 + 30 <= minutes < 16 * 60
+
+def precompute_interval():
+    """Seconds between precompute runs: tighter while the market is open."""
+    if us_market_open():
+        return MARKET_PRECOMPUTE["market_hours_interval"]
+    return MARKET_PRECOMPUTE["off_hours_interval"]
+
+def store_market_snapshot(date_range, asset_class, region, report):
+    """Save a built report in the snapshot table."""
+    with _market_snapshots_lock:
+        _market_snapshots[(date_range, asset_class, region)] = (report, time.time())
+
+def precompute_market_reports():
+    """Build every market report combination into the snapshot table."""
+    for date_range in DATE_RANGE_OPTIONS:
+        for asset_class in ASSET_TICKERS:
+            for region in MARKET_INDICES:
+                try:
+                    report = build_market_update(date_range, asset_class, region)
+                    store_market_snapshot(date_range, asset_class, region, report)
+                except Exception as e:
+                    print(f"Error precomputing {date_range}/{asset_class}/{region}: {e}")
+
+def run_market_scheduler():
+    """Rebuild all market report snapshots forever, on the precompute cadence.
+    
+    Runs at background priority so users' own requests keep part of the Yahoo budget.
+    """
+    with yahoo_priority(BACKGROUND):
+        while True:
+            started = time.time()
+            precompute_market_reports()
+            print(f"[DEBUG] Precomputed {len(_market_snapshots)} market reports in {time.time() - started:.1f}s")
+            time.sleep(max(0, precompute_interval() - (time.time() - started)))
+
+def start_market_scheduler():
+    """Start the background precompute thread if enabled."""
+    if not MARKET_PRECOMPUTE["enabled"]:
+        return
+    threading.Thread(target=run_market_scheduler, name="market-precompute", daemon=True).start()
+
+def generate_market_update(date_range, asset_class, region):
+    """Stream financial market update report, from a precomputed snapshot when fresh."""
+    print(f"[DEBUG] Generating market update: {date_range}, {asset_class}, {region}")
+    
+    with _market_snapshots_lock:
+        snapshot = _market_snapshots.get((date_range, asset_class, region))
+    # Allow one missed precompute run before treating a snapshot as stale
+    if snapshot and time.time() - snapshot[1] < 2 * precompute_interval():
+        yield snapshot[0]
+        return
+    
+    report = ""
+    for report in stream_market_update(date_range, asset_class, region):
+        yield report
+    store_market_snapshot(date_range, asset_class, region, report)
 
 # ============================================
 # Weather Forecast
@@ -459,7 +2251,7 @@ def fetch_weather_alerts(lat, lon):
         return []
 
 def generate_weather_tips(forecast_summary, alerts):
-    """Generate AI weather tips based on forecast."""
+    """Generate AI weather tips based on forecast, yielding them token by token."""
     alert_text = ""
     if alerts:
         alert_text = f"\nActive alerts: {', '.join([a['event'] for a in alerts])}"
@@ -471,10 +2263,10 @@ def generate_weather_tips(forecast_summary, alerts):
 Format as bullet points. Be specific and actionable (e.g., "Bring umbrella Tuesday" not "Be prepared for rain").
 Focus on: what to wear, outdoor activities, travel considerations, health tips."""
 
-    return query_llm(prompt)
+    yield from stream_llm(prompt, kind="weather_tips")
 
 def generate_weather_report(location):
-    """Generate complete weather report for a location."""
+    """Generate complete weather report for a location, yielding it as the tips are written."""
     print(f"[DEBUG] Generating weather for: {location}")
     
     coords = LOCATIONS.get(location, LOCATIONS["New York City"])
@@ -483,7 +2275,8 @@ def generate_weather_report(location):
     # Fetch forecast
     forecast = fetch_weather_forecast(lat, lon)
     if not forecast:
-        return "❌ Error: Could not fetch weather data. Try again."
+        yield "❌ Error: Could not fetch weather data. Try again."
+        return
     
     # Fetch alerts
     alerts = fetch_weather_alerts(lat, lon)
@@ -556,101 +2349,172 @@ def generate_weather_report(location):
     # AI Tips (compact)
     report_parts.append("### 💡 Tips")
     forecast_summary = "\n".join(forecast_summary_lines)
-    tips = generate_weather_tips(forecast_summary, alerts)
-    report_parts.append(tips)
+    footer = f"\n*Open-Meteo & NWS • {datetime.now().strftime('%H:%M')}*"
+    yield "\n".join([*report_parts, "*⏳ Writing tips...*", footer])
     
-    report_parts.append(f"\n*Open-Meteo & NWS • {datetime.now().strftime('%H:%M')}*")
-    
-    return "\n".join(report_parts)
+    tips = ""
+    for token in generate_weather_tips(forecast_summary, alerts):
+        tips += token
+        yield "\n".join([*report_parts, tips, footer])
 
 # ============================================
 # AI Feed (No API keys needed!)
 # ============================================
 
 AI_FEED_SOURCES = [
-    {"name": "r/MachineLearning", "url": "https://www.reddit.com/r/MachineLearning/.rss", "icon": "🤖"},
-    {"name": "r/artificial", "url": "https://www.reddit.com/r/artificial/.rss", "icon": "🧠"},
-    {"name": "r/LocalLLaMA", "url": "https://www.reddit.com/r/LocalLLaMA/.rss", "icon": "🦙"},
-    {"name": "Hacker News AI", "url": "https://hnrss.org/newest?q=AI+OR+LLM+OR+GPT+OR+machine+learning", "icon": "📰"},
-    {"name": "Lobsters AI", "url": "https://lobste.rs/t/ai.rss", "icon": "🦞"},
-    {"name": "DEV.to AI", "url": "https://dev.to/feed/tag/ai", "icon": "👩‍💻"},
-    {"name": "ArXiv AI", "url": "http://export.arxiv.org/rss/cs.AI", "icon": "📄"},
+    feed_source("r/MachineLearning", icon="🤖"),
+    feed_source("r/artificial", icon="🧠"),
+    feed_source("r/LocalLLaMA", icon="🦙"),
+    feed_source("Hacker News AI", icon="📰"),
+    feed_source("Lobsters AI", icon="🦞"),
+    feed_source("DEV.to AI", icon="👩‍💻"),
+    feed_source("ArXiv AI", icon="📄"),
 ]
 
+# Score adapters: how a kind of source reports a post's popularity, read with
+# precompiled patterns. Each source's adapter is looked up once, by name.
+REDDIT_POINTS = re.compile(r'(\d+)\s*(?:points?|upvotes?)', re.I)
+HN_TITLE_POINTS = re.compile(r'\[(\d+)\s*points?\]', re.I)
+HN_POINTS = re.compile(r'Points:\s*(\d+)')
+
+def reddit_score(entry):
+    """Reddit: "X points" or "X upvotes" in the content."""
+    content = entry["content"][0].get("value", "") if entry.get("content") else ""
+    match = REDDIT_POINTS.search(content + entry.get("summary", ""))
+    return int(match.group(1)) if match else 0
+
+def hacker_news_score(entry):
+    """Hacker News: points in the hnrss summary, or in the title like "[123 points]"."""
+    match = HN_POINTS.search(entry.get("summary", "")) or HN_TITLE_POINTS.search(entry.get("title", ""))
+    return int(match.group(1)) if match else 0
+
+def no_score(entry):
+    return 0
+
+def score_adapter(source_name):
+    """The score extractor for a source, chosen by its name."""
+    name = source_name.lower()
+    if "reddit" in name or source_name.startswith("r/"):
+        return reddit_score
+    if "hacker" in name or "hn" in name:
+        return hacker_news_score
+    return no_score
+
+SCORE_ADAPTERS = {source["name"]: score_adapter(source["name"]) for source in AI_FEED_SOURCES}
+
 def extract_score(entry, source_name):
     """Extract popularity score from RSS entry."""
-    import re
-    score = 0
-    
-    # Reddit: score is in the title or content
-    if "reddit" in source_name.lower() or source_name.startswith("r/"):
-        content = entry.get("content", [{}])[0].get("value", "") if entry.get("content") else ""
-        content += entry.get("summary", "")
-        # Look for "X points" or "X upvotes"
-        match = re.search(r'(\d+)\s*(?:points?|upvotes?)', content, re.I)
-        if match:
-            score = int(match.group(1))
-    
-    # Hacker News: points in title like "[123 points]"
-    elif "hacker" in source_name.lower() or "hn" in source_name.lower():
-        title = entry.get("title", "")
-        match = re.search(r'\[(\d+)\s*points?\]', title, re.I)
-        if match:
-            score = int(match.group(1))
-        # Also check hnrss format
-        content = entry.get("summary", "")
-        match = re.search(r'Points:\s*(\d+)', content)
-        if match:
-            score = int(match.group(1))
-    
-    return score
-
-def fetch_ai_feed(sources_selected):
-    """Fetch AI content from selected RSS sources, sorted by popularity."""
-    all_posts = []
-    source_map = {s["name"]: s for s in AI_FEED_SOURCES}
-    
-    for source_name in sources_selected:
-        source = source_map.get(source_name)
-        if not source:
-            continue
+    adapter = SCORE_ADAPTERS.get(source_name) or score_adapter(source_name)
+    return adapter(entry)
+
+# Ranking: scores are normalized within each source, then decayed by age
+RANKING = {
+    "half_life_hours": float(os.getenv("AI_FEED_HALF_LIFE_HOURS", "12")),  # a post's rank halves every this many hours
+    "unscored": 0.5,  # normalized score for sources without scores (Lobsters, DEV.to, ArXiv)
+    "floor": 0.1,  # added to normalized scores so fresh low-scored posts still beat stale ones
+}
+
+def normalize_scores(scores):
+    """Scores scaled to 0..1 within one source: the share of the source's other posts each one outscores.
+    
+    Sources report scores on very different scales (or not at all), so only
+    a post's standing within its own source is comparable across sources.
+    """
+    if not any(scores):
+        return [RANKING["unscored"]] * len(scores)
+    ordered = sorted(scores)
+    return [bisect.bisect_left(ordered, s) / max(1, len(scores) - 1) for s in scores]
+
+def decayed_rank(normalized, timestamp, now):
+    """Rank of a post: its normalized score, halved every half-life of age.
+    
+    Posts without a date are treated as one half-life old.
+    """
+    age_hours = RANKING["half_life_hours"] if timestamp is None else max(0.0, (now - timestamp) / 3600)
+    return (RANKING["floor"] + normalized) * 0.5 ** (age_hours / RANKING["half_life_hours"])
+
+class TopPosts:
+    """Top K posts across sources, updated as each source's posts arrive.
+    
+    Posts go into a bounded min-heap keyed by rank, so adding a post costs
+    O(log K) and nothing is re-sorted; a post already seen (same link) is skipped.
+    """
+    
+    def __init__(self, k=None, now=None):
+        self.k = k
+        self.now = time.time() if now is None else now
+        self._heap = []
+        self._links = set()
+        self._order = itertools.count()  # tie-breaker: earlier posts win equal ranks
+    
+    def add_source(self, posts):
+        """Rank one source's posts and merge them into the top K."""
+        for post, normalized in zip(posts, normalize_scores([p["score"] for p in posts])):
+            if post["link"] in self._links:
+                continue
+            if post["link"]:
+                self._links.add(post["link"])
+            post["rank"] = decayed_rank(normalized, post["timestamp"], self.now)
+            item = (post["rank"], -next(self._order), post)
+            if self.k is None or len(self._heap) < self.k:
+                heapq.heappush(self._heap, item)
+            elif item[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, item)
+    
+    def top(self):
+        """Posts in rank order, best first."""
+        return [post for _, _, post in sorted(self._heap, key=lambda item: item[:2], reverse=True)]
+
+def fetch_ai_feed(sources_selected, top_k=None):
+    """Fetch AI content from selected RSS sources, ranked by popularity and freshness.
+    
+    Each source's posts are ranked as soon as its feed arrives, by score
+    relative to the source's other posts, decayed by age.
+    """
+    selected = [s for s in AI_FEED_SOURCES if s["name"] in sources_selected]
+    feeds = download_feeds(selected)
+    archive_feed_entries(feeds, selected, category="ai feed")
+    top_posts = TopPosts(top_k)
+    source_of = {feeds[s["url"]]: s for s in selected}
+    
+    for future in as_completed(source_of):
+        source = source_of[future]
         try:
-            feed = feedparser.parse(source["url"])
-            for entry in feed.entries[:15]:
-                published = ""
-                if hasattr(entry, "published_parsed") and entry.published_parsed:
-                    published = datetime(*entry.published_parsed[:6]).strftime("%m/%d")
-                elif hasattr(entry, "updated_parsed") and entry.updated_parsed:
-                    published = datetime(*entry.updated_parsed[:6]).strftime("%m/%d")
-                
-                score = extract_score(entry, source_name)
-                title = entry.get("title", "No title")[:100]
-                # Clean HN title format
-                title = title.split(" (Comments)")[0].strip()
-                
-                all_posts.append({
-                    "title": title,
-                    "link": entry.get("link", ""),
-                    "source": source["name"],
-                    "icon": source["icon"],
-                    "date": published,
-                    "score": score,
-                    "summary": entry.get("summary", "")[:300],
-                })
+            feed = future.result()
         except Exception as e:
             print(f"Error fetching {source['name']}: {e}")
+            continue
+        
+        posts = []
+        scorer = SCORE_ADAPTERS[source["name"]]
+        for entry in feed.entries[:15]:
+            timestamp = entry_timestamp(entry)
+            published = time.strftime("%m/%d", time.gmtime(timestamp)) if timestamp is not None else ""
+            title = entry.get("title", "No title")[:100]
+            # Clean HN title format
+            title = title.split(" (Comments)")[0].strip()
+            
+            posts.append({
+                "title": title,
+                "link": entry.get("link", ""),
+                "source": source["name"],
+                "icon": source["icon"],
+                "date": published,
+                "timestamp": timestamp,
+                "score": scorer(entry),
+                "summary": entry.get("summary", "")[:300],
+            })
+        top_posts.add_source(posts)
     
-    # Sort by score (highest first), then by date
-    all_posts.sort(key=lambda x: x["score"], reverse=True)
-    return all_posts
+    return top_posts.top()
 
 def summarize_ai_trends(posts):
-    """Use LLM to summarize trends from top posts."""
+    """Use LLM to summarize trends from top posts, yielding the summary token by token."""
     if not posts:
-        return ""
+        return
     
-    # Get top posts for summarization
-    top_titles = [p["title"] for p in posts[:15]]
+    # Get top posts for summarization, skipping reposts of the same story
+    top_titles = [story[0]["title"] for story in cluster_articles(posts[:30])[:15]]
     titles_text = "\n".join([f"- {t}" for t in top_titles])
     
     prompt = f"""Based on these top AI posts from Reddit, Hacker News, and tech sites, identify the main trends in 3-4 bullet points:
@@ -664,30 +2528,27 @@ Format:
 
 Be specific about technologies, models, or topics mentioned. Keep each point to 1 line."""
     
-    return query_llm(prompt)
+    yield from stream_llm(prompt, kind="ai_trends")
 
 def generate_ai_feed(sources_selected):
-    """Generate AI feed report with trending posts and AI summary."""
+    """Generate AI feed report with trending posts and AI summary, yielding it as the summary is written."""
     if not sources_selected:
-        return "Please select at least one source."
+        yield "Please select at least one source."
+        return
     
     print(f"[DEBUG] Fetching AI feed from: {sources_selected}")
+    yield "*⏳ Fetching posts...*"
     posts = fetch_ai_feed(sources_selected)
     
     if not posts:
-        return "❌ Could not fetch posts. Try again."
+        yield "❌ Could not fetch posts. Try again."
+        return
     
-    report_parts = []
-    report_parts.append("## 🤖 AI Feed — Top Posts")
+    header = ["## 🤖 AI Feed — Top Posts", "### 🔥 Trending Topics"]
     
-    # AI Trend Summary
-    report_parts.append("### 🔥 Trending Topics")
-    trends = summarize_ai_trends(posts)
-    report_parts.append(trends)
-    report_parts.append("")
-    
-    # Top posts sorted by popularity
-    report_parts.append("### 📈 Most Popular")
+    # Top posts by rank (popularity within each source, decayed by age)
+    report_parts = [""]
+    report_parts.append("### 📈 Top Posts")
     report_parts.append("| Post | Source | Score |")
     report_parts.append("|------|--------|-------|")
     
@@ -699,7 +2560,12 @@ def generate_ai_feed(sources_selected):
     report_parts.append("")
     report_parts.append(f"*{len(posts)} posts • Updated {datetime.now().strftime('%H:%M')}*")
     
-    return "\n".join(report_parts)
+    # AI Trend Summary, streamed in above the posts
+    yield "\n".join([*header, "*⏳ Summarizing...*", *report_parts])
+    trends = ""
+    for token in summarize_ai_trends(posts):
+        trends += token
+        yield "\n".join([*header, trends, *report_parts])
 
 # ============================================
 # Build the UI
@@ -866,6 +2732,15 @@ with gr.Blocks(title="Easy Life with AI", theme=custom_theme, css="""
         output_report = gr.Markdown(label="Report")
         
         report_btn.click(fn=generate_tech_report, outputs=output_report)
+        
+        gr.Markdown("### 🔎 Search Past Headlines")
+        with gr.Row():
+            archive_query = gr.Textbox(placeholder="e.g. open source LLM", label="Keywords", scale=4)
+            archive_btn = gr.Button("Search", scale=1)
+        output_archive = gr.Markdown()
+        
+        archive_btn.click(fn=search_archive, inputs=archive_query, outputs=output_archive)
+        archive_query.submit(fn=search_archive, inputs=archive_query, outputs=output_archive)
     
     # ELI5 PAGE
     with gr.Tab("🧒 ELI5"):
@@ -892,9 +2767,15 @@ with gr.Blocks(title="Easy Life with AI", theme=custom_theme, css="""
 
 # Launch
 if __name__ == "__main__":
-    print("Starting Easy Life with AI...")
-    print("Testing Groq API connection...")
-    test = query_llm("Say hi in 3 words")
-    print(f"Groq test: {test[:50]}...")
-    print("\nLaunching Gradio app...")
-    app.launch(server_name="0.0.0.0", server_port=7860, show_error=True)
+    if len(sys.argv) > 1 and sys.argv[1] == "build-eli5":
+        print(f"Building ELI5 corpus ({len(COMPLEX_TOPICS)} topics x {len(ELI5_OPENINGS)} variants)...")
+        print(f"Stored {build_eli5_corpus()} new explanations in {ELI5_CORPUS['path']}")
+    else:
+        print("Starting Easy Life with AI...")
+        print("Testing LLM connection...")
+        test = query_llm("Say hi in 3 words", kind="test")
+        print(f"LLM test: {test[:50]}...")
+        start_market_scheduler()
+        start_feed_poller()
+        print("\nLaunching Gradio app...")
+        app.launch(server_name="0.0.0.0", server_port=7860, show_error=True)
@@ -0,0 +1,402 @@
+"""Tests for the web app's non-UI helpers. Run with: python -m pytest"""
+
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+import yfinance as yf
+
+import app
+
+
+def article(title, summary="", source="TechCrunch AI"):
+    return {"title": title, "summary": summary, "source": source, "category": "ai"}
+
+
+def titles(clusters):
+    return [[a["title"] for a in cluster] for cluster in clusters]
+
+
+def test_cluster_articles_keeps_similar_headlines_apart():
+    articles = [
+        article("OpenAI releases GPT-5, its most capable model yet"),
+        article("Google releases Gemini 3, its most capable model yet"),
+        article("Anthropic releases Claude, its most capable model yet"),
+        article("Meta releases Llama 4, its most capable model yet"),
+        article("Apple announces new iPhone at September event"),
+        article("Apple announces new iPad at September event"),
+        article("Large language models for medicine: a survey", source="arXiv AI"),
+        article("Large language models for law: a survey", source="arXiv AI"),
+        article("Large language models for education: a survey", source="arXiv AI"),
+    ]
+
+    assert titles(app.cluster_articles(articles)) == [[a["title"]] for a in articles]
+
+
+def test_cluster_articles_groups_the_same_story():
+    summary = "OpenAI on Thursday released GPT-5 to all ChatGPT users, saying the model is faster and makes fewer mistakes."
+    articles = [
+        article("OpenAI releases GPT-5 to all ChatGPT users", summary),
+        article("Google releases Gemini 3", "Google's new model tops the benchmarks."),
+        article("OpenAI releases GPT-5 to all ChatGPT users", f"<p>{summary}</p>", source="The Verge AI"),
+    ]
+
+    assert titles(app.cluster_articles(articles)) == [
+        [articles[0]["title"], articles[2]["title"]],
+        [articles[1]["title"]],
+    ]
+
+
+class FakeYahoo:
+    """Daily bars for one ticker, listed on `listed`, whose adjusted prices are divided by `scale`."""
+
+    def __init__(self, listed):
+        self.listed = pd.Timestamp(listed)
+        self.scale = 1.0
+        self.requests = []
+
+    def close(self, days):
+        return (100.0 + (days - pd.Timestamp("2000-01-03")).days.to_numpy() / 10) / self.scale
+
+    def bars(self, start, end):
+        self.requests.append(pd.Timestamp(start).normalize())
+        days = pd.bdate_range(max(pd.Timestamp(start).normalize(), self.listed), pd.Timestamp(end), inclusive="left")
+        close = self.close(days)
+        return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1000.0}, index=days)
+
+    def ticker(self, symbol):
+        yahoo = self
+
+        class Ticker:
+            def history(self, start, end):
+                return yahoo.bars(start, end)
+
+        return Ticker()
+
+    def download(self, tickers, start, end, **kwargs):
+        return pd.concat({t: self.bars(start, end) for t in tickers[:1]}, axis=1)
+
+
+def one_year():
+    end = datetime.now()
+    return end - timedelta(days=app.DATE_RANGE_OPTIONS["1 Year"]), end
+
+
+@pytest.fixture
+def yahoo(tmp_path, monkeypatch):
+    fake = FakeYahoo(listed="2000-01-03")
+    monkeypatch.setitem(app.PRICE_STORE, "dir", tmp_path)
+    # Every call refreshes the tail from Yahoo
+    monkeypatch.setitem(app.PRICE_STORE, "refresh_seconds", 0)
+    monkeypatch.setattr(yf, "Ticker", fake.ticker)
+    monkeypatch.setattr(yf, "download", fake.download)
+    return fake
+
+
+def fetch_close(mode, start, end):
+    if mode == "batch":
+        hist = app.fetch_history_batch(["AAPL"], start, end)["AAPL"]
+        return hist["Close"].iloc[-1]
+    return app.get_ticker_data("AAPL", start, end)["current"]
+
+
+@pytest.mark.parametrize("mode", ["batch", "single"])
+def test_store_is_refetched_after_a_split(yahoo, mode):
+    start, end = one_year()
+    fetch_close(mode, start, end)
+    yahoo.scale = 2.0  # 2:1 split: Yahoo halves every adjusted price
+
+    current = fetch_close(mode, start, end)
+
+    assert yahoo.requests[-1] == pd.Timestamp(app.history_start(start, end)).normalize()
+    hist = app.load_stored_history("AAPL")
+    assert np.allclose(hist["Close"].to_numpy(), yahoo.close(hist.index))
+    assert current == hist["Close"].iloc[-1]
+
+
+@pytest.mark.parametrize("mode", ["batch", "single"])
+def test_recent_listing_is_not_refetched_in_full(yahoo, mode):
+    start, end = one_year()
+    yahoo.listed = pd.Timestamp(end).normalize() - pd.Timedelta(days=60)
+    fetch_close(mode, start, end)
+    fetch_close(mode, start, end)
+
+    assert len(yahoo.requests) == 2
+    assert yahoo.requests[1] > yahoo.listed
+
+
+def unavailable(prompt):
+    raise app.BackendUnavailable("saturated")
+    yield
+
+
+@pytest.fixture
+def llm_cache(tmp_path, monkeypatch):
+    monkeypatch.setitem(app.LLM_CACHE, "path", tmp_path / "llm.db")
+    monkeypatch.setattr(app, "_llm_memory", app.OrderedDict())
+    monkeypatch.setattr(app, "_llm_touched", {})
+    monkeypatch.setattr(app, "LLM_ORDER", ["groq", "ollama"])
+
+
+def test_fallback_answer_is_cached_under_the_backend_that_gave_it(llm_cache, monkeypatch):
+    monkeypatch.setitem(app.LLM_STREAMS, "groq", unavailable)
+    monkeypatch.setitem(app.LLM_STREAMS, "ollama", lambda prompt: iter(["from ", "ollama"]))
+
+    assert app.query_llm("Explain DNS", kind="eli5") == "from ollama"
+
+    assert app.lookup_llm_response(app.llm_cache_key("groq", "Explain DNS")) is None
+    assert app.lookup_llm_response(app.llm_cache_key("ollama", "Explain DNS"))[1] == "from ollama"
+
+
+def test_answers_without_ttl_are_not_cached(llm_cache, monkeypatch):
+    monkeypatch.setitem(app.LLM_STREAMS, "groq", lambda prompt: iter(["OK"]))
+
+    assert app.query_llm("Say OK", kind="test") == "OK"
+
+    assert app.lookup_llm_response(app.llm_cache_key("groq", "Say OK")) is None
+
+
+def test_expired_answers_are_not_served(llm_cache, monkeypatch):
+    calls = []
+
+    def ollama(prompt):
+        calls.append(prompt)
+        return iter([f"answer {len(calls)}"])
+
+    monkeypatch.setitem(app.LLM_STREAMS, "groq", unavailable)
+    monkeypatch.setitem(app.LLM_STREAMS, "ollama", ollama)
+    monkeypatch.setitem(app.LLM_CACHE["ttl"], "eli5", 60)
+    assert app.query_llm("Explain DNS", kind="eli5") == "answer 1"
+    assert app.query_llm("Explain DNS", kind="eli5") == "answer 1"
+
+    now = time.time()
+    monkeypatch.setattr(app.time, "time", lambda: now + 61)
+    keys = [app.llm_cache_key(name, "Explain DNS") for name in app.LLM_ORDER]
+    assert app.cached_llm_response(keys, "eli5") is None  # in memory
+    app._llm_memory.clear()
+    assert app.cached_llm_response(keys, "eli5") is None  # in SQLite
+    assert app.query_llm("Explain DNS", kind="eli5") == "answer 2"
+
+
+def test_memory_hits_count_for_eviction(llm_cache, monkeypatch):
+    keys = [app.llm_cache_key("groq", prompt) for prompt in ["first", "second", "third"]]
+    # Room for two answers
+    monkeypatch.setitem(app.LLM_CACHE, "max_mb", 2 * (64 + 100) / 1024 / 1024)
+    app.store_llm_response(keys[0], "eli5", "a" * 100)
+    app.store_llm_response(keys[1], "eli5", "b" * 100)
+
+    assert app.lookup_llm_response(keys[0])[1] == "a" * 100  # served from memory
+    app.store_llm_response(keys[2], "eli5", "c" * 100)
+    app._llm_memory.clear()
+
+    assert app.lookup_llm_response(keys[0]) is not None
+    assert app.lookup_llm_response(keys[1]) is None
+
+
+class StopPolling(Exception):
+    pass
+
+
+def test_poll_feeds_survives_a_failed_cycle(monkeypatch):
+    polled = []
+
+    def download_feeds(feeds):
+        polled.append([f["url"] for f in feeds])
+        if len(polled) == 1:
+            raise OSError("No space left on device")
+        results = {}
+        for f in feeds:
+            results[f["url"]] = Future()
+            results[f["url"]].set_result(SimpleNamespace(entries=[{"link": f"{f['url']}/{len(polled)}"}]))
+        return results
+
+    def sleep(seconds):
+        if len(polled) == 3:
+            raise StopPolling
+
+    monkeypatch.setattr(app, "download_feeds", download_feeds)
+    monkeypatch.setattr(app, "save_feed_polls", lambda polls: None)
+    monkeypatch.setattr(app.time, "sleep", sleep)
+    # The second poll comes due straight away
+    monkeypatch.setitem(app.FEED_FETCH, "poll_min_interval", 0)
+    sources = [{"name": "Feed", "url": "https://example.com/feed", "ttl": 0}]
+
+    with pytest.raises(StopPolling):
+        app.poll_feeds(sources)
+
+    assert polled == [["https://example.com/feed"]] * 3
+
+
+ATOM_XHTML = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <title type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml">Fine-tuning <b>Llama</b> on a laptop</div></title>
+    <link rel="alternate" href="/posts/1"/>
+    <summary type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>LoRA in <i>8 GB</i> of RAM.</p></div></summary>
+    <updated>2024-05-01T12:00:00Z</updated>
+  </entry>
+</feed>
+"""
+
+RSS_WITH_ATOM_LINK = b"""<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
+  <channel>
+    <item>
+      <title>Show HN: A tiny inference server</title>
+      <atom:link rel="alternate" href="https://news.ycombinator.com/item?id=1"/>
+      <link>https://example.com/tiny-server</link>
+      <description>Serves GGUF models over HTTP.</description>
+    </item>
+  </channel>
+</rss>
+"""
+
+
+def test_atom_xhtml_text():
+    [entry] = app.stream_feed_entries(ATOM_XHTML, 10, "https://example.com/feed")
+
+    assert entry["title"] == "Fine-tuning Llama on a laptop"
+    assert entry["summary"] == "LoRA in 8 GB of RAM."
+    assert entry["link"] == "https://example.com/posts/1"
+
+
+def test_rss_link_wins_over_atom_link():
+    [entry] = app.stream_feed_entries(RSS_WITH_ATOM_LINK, 10)
+
+    assert entry["link"] == "https://example.com/tiny-server"
+    assert entry["summary"] == "Serves GGUF models over HTTP."
+
+
+def test_market_update_shows_indices_while_movers_load(yahoo, monkeypatch):
+    indices = list(app.MARKET_INDICES["US"])
+    others = [t for t in app.get_report_tickers("Stocks", "US") if t not in indices]
+    movers_released = threading.Event()
+    downloads = []
+
+    def download(tickers, start, end, **kwargs):
+        downloads.append(list(tickers))
+        if tickers != indices:
+            movers_released.wait(timeout=5)
+        return pd.concat({t: yahoo.bars(start, end) for t in tickers}, axis=1)
+
+    monkeypatch.setattr(yf, "download", download)
+    updates = app.stream_market_update("1 Week", "Stocks", "US")
+    next(updates)  # placeholders
+
+    partial = next(updates)
+    assert "### 📈 Indices" in partial
+    assert "### 🚀 Top Movers" not in partial and not movers_released.is_set()
+
+    movers_released.set()
+    report = list(updates)[-1]
+    for section in ["### 📈 Indices", "### 🚀 Top Movers", "### 🏭 Sectors"]:
+        assert section in report
+    assert sorted(downloads) == sorted([indices, others])
+
+def test_report_feeds_take_over_links_the_ai_feed_archived(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "ARTICLE_ARCHIVE", tmp_path / "articles.db")
+    link = "https://news.ycombinator.com/item?id=1"
+    ai_feed = [{"name": "Hacker News AI", "url": "https://hnrss.org/newest"}]
+    report_feeds = [{"name": "Hacker News", "url": "https://hnrss.org/frontpage", "category": "tech"}]
+    feeds = {}
+    for source in ai_feed + report_feeds:
+        feeds[source["url"]] = Future()
+        feeds[source["url"]].set_result(SimpleNamespace(entries=[{"link": link, "title": "HN post"}]))
+
+    def archived():
+        with app.closing(app.open_archive()) as db:
+            return tuple(db.execute("SELECT source, category FROM articles WHERE link = ?", (link,)).fetchone())
+
+    app.archive_feed_entries(feeds, ai_feed, category="ai feed")
+    assert archived() == ("Hacker News AI", "ai feed")
+    app.archive_feed_entries(feeds, report_feeds)
+    assert archived() == ("Hacker News", "tech")
+    app.archive_feed_entries(feeds, ai_feed, category="ai feed")
+    assert archived() == ("Hacker News", "tech")
+
+
+def test_store_files_removed_by_another_thread(yahoo, monkeypatch):
+    start, end = one_year()
+    app.get_ticker_data("AAPL", start, end)
+    stored = app.load_stored_history("AAPL")
+    # Another thread evicts a file between listing and stat
+    path_type = type(app.PRICE_STORE["dir"])
+    glob = path_type.glob
+    monkeypatch.setattr(path_type, "glob", lambda self, pattern: [self / "GONE.npy", *glob(self, pattern)])
+    monkeypatch.setitem(app.PRICE_STORE, "max_bytes", 0)
+
+    app.evict_store()
+
+    assert not (app.PRICE_STORE["dir"] / "AAPL.npy").exists()
+    assert app.missing_start("AAPL", stored, start) == start
+
+
+class SlowFirstFeed(BaseHTTPRequestHandler):
+    """Answers the first request after `slow_seconds` and later ones at once, each with its own title."""
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.started.append(time.monotonic())
+            number = len(self.server.started)
+        if number == 1:
+            time.sleep(self.server.slow_seconds)
+        body = f"<rss><channel><item><title>response {number}</title><link>https://example.com/{number}</link></item></channel></rss>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slow_feed(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowFirstFeed)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.started = []
+    server.slow_seconds = 1.5
+    server.url = f"http://127.0.0.1:{server.server_port}/feed.xml"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setitem(app.FEED_FETCH, "cache_dir", tmp_path)
+    monkeypatch.setitem(app.FEED_FETCH, "hedge", True)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_slow_feed_request_is_hedged_at_its_percentile(slow_feed, monkeypatch):
+    # Usually 0.1s, with a tail at 2s: hedged at 3x the median, 0.3s
+    counts = [94, 0, 0, 0, 6, 0, 0, 0, 0, 0, 0]
+    monkeypatch.setattr(app, "_feed_latency", {slow_feed.url: counts})
+    assert app.hedge_threshold(slow_feed.url) == pytest.approx(0.3)
+
+    started = time.monotonic()
+    feed = app.read_feed(slow_feed.url, ttl=0, timeout=10)
+
+    assert time.monotonic() - started < slow_feed.slow_seconds
+    assert [entry["title"] for entry in feed.entries] == ["response 2"]
+    first, hedge = slow_feed.started
+    assert hedge - first > 0.25  # measured by the server, after the first request's connect
+    # The slow request finishing later doesn't replace the winner's entries
+    time.sleep(slow_feed.slow_seconds)
+    cached, _ = app.load_cached_feed(slow_feed.url)
+    assert [entry["title"] for entry in cached["entries"]] == ["response 2"]
+
+
+def test_feed_without_a_tail_is_not_hedged(slow_feed, monkeypatch):
+    monkeypatch.setattr(app, "_feed_latency", {slow_feed.url: [100, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]})
+    slow_feed.slow_seconds = 0.5
+
+    feed = app.read_feed(slow_feed.url, ttl=0, timeout=10)
+
+    assert [entry["title"] for entry in feed.entries] == ["response 1"]
+    assert len(slow_feed.started) == 1